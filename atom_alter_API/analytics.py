@@ -0,0 +1,153 @@
+from typing import Dict, List, Union
+
+try:
+    import numpy as np
+except ImportError:
+    raise ImportError("atom_alter_API.analytics requires numpy. Install it with pip install atom-alter-api[analytics]")
+
+from .constants import BUY, SELL, SATOSHIS_PER_COIN
+from .exceptions import APIExecutionError
+from .order_book import OrderBook
+
+ArrayLike = Union[float, List[float], 'np.ndarray']
+
+
+class BookArrays():
+    '''
+    An order book converted once into contiguous float64 NumPy arrays. Bids are sorted from the best (highest)
+    price down and asks from the best (lowest) price up, with cumulative volumes and costs so that depth,
+    VWAP and slippage can be computed for many target volumes at once without Python loops.
+
+    Prices are floats here, so this is for analysis and sizing. Use OrderBook or Decimal for order prices.
+    '''
+    __slots__ = ('bid_prices', 'bid_volumes', 'ask_prices', 'ask_volumes',
+                 '_bid_cumulative_volumes', '_bid_cumulative_costs',
+                 '_ask_cumulative_volumes', '_ask_cumulative_costs')
+
+    def __init__(self, bid_prices: 'np.ndarray', bid_volumes: 'np.ndarray', ask_prices: 'np.ndarray', ask_volumes: 'np.ndarray'):
+        bid_order = np.argsort(-bid_prices, kind='stable')
+        ask_order = np.argsort(ask_prices, kind='stable')
+        self.bid_prices = np.ascontiguousarray(bid_prices[bid_order])
+        self.bid_volumes = np.ascontiguousarray(bid_volumes[bid_order])
+        self.ask_prices = np.ascontiguousarray(ask_prices[ask_order])
+        self.ask_volumes = np.ascontiguousarray(ask_volumes[ask_order])
+
+        self._bid_cumulative_volumes = np.cumsum(self.bid_volumes)
+        self._bid_cumulative_costs = np.cumsum(self.bid_prices * self.bid_volumes)
+        self._ask_cumulative_volumes = np.cumsum(self.ask_volumes)
+        self._ask_cumulative_costs = np.cumsum(self.ask_prices * self.ask_volumes)
+
+    @classmethod
+    def from_order_book(cls, order_book: Union[Dict, OrderBook], in_satoshis: bool = False) -> 'BookArrays':
+        '''
+        Builds the arrays from a get_order_book response, with dict or BookLevel levels, or from an OrderBook.
+        If in_satoshis is True, the dict levels hold integer satoshis, as decoded by make_satoshi_json_loads.
+        '''
+        if isinstance(order_book, OrderBook):
+            return cls(np.array(order_book.bid_prices, dtype=np.float64),
+                       np.array(order_book.bid_volumes, dtype=np.float64),
+                       np.array(order_book.ask_prices, dtype=np.float64),
+                       np.array(order_book.ask_volumes, dtype=np.float64))
+
+        buy = order_book.get('buy', [])
+        sell = order_book.get('sell', [])
+        arrays = [np.fromiter((float(level['rate']) for level in buy), dtype=np.float64, count=len(buy)),
+                  np.fromiter((float(level['volume']) for level in buy), dtype=np.float64, count=len(buy)),
+                  np.fromiter((float(level['rate']) for level in sell), dtype=np.float64, count=len(sell)),
+                  np.fromiter((float(level['volume']) for level in sell), dtype=np.float64, count=len(sell))]
+        if in_satoshis:
+            arrays = [array / SATOSHIS_PER_COIN for array in arrays]
+        return cls(*arrays)
+
+    #
+    # Top of book
+    #
+    @property
+    def best_bid(self) -> float:
+        return float(self.bid_prices[0]) if len(self.bid_prices) else np.nan
+
+    @property
+    def best_ask(self) -> float:
+        return float(self.ask_prices[0]) if len(self.ask_prices) else np.nan
+
+    @property
+    def mid(self) -> float:
+        return (self.best_bid + self.best_ask) / 2
+
+    def _get_side(self, buy_or_sell: int):
+        # Buying takes liquidity from the asks, selling takes it from the bids
+        if buy_or_sell == BUY:
+            return self.ask_prices, self._ask_cumulative_volumes, self._ask_cumulative_costs
+        elif buy_or_sell == SELL:
+            return self.bid_prices, self._bid_cumulative_volumes, self._bid_cumulative_costs
+        raise ValueError("buy_or_sell must be BUY or SELL. Got {}".format(buy_or_sell))
+
+    #
+    # Analytics
+    #
+    def depth_within_percent(self, percent: ArrayLike) -> Dict[str, 'np.ndarray']:
+        '''
+        Returns the total bid volume with a price within percent of the mid, and the same for asks.
+        percent can be a number or an array of numbers.
+        '''
+        if len(self.bid_prices) == 0 or len(self.ask_prices) == 0:
+            raise APIExecutionError("We were unable to get the depth because one side of the order book is empty")
+
+        percent = np.asarray(percent, dtype=np.float64)
+        mid = self.mid
+        lowest_bid = mid * (1 - percent / 100)
+        highest_ask = mid * (1 + percent / 100)
+
+        # Bids are sorted descending, so search on the negated prices
+        num_bids = np.searchsorted(-self.bid_prices, -lowest_bid, side='right')
+        num_asks = np.searchsorted(self.ask_prices, highest_ask, side='right')
+        return {
+            'buy': self._cumulative_at(self._bid_cumulative_volumes, num_bids),
+            'sell': self._cumulative_at(self._ask_cumulative_volumes, num_asks),
+        }
+
+    @staticmethod
+    def _cumulative_at(cumulative: 'np.ndarray', num_levels: 'np.ndarray') -> 'np.ndarray':
+        padded = np.concatenate(([0.0], cumulative))
+        return padded[num_levels]
+
+    def vwap(self, buy_or_sell: int, volume: ArrayLike) -> 'np.ndarray':
+        '''
+        Returns the volume weighted average price of a market order of the given volume, walking the asks for
+        a buy and the bids for a sell. volume can be a number or an array of numbers. Returns nan where the
+        book doesn't have enough volume.
+        '''
+        prices, cumulative_volumes, cumulative_costs = self._get_side(buy_or_sell)
+        volume = np.asarray(volume, dtype=np.float64)
+        if len(prices) == 0:
+            return np.full(volume.shape, np.nan)
+
+        # The level where the order finishes filling
+        level = np.searchsorted(cumulative_volumes, volume, side='left')
+        enough_volume = level < len(prices)
+        level = np.minimum(level, len(prices) - 1)
+
+        volume_before = np.where(level > 0, cumulative_volumes[level - 1], 0.0)
+        cost_before = np.where(level > 0, cumulative_costs[level - 1], 0.0)
+        cost = cost_before + (volume - volume_before) * prices[level]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            vwap = cost / volume
+        return np.where(enough_volume & (volume > 0), vwap, np.where(volume == 0, prices[0], np.nan))
+
+    def slippage(self, buy_or_sell: int, volume: ArrayLike) -> 'np.ndarray':
+        '''
+        Returns how much worse than the mid the VWAP of a market order of the given volume is, as a fraction
+        of the mid. Always positive, and includes half of the spread.
+        '''
+        vwap = self.vwap(buy_or_sell, volume)
+        mid = self.mid
+        if buy_or_sell == BUY:
+            return (vwap - mid) / mid
+        return (mid - vwap) / mid
+
+    def slippage_both_sides(self, volume: ArrayLike) -> Dict[str, 'np.ndarray']:
+        return {
+            'buy': self.slippage(BUY, volume),
+            'sell': self.slippage(SELL, volume),
+        }
@@ -1,25 +1,50 @@
 import asyncio
-import aiohttp
+import logging
+import time
 
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Dict, List, Any, Tuple, Optional, Union, Callable, Awaitable, TYPE_CHECKING
 from decimal import Decimal
 
 from .constants import (
     LIMIT_TRADE,
     BUY,
     SELL,
-    HTTP_STATUS_SUCCESS)
+    HTTP_STATUS_SUCCESS,
+    DEFAULT_CONNECTION_LIMIT,
+    DEFAULT_CONNECTION_LIMIT_PER_HOST,
+    DEFAULT_KEEPALIVE_TIMEOUT,
+    DEFAULT_DNS_CACHE_TTL,
+    DEFAULT_CACHE_MAX_ENTRIES,
+    DEFAULT_BATCH_CONCURRENCY,
+    DEFAULT_BOOK_CONCURRENCY,
+    DEFAULT_TICKER_LIST_TTL,
+    SATOSHIS_PER_COIN)
+from .balance_cache import BalanceCache
+from .models import Order, Balance, BookLevel
+from .order_book import OrderBook, BookSnapshot, TopOfBook, MarketSnapshot
+from .order_history import OrderHistoryStore
+from .signing import PayloadSigner
+from .orders import OrderRequest, BatchOrderResult, CancelResult
+from .utils.cache import TTLCache
+from .utils.json_decoding import fast_json_loads, decodes_to_satoshis, copy_json
 from .utils.logging import BaseLoggingService
+from .utils.metrics import RequestMetrics, PHASE_TOTAL, PHASE_DECODE
+from .utils.rate_limit import RequestScheduler
+from .utils.retry import RetryPolicy
 
 from .utils.mathematical import (
-    sha256,
     generate_request_id,
     float_to_string,
-    to_decimal)
+    to_decimal,
+    to_satoshis,
+    satoshis_to_decimal)
 
 from .exceptions import HTTPRequestError, HeaderCreationError, LoginError, BadRequestError, UnauthorizedError, \
     APIOperationStatusError, APIResponseError, APIExecutionError
 
+if TYPE_CHECKING:
+    import aiohttp
+
 http_status_errors = dict([(400, BadRequestError),
                           (401, UnauthorizedError),
                           (500, HTTPRequestError),
@@ -41,6 +66,20 @@ def check_http_response_for_errors(response, resp_status, resp_headers):
                                    "header: {}"
                                    .format(response, resp_status, resp_headers))
 
+def create_client_session(connection_limit: int = DEFAULT_CONNECTION_LIMIT,
+                          connection_limit_per_host: int = DEFAULT_CONNECTION_LIMIT_PER_HOST,
+                          keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+                          dns_cache_ttl: int = DEFAULT_DNS_CACHE_TTL,
+                          metrics: RequestMetrics = None) -> 'aiohttp.ClientSession':
+    # aiohttp is slow to import, so it is only imported once we need the network
+    import aiohttp
+    connector = aiohttp.TCPConnector(limit=connection_limit,
+                                     limit_per_host=connection_limit_per_host,
+                                     keepalive_timeout=keepalive_timeout,
+                                     ttl_dns_cache=dns_cache_ttl)
+    trace_configs = [metrics.create_trace_config()] if metrics is not None else None
+    return aiohttp.ClientSession(connector=connector, trace_configs=trace_configs)
+
 def check_post_response_status(response, url):
     # post responses should all have status in the response, and it should = true or 1
     if 'status' not in response or response['status'] == False or response['status'] == 0:
@@ -55,26 +94,159 @@ class AtomarsAlterdiceAPI(BaseLoggingService):
     default_pair: str = None
     active_orders: List = []
 
-    def __init__(self, username, password, API_url = 'https://api.atomars.com/v1/', default_pair ='HLSETH'):
+    def __init__(self, username, password, API_url = 'https://api.atomars.com/v1/', default_pair ='HLSETH',
+                 connection_limit: int = DEFAULT_CONNECTION_LIMIT,
+                 connection_limit_per_host: int = DEFAULT_CONNECTION_LIMIT_PER_HOST,
+                 keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+                 dns_cache_ttl: int = DEFAULT_DNS_CACHE_TTL,
+                 prewarm_connections: int = 0,
+                 public_cache_ttls: Dict[str, float] = None,
+                 public_cache_max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+                 scheduler: RequestScheduler = None,
+                 json_decoder: Callable[[bytes], Any] = None,
+                 typed_returns: bool = False,
+                 session: 'aiohttp.ClientSession' = None,
+                 auto_relogin: bool = True,
+                 token_refresh_after: float = None,
+                 retry_policy: RetryPolicy = None,
+                 metrics: RequestMetrics = None,
+                 balance_cache_ttl: float = None,
+                 ticker_list_ttl: float = DEFAULT_TICKER_LIST_TTL):
         self.secret = None
         self.token = None
+        self._signer = None
         self.default_pair = default_pair
         self.active_orders = []
         self.username = username
         self.password = password
         self.base_url = API_url
+
+        self.connection_limit = connection_limit
+        self.connection_limit_per_host = connection_limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.prewarm_connections = prewarm_connections
+        self._connections_warmed = False
+        self._session = None
+        self._owns_session = True
+        if session is not None:
+            self.use_session(session)
+
+        # Optional caches for public endpoints, keyed by endpoint such as 'public/book'
+        self.public_caches = {}
+        if public_cache_ttls is not None:
+            for endpoint, ttl in public_cache_ttls.items():
+                self.public_caches[endpoint] = TTLCache(ttl, public_cache_max_entries)
+
+        # Optional rate limiter that every request waits on before it is sent
+        self.scheduler = scheduler
+
+        # Decodes the raw response body. See utils/json_decoding.py for decoders that return Decimals or satoshis.
+        self.json_decoder = json_decoder if json_decoder is not None else fast_json_loads
+        # Prices and amounts decoded as satoshis are converted back to coins by OrderBook and the typed models
+        self.amounts_in_satoshis = decodes_to_satoshis(self.json_decoder)
+
+        # Return Order, Balance and BookLevel objects instead of the raw dicts from the exchange
+        self.typed_returns = typed_returns
+
+        self.order_history_store = OrderHistoryStore()
+        self._order_history_refresh = None
+
+        # If auto_relogin is True, a private request that fails with 401 logs in again and is sent again.
+        # If token_refresh_after is set, we log in again before a private request once the token is that many seconds old.
+        self.auto_relogin = auto_relogin
+        self.token_refresh_after = token_refresh_after
+        self._token_time = None
+        self._login_future = None
+
+        # Optional policy for retrying failed requests and hedging slow public requests
+        self.retry_policy = retry_policy
+
+        # Optional request counts, error counts and latency histograms
+        self.metrics = metrics
+
+        # Optional local copy of the balances, kept up to date by the orders we place and cancel
+        self.balance_cache = BalanceCache(balance_cache_ttl) if balance_cache_ttl is not None else None
+
+        # The tickers by pair, for validating pairs and finding the currencies of a pair
+        self.ticker_list_cache = TTLCache(ticker_list_ttl, 1)
+
+    #
+    # Session lifecycle
+    #
+    async def __aenter__(self) -> 'AtomarsAlterdiceAPI':
+        self.get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    def get_session(self) -> 'aiohttp.ClientSession':
+        # One long lived session is shared by every request so that connections are kept alive and reused
+        # instead of doing a new TCP and TLS handshake each time.
+        if self._session is None or self._session.closed:
+            self._session = create_client_session(self.connection_limit,
+                                                  self.connection_limit_per_host,
+                                                  self.keepalive_timeout,
+                                                  self.dns_cache_ttl,
+                                                  self.metrics)
+            self._owns_session = True
+        return self._session
+
+    def use_session(self, session: 'aiohttp.ClientSession') -> None:
+        # Use a session that is shared with other clients. It is left open when this client is closed.
+        self._session = session
+        self._owns_session = False
+
+    async def close(self) -> None:
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def warm_up_connections(self, num_connections: int) -> None:
+        # Open num_connections connections at the same time so that they are waiting in the pool for later requests.
+        self.logger.debug('Warming up %s connections', num_connections)
+        url = self.base_url + 'public/symbols'
+        session = self.get_session()
+
+        async def open_connection():
+            try:
+                async with session.get(url=url) as resp:
+                    await resp.read()
+            except Exception as e:
+                self.logger.debug('Failed to warm up connection: %s', e)
+
+        await asyncio.gather(*[open_connection() for _ in range(num_connections)])
+
     #
     # Networking functionality
     #
     async def send_post_request_and_get_response(self, url, payload, headers = None, check_response_for_errors = True) -> Dict:
+        if self.metrics is None:
+            return await self._send_post_request_and_get_response(url, payload, headers, check_response_for_errors)
+
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(json=payload, url = url, headers= headers) as resp:
-                    response = await resp.json()
-                    resp_headers = resp.headers
-                    resp_status = resp.status
+            return await self._send_post_request_and_get_response(url, payload, headers, check_response_for_errors)
         except Exception as e:
-            raise HTTPRequestError(e)
+            self.metrics.record_error(url[len(self.base_url):], e)
+            raise
+
+    async def _send_post_request_and_get_response(self, url, payload, headers, check_response_for_errors) -> Dict:
+        # Only signed requests have headers. Those are the ones that need a valid token.
+        if headers is not None and self._is_token_due_for_refresh():
+            await self.relogin(headers['login-token'])
+            headers = self.get_signed_headers(payload)
+
+        # Retries send the same payload, so they keep the same request_id and the exchange can't place an order twice
+        response, resp_status, resp_headers = await self._send_with_retries(
+            lambda: self._send_post_request(url, payload, headers))
+
+        if resp_status == 401 and headers is not None and self.auto_relogin:
+            self.logger.debug('Token was rejected. Logging in again and resending the request')
+            await self.relogin(headers['login-token'])
+            signed_headers = self.get_signed_headers(payload)
+            response, resp_status, resp_headers = await self._send_with_retries(
+                lambda: self._send_post_request(url, payload, signed_headers))
 
         if check_response_for_errors:
             check_http_response_for_errors(response, resp_status, resp_headers)
@@ -83,20 +255,141 @@ class AtomarsAlterdiceAPI(BaseLoggingService):
         return response
 
 
-    async def send_get_request_and_get_response(self, url, params) -> Dict:
+    async def _send_post_request(self, url, payload, headers):
+        if self.scheduler is not None:
+            await self.scheduler.acquire(url[len(self.base_url):])
+
+        timings = {} if self.metrics is not None else None
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url = url, params=params) as resp:
-                    response = await resp.json()
-                    resp_headers = resp.headers
-                    resp_status = resp.status
+            session = self.get_session()
+            start = time.perf_counter()
+            async with session.post(json=payload, url = url, headers= headers, trace_request_ctx=timings) as resp:
+                response = self._decode_response(await resp.read(), timings)
+                resp_headers = resp.headers
+                resp_status = resp.status
         except Exception as e:
             raise HTTPRequestError(e)
 
-        check_http_response_for_errors(response, resp_status, resp_headers)
+        if timings is not None:
+            timings[PHASE_TOTAL] = time.perf_counter() - start
+            self.metrics.record_request(url[len(self.base_url):], 'POST', resp_status, timings)
+
+        return response, resp_status, resp_headers
+
+    def _decode_response(self, body: bytes, timings: Optional[Dict[str, float]]) -> Any:
+        if timings is None:
+            return self.json_decoder(body)
+
+        start = time.perf_counter()
+        response = self.json_decoder(body)
+        timings[PHASE_DECODE] = time.perf_counter() - start
+        return response
+
+    async def send_get_request_and_get_response(self, url, params) -> Dict:
+        cache = self.public_caches.get(url[len(self.base_url):])
+        if cache is not None:
+            key = (url, tuple(sorted(params.items())))
+            response = await cache.get_or_fetch(key, lambda: self._send_get_request_and_get_response(url, params))
+            # Every caller gets its own copy, so modifying a response can't change what later callers get
+            return copy_json(response)
+
+        return await self._send_get_request_and_get_response(url, params)
+
+    async def _send_get_request_and_get_response(self, url, params) -> Dict:
+        try:
+            response, resp_status, resp_headers = await self._send_with_retries(
+                lambda: self._send_hedged_get_request(url, params))
+
+            check_http_response_for_errors(response, resp_status, resp_headers)
+        except Exception as e:
+            if self.metrics is not None:
+                self.metrics.record_error(url[len(self.base_url):], e)
+            raise
 
         return response
 
+    async def _send_get_request(self, url, params):
+        if self.scheduler is not None:
+            await self.scheduler.acquire(url[len(self.base_url):])
+
+        timings = {} if self.metrics is not None else None
+        try:
+            session = self.get_session()
+            start = time.perf_counter()
+            async with session.get(url = url, params=params, trace_request_ctx=timings) as resp:
+                response = self._decode_response(await resp.read(), timings)
+                resp_headers = resp.headers
+                resp_status = resp.status
+        except Exception as e:
+            raise HTTPRequestError(e)
+
+        if timings is not None:
+            timings[PHASE_TOTAL] = time.perf_counter() - start
+            self.metrics.record_request(url[len(self.base_url):], 'GET', resp_status, timings)
+
+        return response, resp_status, resp_headers
+
+    async def _send_hedged_get_request(self, url, params):
+        # GET requests only read public data, so a second copy can be sent if the first one is slow
+        if self.retry_policy is None or self.retry_policy.hedge_delay is None:
+            return await self._send_get_request(url, params)
+
+        pending = {asyncio.ensure_future(self._send_get_request(url, params))}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self.retry_policy.hedge_delay)
+            if len(done) > 0:
+                return done.pop().result()
+
+            self.logger.debug('Sending hedged request to %s', url)
+            pending.add(asyncio.ensure_future(self._send_get_request(url, params)))
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for request in done:
+                    if request.exception() is None and request.result()[1] == HTTP_STATUS_SUCCESS:
+                        return request.result()
+                if len(pending) == 0:
+                    # Both failed, so use the last one to fail
+                    return done.pop().result()
+        finally:
+            for request in pending:
+                request.cancel()
+
+    async def _send_with_retries(self, send_request: Callable[[], Awaitable[Tuple[Any, int, Any]]]) -> Tuple[Any, int, Any]:
+        attempt = 0
+        while True:
+            error = None
+            try:
+                result = await send_request()
+                error_class = None
+                if result[1] != HTTP_STATUS_SUCCESS:
+                    error_class = http_status_errors.get(result[1], HTTPRequestError)
+            except HTTPRequestError as e:
+                error = e
+                error_class = type(e)
+
+            if error_class is None or self.retry_policy is None or not self.retry_policy.should_retry(attempt, error_class):
+                if error is not None:
+                    raise error
+                return result
+
+            delay = self.retry_policy.get_delay(attempt)
+            self.logger.debug('Request failed with %s. Retrying in %.3fs', error_class.__name__, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def get_cache_stats(self) -> Dict[str, Dict[str, int]]:
+        stats = {endpoint: cache.get_stats() for endpoint, cache in self.public_caches.items()}
+        if self.balance_cache is not None:
+            stats['private/balances'] = self.balance_cache.get_stats()
+        return stats
+
+    def clear_caches(self) -> None:
+        for cache in self.public_caches.values():
+            cache.clear()
+        self.ticker_list_cache.clear()
+        if self.balance_cache is not None:
+            self.balance_cache.invalidate()
+
     #
     # Header and signature functionality
     #
@@ -110,30 +403,36 @@ class AtomarsAlterdiceAPI(BaseLoggingService):
         }
         return headers
 
-    def get_sig_from_payload(self, payload):
+    def get_signer(self) -> PayloadSigner:
         if self.secret is None:
             raise HeaderCreationError("Cannot create signature because we don't have our secret. Make sure you are logged in first.")
 
-        raw_sig = self._get_sig_from_payload(payload) + str(self.secret)
-        sha256_sig = sha256(raw_sig)
-        return sha256_sig
+        if self._signer is None or self._signer.secret != self.secret:
+            self._signer = PayloadSigner(self.secret)
+        return self._signer
+
+    def get_sig_from_payload(self, payload):
+        if self.metrics is None:
+            return self.get_signer().sign(payload)
+
+        start = time.perf_counter()
+        signature = self.get_signer().sign(payload)
+        self.metrics.observe_signing(time.perf_counter() - start)
+        return signature
+
+    def get_sigs_from_payloads(self, payloads: List[Dict]) -> List[str]:
+        if self.metrics is None or len(payloads) == 0:
+            return self.get_signer().sign_batch(payloads)
+
+        start = time.perf_counter()
+        signatures = self.get_signer().sign_batch(payloads)
+        seconds_per_payload = (time.perf_counter() - start) / len(payloads)
+        for _ in payloads:
+            self.metrics.observe_signing(seconds_per_payload)
+        return signatures
 
     def _get_sig_from_payload(self, payload):
-        if isinstance(payload, dict):
-            sorted_keys = sorted(payload.keys())
-            to_return = ''
-            for key in sorted_keys:
-                to_return += str(self._get_sig_from_payload(payload[key]))
-            return to_return
-        elif isinstance(payload, Decimal):
-            return str(payload)
-        elif isinstance(payload, float):
-            decimal = Decimal(payload)
-            return str(decimal)
-        elif isinstance(payload, str) or isinstance(payload, int):
-            return str(payload)
-        else:
-            raise HeaderCreationError("I don't know how to create signature with this payload.")
+        return self.get_signer().get_raw_signature(payload)
 
 
     #
@@ -154,10 +453,52 @@ class AtomarsAlterdiceAPI(BaseLoggingService):
 
         self.secret = response['data']['secret']
         self.token = response['token']
+        self._token_time = time.monotonic()
+
+        # Logging in again keeps the same pool of connections, so they only need to be warmed up the first time
+        if self.prewarm_connections > 0 and not self._connections_warmed:
+            self._connections_warmed = True
+            await self.warm_up_connections(self.prewarm_connections)
+
+
 
+    async def relogin(self, rejected_token: str = None) -> None:
+        # Many requests can find out the token expired at the same time. They all share one login, and if the
+        # token was already replaced since the request was signed, there is nothing to do.
+        if rejected_token is not None and rejected_token != self.token:
+            return
+        if self._login_future is None or self._login_future.done():
+            self._login_future = asyncio.ensure_future(self.login())
+        await asyncio.shield(self._login_future)
 
+    def _is_token_due_for_refresh(self) -> bool:
+        if self.token_refresh_after is None or self._token_time is None:
+            return False
+        return time.monotonic() - self._token_time >= self.token_refresh_after
 
     async def get_balances(self, only_non_zero: bool = False) -> Dict:
+        balances = await self._get_balances()
+        if self.balance_cache is not None:
+            # Callers get their own copy, so the cached balances can't be changed by accident
+            balances = copy_json(balances)
+
+        if only_non_zero:
+            nonzero_balances = {}
+            for pair in balances:
+                if float(balances[pair]['balance']) > 0:
+                    nonzero_balances[pair] = balances[pair]
+            balances = nonzero_balances
+
+        if self.typed_returns:
+            return {currency: Balance.from_dict(balance) for currency, balance in balances.items()}
+        return balances
+
+    async def _get_balances(self) -> Dict:
+        if self.balance_cache is not None:
+            return await self.balance_cache.get_or_fetch(self._fetch_balances)
+        return await self._fetch_balances()
+
+    async def _fetch_balances(self) -> Dict:
         self.logger.debug('Executing get_balance')
         url = self.base_url + 'private/balances'
         payload = {
@@ -169,55 +510,85 @@ class AtomarsAlterdiceAPI(BaseLoggingService):
 
         if 'data' in response and 'list' in response['data']:
             self.logger.debug('get_balances Succeeded')
-            balances = response['data']['list']
-            if only_non_zero:
-                nonzero_balances = {}
-                for pair in balances:
-                    if float(balances[pair]['balance']) > 0:
-                        nonzero_balances[pair] = balances[pair]
-                return nonzero_balances
-            else:
-                return balances
+            return response['data']['list']
 
         raise APIResponseError("No balances were returned.")
 
-    async def get_balance(self, currency: str) -> Dict:
-        balances = await self.get_balances()
+    async def get_balance(self, currency: str) -> Union[Dict, Balance]:
+        # Only the one balance is copied and converted, not all of them
+        balances = await self._get_balances()
 
         if currency in balances:
-            return balances[currency]
+            balance = balances[currency]
+            if self.typed_returns:
+                return Balance.from_dict(balance)
+            return copy_json(balance) if self.balance_cache is not None else balance
         else:
             raise APIResponseError("No balance found for currency {}".format(currency))
 
+    async def _reserve_balance(self, payload: Dict, order_id: int) -> None:
+        # A buy holds rate * volume of the quote currency, rounded up, and a sell holds volume of the base currency
+        try:
+            currencies = await self._get_pair_currencies(payload['pair'])
+        except Exception as e:
+            self.logger.warning('Could not get the currencies of pair %s, so the balance cache was cleared: %s',
+                                payload['pair'], e)
+            currencies = None
+        if currencies is None:
+            self.balance_cache.invalidate()
+            return
+
+        base, quote = currencies
+        volume = to_satoshis(payload['volume'])
+        if payload['type'] == BUY:
+            self.balance_cache.reserve(order_id, quote, -(-to_satoshis(payload['rate']) * volume // SATOSHIS_PER_COIN))
+        else:
+            self.balance_cache.reserve(order_id, base, volume)
 
-    async def limit_buy(self, price: float, volume: float, pair: str = None) -> int:
-        if pair is None:
-            pair = self.default_pair
-
-        price = float_to_string(price)
-        volume = float_to_string(volume)
+    async def _get_pair_currencies(self, pair: str) -> Optional[Tuple[str, str]]:
+        ticker = (await self._get_pairs()).get(pair)
+        if ticker is None:
+            return None
+        return ticker['base'], ticker['quote']
 
-        self.logger.debug('Executing limit_buy with price: {}, volume: {}, pair: {}'.format(price, volume, pair))
 
-        url = self.base_url + 'private/create-order'
-        payload = {
+    def _get_create_order_payload(self, buy_or_sell: int, price: str, volume: str, pair: str) -> Dict:
+        return {
             'type_trade': LIMIT_TRADE,
-            'type': BUY,
+            'type': buy_or_sell,
             'rate': price,
             'volume': volume,
             'pair': pair,
             'request_id': generate_request_id(),
         }
 
-        headers = self.get_signed_headers(payload)
+    async def _send_create_order(self, payload: Dict, headers: Dict, function_name: str) -> int:
+        url = self.base_url + 'private/create-order'
 
         response = await self.send_post_request_and_get_response(url, payload, headers)
 
         if 'data' in response and 'id' in response['data']:
-            self.logger.debug('limit_buy Succeeded for order id {}'.format(response['data']['id']))
-            return response['data']['id']
+            order_id = response['data']['id']
+            self.logger.debug('%s Succeeded for order id %s', function_name, order_id)
+            if self.balance_cache is not None:
+                await self._reserve_balance(payload, order_id)
+            return order_id
 
-        raise APIResponseError('limit_buy Failed. Response {}'.format(response))
+        raise APIResponseError('{} Failed. Response {}'.format(function_name, response))
+
+    async def limit_buy(self, price: float, volume: float, pair: str = None) -> int:
+        if pair is None:
+            pair = self.default_pair
+
+        price = float_to_string(price)
+        volume = float_to_string(volume)
+
+        self.logger.debug('Executing limit_buy with price: %s, volume: %s, pair: %s', price, volume, pair)
+
+        payload = self._get_create_order_payload(BUY, price, volume, pair)
+        headers = self.get_signed_headers(payload)
+
+        return await self._send_create_order(payload, headers, 'limit_buy')
 
 
     async def limit_sell(self, price: float, volume: float, pair:str = None) -> int:
@@ -227,30 +598,50 @@ class AtomarsAlterdiceAPI(BaseLoggingService):
         price = float_to_string(price)
         volume = float_to_string(volume)
 
-        self.logger.debug('Executing limit_sell with price: {}, volume: {}, pair: {}'.format(price, volume, pair))
-
-        url = self.base_url + 'private/create-order'
-        payload = {
-            'type_trade': LIMIT_TRADE,
-            'type': SELL,
-            'rate': price,
-            'volume': volume,
-            'pair': pair,
-            'request_id': generate_request_id(),
-        }
+        self.logger.debug('Executing limit_sell with price: %s, volume: %s, pair: %s', price, volume, pair)
 
+        payload = self._get_create_order_payload(SELL, price, volume, pair)
         headers = self.get_signed_headers(payload)
 
-        response = await self.send_post_request_and_get_response(url, payload, headers)
+        return await self._send_create_order(payload, headers, 'limit_sell')
 
-        if 'data' in response and 'id' in response['data']:
-            self.logger.debug('limit_sell Succeeded for order id {}'.format(response['data']['id']))
-            return response['data']['id']
 
-        raise APIResponseError('limit_sell Failed. Response {}'.format(response))
+    async def place_orders(self, orders: List[OrderRequest], concurrency: int = DEFAULT_BATCH_CONCURRENCY) -> BatchOrderResult:
+        self.logger.debug('Executing place_orders for %s orders', len(orders))
+        start_time = time.perf_counter()
 
+        # Build and sign every payload before sending anything, so the requests can go out back to back
+        payloads = []
+        for order in orders:
+            pair = order.pair if order.pair is not None else self.default_pair
+            if order.buy_or_sell not in (BUY, SELL):
+                raise ValueError("buy_or_sell must be BUY or SELL. Got {}".format(order.buy_or_sell))
+            payloads.append(self._get_create_order_payload(order.buy_or_sell, float_to_string(order.price),
+                                                           float_to_string(order.volume), pair))
 
-    async def get_order_history(self) -> List[Dict]:
+        if len(payloads) > 0 and self.token is None:
+            raise HeaderCreationError("Cannot create signed headers because we don't have our token. Make sure you are logged in first.")
+        signatures = self.get_sigs_from_payloads(payloads)
+        signed_requests = [(payload, {'login-token': self.token, 'x-auth-sign': signature})
+                           for payload, signature in zip(payloads, signatures)]
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def send(payload, headers):
+            async with semaphore:
+                return await self._send_create_order(payload, headers, 'place_orders')
+
+        results = await asyncio.gather(*[send(payload, headers) for payload, headers in signed_requests],
+                                       return_exceptions=True)
+
+        wall_time = time.perf_counter() - start_time
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug('place_orders placed %s of %s orders in %.3fs',
+                              len([r for r in results if not isinstance(r, Exception)]), len(orders), wall_time)
+        return BatchOrderResult(results, wall_time)
+
+
+    async def get_order_history(self) -> List[Union[Dict, Order]]:
         self.logger.debug('Executing get_order_history')
         url = self.base_url + 'private/history'
         payload = {
@@ -262,11 +653,13 @@ class AtomarsAlterdiceAPI(BaseLoggingService):
 
         if 'data' in response and 'list' in response['data']:
             self.logger.debug('get_order_history Succeeded')
+            if self.typed_returns:
+                return [Order.from_dict(order, self.amounts_in_satoshis) for order in response['data']['list']]
             return response['data']['list']
 
         raise APIResponseError('get_order_history Failed. Response {}'.format(response))
 
-    async def get_active_orders(self, pair: str = None) -> List[Dict]:
+    async def get_active_orders(self, pair: str = None) -> List[Union[Dict, Order]]:
         self.logger.debug('Executing get_active_orders')
         url = self.base_url + 'private/orders'
         payload = {
@@ -295,6 +688,9 @@ class AtomarsAlterdiceAPI(BaseLoggingService):
                     filtered_active_orders.append(order)
         else:
             filtered_active_orders = self.active_orders
+
+        if self.typed_returns:
+            return [Order.from_dict(order, self.amounts_in_satoshis) for order in filtered_active_orders]
         return filtered_active_orders
 
 
@@ -302,13 +698,20 @@ class AtomarsAlterdiceAPI(BaseLoggingService):
 
     async def delete_order(self, order_id: int) -> None:
         self.logger.debug('Executing delete_order')
-        url = self.base_url + 'private/delete-order'
-        payload = {
+        payload = self._get_delete_order_payload(order_id)
+        headers = self.get_signed_headers(payload)
+
+        await self._send_delete_order(payload, headers)
+
+    def _get_delete_order_payload(self, order_id: int) -> Dict:
+        return {
             'request_id': generate_request_id(),
             'order_id': order_id,
         }
 
-        headers = self.get_signed_headers(payload)
+    async def _send_delete_order(self, payload: Dict, headers: Dict) -> bool:
+        # Returns True if the order was deleted, and False if the exchange no longer had it
+        url = self.base_url + 'private/delete-order'
 
         # Don't reject errors automatically because an 'Order not found' means it was already deleted, which is a success.
         response = await self.send_post_request_and_get_response(url, payload, headers, check_response_for_errors= False)
@@ -316,9 +719,16 @@ class AtomarsAlterdiceAPI(BaseLoggingService):
         if 'status' in response:
             if response['status'] == True:
                 self.logger.debug('delete_order Succeeded')
+                if self.balance_cache is not None:
+                    self.balance_cache.release(payload['order_id'])
+                return True
             else:
                 if response['status'] == False and response['error'] == 'Order not found':
                     self.logger.debug('delete_order Succeeded - order already deleted')
+                    # It was most likely filled, which changed the balances
+                    if self.balance_cache is not None:
+                        self.balance_cache.forget([payload['order_id']])
+                    return False
                 else:
                     raise APIExecutionError('delete_order Failed. Response {}'.format(response))
         else:
@@ -339,109 +749,273 @@ class AtomarsAlterdiceAPI(BaseLoggingService):
         self.logger.debug('get_ticker_list Succeeded')
         return response['data']
 
+    async def get_pairs(self) -> Dict[str, Dict]:
+        '''
+        The tickers from get_ticker_list by pair. They are cached for ticker_list_ttl seconds.
+        '''
+        return copy_json(await self._get_pairs())
+
+    async def _get_pairs(self) -> Dict[str, Dict]:
+        return await self.ticker_list_cache.get_or_fetch('public/symbols', self._fetch_pairs)
+
+    async def _fetch_pairs(self) -> Dict[str, Dict]:
+        return {ticker['pair']: ticker for ticker in await self.get_ticker_list()}
+
+    async def validate_pairs(self, pairs: List[str]) -> None:
+        '''
+        Raises ValueError if any of the pairs isn't traded on the exchange, using the cached tickers
+        '''
+        known_pairs = await self._get_pairs()
+        unknown_pairs = [pair for pair in pairs if pair not in known_pairs]
+        if len(unknown_pairs) > 0:
+            raise ValueError("Unknown pairs: {}".format(', '.join(unknown_pairs)))
+
 
 
     async def get_order_book(self, pair: str = None) -> Dict:
         if pair is None:
             pair = self.default_pair
         url = self.base_url + 'public/book'
-        self.logger.debug('Executing get_order_book for pair {}'.format(pair))
+        self.logger.debug('Executing get_order_book for pair %s', pair)
         params = {
             'pair': pair,
         }
         response = await self.send_get_request_and_get_response(url, params)
 
         if 'data' not in response:
-            self.logger.debug('get_order_book Failed. Response {}'.format(response))
+            self.logger.debug('get_order_book Failed. Response %s', response)
 
         self.logger.debug('get_order_book Succeeded')
+        if self.typed_returns:
+            return {side: [BookLevel.from_dict(level, self.amounts_in_satoshis) for level in levels]
+                    for side, levels in response['data'].items()}
         return response['data']
 
     #
     # Helper functions
     #
 
-    async def delete_all_orders(self, pair: str = None, buy_or_sell: int = None) -> None:
-        # Made it async
+    async def delete_all_orders(self, pair: str = None, buy_or_sell: int = None) -> CancelResult:
         if pair is None:
             pair = self.default_pair
-        self.logger.debug('Executing async_delete_all_orders for pair {}'.format(pair))
-
-        #refresh our active orders
-        active_orders = await self.get_active_orders()
-        tasks = []
-        for order in active_orders:
-            if order['pair'] == pair:
-                if buy_or_sell is not None:
-                    if order['type'] == buy_or_sell:
-                        tasks.append(asyncio.ensure_future(self.delete_order(order['id'])))
-                else:
-                    tasks.append(asyncio.ensure_future(self.delete_order(order['id'])))
+        self.logger.debug('Executing delete_all_orders for pair %s', pair)
+
+        result = await self.cancel_orders([pair], buy_or_sell)
+        for order_id, error in result.failed.items():
+            self.logger.warning('delete_all_orders failed to delete order %s: %s', order_id, error)
+        return result
+
+    async def cancel_orders(self,
+                            pairs: Union[str, List[str], None] = None,
+                            buy_or_sell: int = None,
+                            min_price: Union[float, str, Decimal] = None,
+                            max_price: Union[float, str, Decimal] = None,
+                            concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+                            verify: bool = False) -> CancelResult:
+        '''
+        Cancels every active order on the given pairs, or on all pairs if pairs is None. Only orders on the
+        buy_or_sell side and with a rate between min_price and max_price, inclusive, are cancelled when those
+        are given. At most concurrency cancels are in flight at once. If verify is True, the active orders are
+        fetched again afterwards and any targeted order that is still there is reported in still_active.
+        '''
+        if isinstance(pairs, str):
+            pairs = [pairs]
+        pairs = set(pairs) if pairs is not None else None
+        min_price = to_decimal(min_price) if min_price is not None else None
+        max_price = to_decimal(max_price) if max_price is not None else None
+        self.logger.debug('Executing cancel_orders for pairs %s', 'all' if pairs is None else pairs)
+
+        order_ids = []
+        for order in await self.get_active_orders():
+            if pairs is not None and order['pair'] not in pairs:
+                continue
+            if buy_or_sell is not None and order['type'] != buy_or_sell:
+                continue
+            if min_price is not None or max_price is not None:
+                rate = self._get_order_rate(order)
+                if (min_price is not None and rate < min_price) or (max_price is not None and rate > max_price):
+                    continue
+            order_ids.append(order['id'])
+
+        return await self.cancel_order_ids(order_ids, concurrency, verify)
+
+    async def cancel_order_ids(self, order_ids: List[int], concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+                               verify: bool = False) -> CancelResult:
+        '''
+        Cancels the given orders, at most concurrency at a time, and reports which were cancelled, which the
+        exchange no longer had, and which failed.
+        '''
+        start_time = time.perf_counter()
+
+        # Sign every payload before sending anything, so the cancels can go out back to back
+        payloads = [self._get_delete_order_payload(order_id) for order_id in order_ids]
+        if len(payloads) > 0 and self.token is None:
+            raise HeaderCreationError("Cannot create signed headers because we don't have our token. Make sure you are logged in first.")
+        signatures = self.get_sigs_from_payloads(payloads)
 
-        # Just async.wait all of the delete_orders directly
-        if len(tasks) > 0:
-            await asyncio.wait(tasks, return_when=asyncio.ALL_COMPLETED)
+        semaphore = asyncio.Semaphore(concurrency)
 
-    async def is_order_complete(self, order_id: int) -> bool:
+        async def send(payload, signature):
+            async with semaphore:
+                return await self._send_delete_order(payload, {'login-token': self.token, 'x-auth-sign': signature})
+
+        results = await asyncio.gather(*[send(payload, signature) for payload, signature in zip(payloads, signatures)],
+                                       return_exceptions=True)
+
+        cancelled = []
+        already_gone = []
+        failed = {}
+        for order_id, result in zip(order_ids, results):
+            if isinstance(result, Exception):
+                failed[order_id] = result
+            elif result:
+                cancelled.append(order_id)
+            else:
+                already_gone.append(order_id)
+
+        still_active = None
+        if verify:
+            targeted_order_ids = set(order_ids)
+            still_active = [order['id'] for order in await self.get_active_orders() if order['id'] in targeted_order_ids]
+
+        wall_time = time.perf_counter() - start_time
+        self.logger.debug('cancel_order_ids cancelled %s, already gone %s, failed %s in %.3fs',
+                          len(cancelled), len(already_gone), len(failed), wall_time)
+        return CancelResult(cancelled, already_gone, failed, still_active, wall_time)
+
+    def _get_order_rate(self, order: Union[Dict, Order]) -> Decimal:
+        # Typed orders are already in coins, raw orders can be floats, Decimals or satoshis depending on the decoder
+        if isinstance(order, Order):
+            return order.rate
+        if self.amounts_in_satoshis:
+            return satoshis_to_decimal(order['rate'])
+        return to_decimal(order['rate'])
+
+    async def refresh_order_history(self) -> List[Dict]:
+        # Concurrent refreshes share one request
+        if self._order_history_refresh is None or self._order_history_refresh.done():
+            self._order_history_refresh = asyncio.ensure_future(self._refresh_order_history())
+        return await asyncio.shield(self._order_history_refresh)
+
+    async def _refresh_order_history(self) -> List[Dict]:
         order_history = await self.get_order_history()
+        new_orders = self.order_history_store.update(order_history)
+        if self.balance_cache is not None:
+            self.balance_cache.forget(order['id'] for order in new_orders)
+        self.logger.debug('refresh_order_history found %s new orders', len(new_orders))
+        return new_orders
 
-        for order in order_history:
-            if order['id'] == order_id:
-                return True
-        return False
+    async def are_orders_complete(self, order_ids: List[int]) -> Dict[int, bool]:
+        # Completed orders stay in the local store, so we only fetch the history if some ids aren't in it yet
+        if len(self.order_history_store.get_missing_order_ids(order_ids)) > 0:
+            await self.refresh_order_history()
 
-    async def get_lowest_sell(self, pair: str = None, order_book: Dict = None) -> Decimal:
-        if pair is None:
-            pair = self.default_pair
+        return {order_id: order_id in self.order_history_store for order_id in order_ids}
+
+    async def is_order_complete(self, order_id: int) -> bool:
+        complete = await self.are_orders_complete([order_id])
+        return complete[order_id]
+
+    async def get_order_books(self, pairs: List[str], concurrency: int = DEFAULT_BOOK_CONCURRENCY,
+                              validate: bool = False) -> MarketSnapshot:
+        '''
+        Fetches the order books of all the pairs at once, at most concurrency at a time, and parses each of them
+        once. If validate is True, a ValueError is raised before anything is fetched if any pair is unknown.
+        '''
+        start_time = time.perf_counter()
+        # Each pair is fetched once, even if it was asked for twice
+        pairs = list(dict.fromkeys(pairs))
+        if validate:
+            await self.validate_pairs(pairs)
+        self.logger.debug('Executing get_order_books for %s pairs', len(pairs))
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(pair):
+            async with semaphore:
+                return await self._fetch_book_snapshot(pair)
+
+        results = await asyncio.gather(*[fetch(pair) for pair in pairs], return_exceptions=True)
+
+        books = {}
+        failed = {}
+        for pair, result in zip(pairs, results):
+            if isinstance(result, Exception):
+                failed[pair] = result
+            else:
+                books[pair] = result
+
+        wall_time = time.perf_counter() - start_time
+        self.logger.debug('get_order_books fetched %s, failed %s in %.3fs', len(books), len(failed), wall_time)
+        return MarketSnapshot(books, failed, wall_time)
+
+    async def _fetch_book_snapshot(self, pair: str) -> BookSnapshot:
+        # The raw response is parsed straight into an OrderBook, without making BookLevel objects first
+        url = self.base_url + 'public/book'
+        response = await self.send_get_request_and_get_response(url, {'pair': pair})
+        fetched_at = time.time()
+
+        if 'data' not in response:
+            raise APIResponseError('get_order_books Failed for pair {}. Response {}'.format(pair, response))
+
+        return BookSnapshot(OrderBook.from_order_book(response['data'], self.amounts_in_satoshis), fetched_at)
+
+    async def get_top_of_book(self, pairs: List[str], concurrency: int = DEFAULT_BOOK_CONCURRENCY,
+                              validate: bool = False) -> MarketSnapshot:
+        '''
+        The lowest sell and highest buy of each pair, from get_order_books
+        '''
+        snapshot = await self.get_order_books(pairs, concurrency, validate)
+        tops = {pair: TopOfBook(book.best_ask, book.best_bid, book.fetched_at) for pair, book in snapshot.books.items()}
+        return MarketSnapshot(tops, snapshot.failed, snapshot.wall_time)
+
+    async def get_parsed_order_book(self, pair: str = None) -> OrderBook:
+        order_book = await self.get_order_book(pair)
+        return self._parse_order_book(order_book)
+
+    def _parse_order_book(self, order_book: Dict) -> OrderBook:
+        # Typed levels have already been converted to coins
+        return OrderBook.from_order_book(order_book, self.amounts_in_satoshis and not self.typed_returns)
 
+    async def _get_parsed_order_book(self, pair: str, order_book: Union[Dict, OrderBook, None]) -> OrderBook:
         if order_book is None:
-            order_book = await self.get_order_book(pair)
+            return await self.get_parsed_order_book(pair)
+        if isinstance(order_book, OrderBook):
+            return order_book
+        return self._parse_order_book(order_book)
 
-        sell_prices = [to_decimal(x['rate']) for x in order_book['sell']]
-        sell_prices.sort()
+    async def get_lowest_sell(self, pair: str = None, order_book: Union[Dict, OrderBook] = None) -> Decimal:
+        if pair is None:
+            pair = self.default_pair
 
-        if len(sell_prices) == 0:
+        order_book = await self._get_parsed_order_book(pair, order_book)
+
+        if order_book.best_ask is None:
             raise APIExecutionError("We were unable to get the lowest sell because there are no sell orders")
 
-        return sell_prices[0]
+        return order_book.best_ask
 
-    async def get_highest_buy(self, pair: str = None, order_book: Dict = None) -> Decimal:
+    async def get_highest_buy(self, pair: str = None, order_book: Union[Dict, OrderBook] = None) -> Decimal:
         if pair is None:
             pair = self.default_pair
 
-        if order_book is None:
-            order_book = await self.get_order_book(pair)
-
-        buy_prices = [to_decimal(x['rate']) for x in order_book['buy']]
-        buy_prices.sort()
+        order_book = await self._get_parsed_order_book(pair, order_book)
 
-        if len(buy_prices) == 0:
+        if order_book.best_bid is None:
             raise APIExecutionError("We were unable to get the highest buy because there are no buy orders")
 
-        return buy_prices[-1]
+        return order_book.best_bid
 
-    async def get_lowest_sell_and_highest_buy(self, pair: str = None, order_book: Dict = None) -> Tuple[Optional[Decimal], Optional[Decimal]]:
+    async def get_lowest_sell_and_highest_buy(self, pair: str = None, order_book: Union[Dict, OrderBook] = None) -> Tuple[Optional[Decimal], Optional[Decimal]]:
         if pair is None:
             pair = self.default_pair
 
-        if order_book is None:
-            order_book = await self.get_order_book(pair)
+        order_book = await self._get_parsed_order_book(pair, order_book)
 
-        try:
-            highest_buy = await self.get_highest_buy(pair, order_book)
-        except APIExecutionError:
-            highest_buy = None
-
-        try:
-            lowest_sell = await self.get_lowest_sell(pair, order_book)
-        except APIExecutionError:
-            lowest_sell = None
+        highest_buy = order_book.best_bid
+        lowest_sell = order_book.best_ask
 
         if highest_buy is None and lowest_sell is None:
             raise APIExecutionError("We were unable to get the highest buy and lowest sell because there are no orders")
 
         return lowest_sell, highest_buy
-
-
-
-
@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+
+class BalanceCache():
+    '''
+    A local copy of the private/balances response that is served for ttl seconds. Orders placed through the API
+    reserve their amount from the cached available balance straight away, and the reservation is remembered by
+    order id so that it can be given back when the order is cancelled. Concurrent fetches share one request.
+    '''
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        # order id to (currency, satoshis held by the order)
+        self.reservations = {}
+        self._balances = None
+        self._expires_at = 0
+        self._in_flight = None
+        # Bumped on every local change, so that a fetch that was sent before the change isn't cached over it
+        self._version = 0
+
+    def get(self) -> Optional[Dict]:
+        if self._balances is None or self._expires_at < time.monotonic():
+            return None
+        return self._balances
+
+    def set(self, balances: Dict, version: int = None) -> None:
+        if self.ttl <= 0 or (version is not None and version != self._version):
+            return
+        self._balances = balances
+        self._expires_at = time.monotonic() + self.ttl
+
+    def invalidate(self) -> None:
+        self._balances = None
+        self._version += 1
+
+    async def get_or_fetch(self, fetch: Callable[[], Awaitable[Dict]]) -> Dict:
+        balances = self.get()
+        if balances is not None:
+            self.hits += 1
+            return balances
+
+        if self._in_flight is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            version = self._version
+            self._in_flight = asyncio.ensure_future(fetch())
+            self._in_flight.add_done_callback(lambda f: self._on_fetch_done(f, version))
+
+        # Shield so that one caller being cancelled doesn't cancel the request for everyone else waiting on it
+        return await asyncio.shield(self._in_flight)
+
+    def _on_fetch_done(self, future: asyncio.Future, version: int) -> None:
+        self._in_flight = None
+        if not future.cancelled() and future.exception() is None:
+            self.set(future.result(), version)
+
+    def reserve(self, order_id: int, currency: str, amount: int) -> None:
+        '''
+        Holds amount satoshis of currency for an order that was just placed
+        '''
+        self.reservations[order_id] = (currency, amount)
+        self._adjust_available(currency, -amount)
+
+    def release(self, order_id: int) -> Optional[Tuple[str, int]]:
+        '''
+        Gives back what a cancelled order held. Returns the reservation, or None if there wasn't one.
+        '''
+        reservation = self.reservations.pop(order_id, None)
+        if reservation is not None:
+            currency, amount = reservation
+            self._adjust_available(currency, amount)
+        return reservation
+
+    def forget(self, order_ids: Iterable[int]) -> None:
+        '''
+        Drops the reservations of orders that are done. Fills change the balances in ways we can't see, so the
+        cached balances are invalidated if any of them were ours.
+        '''
+        forgotten = False
+        for order_id in order_ids:
+            if self.reservations.pop(order_id, None) is not None:
+                forgotten = True
+        if forgotten:
+            self.invalidate()
+
+    def _adjust_available(self, currency: str, amount: int) -> None:
+        self._version += 1
+        if self._balances is not None and currency in self._balances:
+            balance = self._balances[currency]
+            balance['balance_available'] = balance['balance_available'] + amount
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'entries': 0 if self._balances is None else 1,
+            'reservations': len(self.reservations),
+        }
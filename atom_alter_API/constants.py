@@ -8,12 +8,63 @@ BUY = 0
 SELL = 1
 buy_or_sell_strings = ['buy', 'sell']
 
+#status
+ORDER_STATUS_ACTIVE = 1
+ORDER_STATUS_FILLED = 2
+ORDER_STATUS_CANCELLED = 3
+
 # Decimal precision
 NUM_DECIMALS = 8
 SATOSHI = Decimal("0.00000001")
+SATOSHIS_PER_COIN = 10 ** NUM_DECIMALS
 
 #
 # Networking
 #
 
-HTTP_STATUS_SUCCESS = 200
\ No newline at end of file
+HTTP_STATUS_SUCCESS = 200
+
+# Connection pool defaults
+DEFAULT_CONNECTION_LIMIT = 100
+DEFAULT_CONNECTION_LIMIT_PER_HOST = 0
+DEFAULT_KEEPALIVE_TIMEOUT = 30
+DEFAULT_DNS_CACHE_TTL = 300
+
+# Public endpoint cache defaults
+DEFAULT_CACHE_MAX_ENTRIES = 256
+
+# Maximum number of requests in flight at once for batch operations
+DEFAULT_BATCH_CONCURRENCY = 10
+
+# Maximum number of order books fetched at once by get_order_books, enough to sweep most markets in one round trip
+DEFAULT_BOOK_CONCURRENCY = 32
+
+# Seconds that the pairs from get_ticker_list are cached for
+DEFAULT_TICKER_LIST_TTL = 300
+
+# Request priorities for the rate limiter. Lower goes first.
+PRIORITY_CANCEL = 0
+PRIORITY_CREATE = 1
+PRIORITY_READ = 2
+
+ENDPOINT_PRIORITIES = {
+    'login': PRIORITY_CANCEL,
+    'private/delete-order': PRIORITY_CANCEL,
+    'private/create-order': PRIORITY_CREATE,
+}
+
+# Retry defaults
+DEFAULT_RETRY_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_BASE_DELAY = 0.1
+DEFAULT_RETRY_MAX_DELAY = 2
+
+# Market data recorder segments are started again once they are larger than this
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+
+# Order watcher polling intervals in seconds
+DEFAULT_WATCHER_MIN_INTERVAL = 0.5
+DEFAULT_WATCHER_MAX_INTERVAL = 10
+DEFAULT_WATCHER_BACKOFF_FACTOR = 2
+
+# Seconds that a blocking call on SyncAtomarsAlterdiceAPI waits before giving up
+DEFAULT_SYNC_TIMEOUT = 30
@@ -0,0 +1,152 @@
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+from .utils.mathematical import to_decimal, satoshi_to_actual, satoshis_to_decimal
+
+#
+# Compact typed records for API responses. They use __slots__ instead of a dict per record, and keep the
+# values as the API sent them until a price or amount is read, when it is converted to Decimal once.
+# They also support record['key'] and record.get('key') so they can be used where the raw dicts were.
+# from_dict(..., in_satoshis=True) takes prices and amounts decoded as integer satoshis and converts them
+# to whole coins straight away.
+#
+
+def _from_satoshis(value, in_satoshis: bool):
+    if not in_satoshis or value is None:
+        return value
+    return satoshis_to_decimal(value)
+
+
+class BaseModel():
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__ and ('_' + key) not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__ or ('_' + key) in self.__slots__
+
+    def _get_decimal(self, slot: str) -> Optional[Decimal]:
+        value = getattr(self, slot)
+        if value is None or type(value) is Decimal:
+            return value
+        value = to_decimal(value)
+        setattr(self, slot, value)
+        return value
+
+    def to_dict(self) -> Dict:
+        return {key.lstrip('_'): getattr(self, key.lstrip('_')) for key in self.__slots__}
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return '{}({})'.format(self.__class__.__name__,
+                               ', '.join('{}={!r}'.format(k, v) for k, v in self.to_dict().items()))
+
+
+class Order(BaseModel):
+    __slots__ = ('id', 'pair', 'type', 'type_trade', 'status', 'time_create', 'time_done',
+                 '_rate', '_volume', '_price', '_price_done', '_volume_done')
+
+    def __init__(self, id: int, pair: str, type: int, type_trade: int, status: int, time_create: int,
+                 time_done: Optional[int], rate, volume, price, price_done, volume_done):
+        self.id = id
+        self.pair = pair
+        self.type = type
+        self.type_trade = type_trade
+        self.status = status
+        self.time_create = time_create
+        self.time_done = time_done
+        self._rate = rate
+        self._volume = volume
+        self._price = price
+        self._price_done = price_done
+        self._volume_done = volume_done
+
+    @classmethod
+    def from_dict(cls, order: Dict, in_satoshis: bool = False) -> 'Order':
+        return cls(order['id'], order['pair'], order['type'], order['type_trade'], order['status'],
+                   order['time_create'], order.get('time_done'),
+                   _from_satoshis(order['rate'], in_satoshis),
+                   _from_satoshis(order['volume'], in_satoshis),
+                   _from_satoshis(order.get('price'), in_satoshis),
+                   _from_satoshis(order.get('price_done'), in_satoshis),
+                   _from_satoshis(order.get('volume_done'), in_satoshis))
+
+    @property
+    def rate(self) -> Decimal:
+        return self._get_decimal('_rate')
+
+    @property
+    def volume(self) -> Decimal:
+        return self._get_decimal('_volume')
+
+    @property
+    def price(self) -> Optional[Decimal]:
+        return self._get_decimal('_price')
+
+    @property
+    def price_done(self) -> Optional[Decimal]:
+        return self._get_decimal('_price_done')
+
+    @property
+    def volume_done(self) -> Optional[Decimal]:
+        return self._get_decimal('_volume_done')
+
+
+class Balance(BaseModel):
+    '''
+    Balances are in satoshis, like the API sends them. Use balance_actual and balance_available_actual for
+    the amounts in whole coins.
+    '''
+    __slots__ = ('currency', 'name', 'balance', 'balance_available')
+
+    def __init__(self, currency: str, name: str, balance: int, balance_available: int):
+        self.currency = currency
+        self.name = name
+        self.balance = balance
+        self.balance_available = balance_available
+
+    @classmethod
+    def from_dict(cls, balance: Dict) -> 'Balance':
+        currency = balance.get('currency', {})
+        return cls(currency.get('iso3'), currency.get('name'), balance['balance'], balance['balance_available'])
+
+    @property
+    def balance_actual(self) -> Decimal:
+        return satoshi_to_actual(self.balance)
+
+    @property
+    def balance_available_actual(self) -> Decimal:
+        return satoshi_to_actual(self.balance_available)
+
+
+class BookLevel(BaseModel):
+    __slots__ = ('count', '_rate', '_volume')
+
+    def __init__(self, rate, volume, count: int = 1):
+        self.count = count
+        self._rate = rate
+        self._volume = volume
+
+    @classmethod
+    def from_dict(cls, level: Dict, in_satoshis: bool = False) -> 'BookLevel':
+        return cls(_from_satoshis(level['rate'], in_satoshis), _from_satoshis(level['volume'], in_satoshis),
+                   level.get('count', 1))
+
+    @property
+    def rate(self) -> Decimal:
+        return self._get_decimal('_rate')
+
+    @property
+    def volume(self) -> Decimal:
+        return self._get_decimal('_volume')
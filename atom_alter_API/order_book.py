@@ -0,0 +1,134 @@
+from bisect import bisect_left
+from decimal import Decimal
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from .constants import BUY, SELL
+from .utils.mathematical import to_decimal, satoshis_to_decimal
+
+
+class OrderBook():
+    '''
+    An order book parsed once from a get_order_book response. Each side is kept as a list of Decimal prices
+    sorted from low to high with a parallel list of volumes, so the top of the book can be read in O(1) and any
+    price level can be found in O(log n).
+
+    If in_satoshis is True, the rates and volumes of the levels are integer satoshis, as decoded by
+    make_satoshi_json_loads, and are converted to whole coins.
+    '''
+    __slots__ = ('bid_prices', 'bid_volumes', 'ask_prices', 'ask_volumes')
+
+    def __init__(self, buy: List[Dict], sell: List[Dict], in_satoshis: bool = False):
+        self.bid_prices, self.bid_volumes = self._build_side(buy, in_satoshis)
+        self.ask_prices, self.ask_volumes = self._build_side(sell, in_satoshis)
+
+    @classmethod
+    def from_order_book(cls, order_book: Dict, in_satoshis: bool = False) -> 'OrderBook':
+        return cls(order_book.get('buy', []), order_book.get('sell', []), in_satoshis)
+
+    @staticmethod
+    def _build_side(levels: List[Dict], in_satoshis: bool) -> Tuple[List[Decimal], List[Decimal]]:
+        convert = satoshis_to_decimal if in_satoshis else to_decimal
+        # Levels with the same price are merged
+        volume_by_price = {}
+        for level in levels:
+            price = convert(level['rate'])
+            volume_by_price[price] = volume_by_price.get(price, Decimal(0)) + convert(level['volume'])
+
+        prices = sorted(volume_by_price)
+        volumes = [volume_by_price[price] for price in prices]
+        return prices, volumes
+
+    #
+    # Top of book
+    #
+    @property
+    def best_bid(self) -> Optional[Decimal]:
+        return self.bid_prices[-1] if self.bid_prices else None
+
+    @property
+    def best_ask(self) -> Optional[Decimal]:
+        return self.ask_prices[0] if self.ask_prices else None
+
+    @property
+    def spread(self) -> Optional[Decimal]:
+        if not self.bid_prices or not self.ask_prices:
+            return None
+        return self.ask_prices[0] - self.bid_prices[-1]
+
+    @property
+    def mid(self) -> Optional[Decimal]:
+        if not self.bid_prices or not self.ask_prices:
+            return None
+        return (self.ask_prices[0] + self.bid_prices[-1]) / 2
+
+    #
+    # Price levels
+    #
+    def get_side(self, buy_or_sell: int) -> Tuple[List[Decimal], List[Decimal]]:
+        if buy_or_sell == BUY:
+            return self.bid_prices, self.bid_volumes
+        elif buy_or_sell == SELL:
+            return self.ask_prices, self.ask_volumes
+        raise ValueError("buy_or_sell must be BUY or SELL. Got {}".format(buy_or_sell))
+
+    def get_volume_at_price(self, buy_or_sell: int, price) -> Decimal:
+        prices, volumes = self.get_side(buy_or_sell)
+        price = to_decimal(price)
+        index = bisect_left(prices, price)
+        if index < len(prices) and prices[index] == price:
+            return volumes[index]
+        return Decimal(0)
+
+    def __len__(self) -> int:
+        return len(self.bid_prices) + len(self.ask_prices)
+
+    def __repr__(self) -> str:
+        return 'OrderBook(best_bid={}, best_ask={}, levels={})'.format(self.best_bid, self.best_ask, len(self))
+
+
+class BookSnapshot(NamedTuple):
+    '''
+    An order book from AtomarsAlterdiceAPI.get_order_books, with the time.time() at which its response arrived
+    '''
+    order_book: OrderBook
+    fetched_at: float
+
+    @property
+    def best_bid(self) -> Optional[Decimal]:
+        return self.order_book.best_bid
+
+    @property
+    def best_ask(self) -> Optional[Decimal]:
+        return self.order_book.best_ask
+
+
+class TopOfBook(NamedTuple):
+    '''
+    The best prices of a pair from AtomarsAlterdiceAPI.get_top_of_book. A side with no orders is None.
+    '''
+    best_ask: Optional[Decimal]
+    best_bid: Optional[Decimal]
+    fetched_at: float
+
+
+class MarketSnapshot(NamedTuple):
+    '''
+    The result of AtomarsAlterdiceAPI.get_order_books and get_top_of_book. books maps each pair that was fetched to
+    its BookSnapshot or TopOfBook, in the order the pairs were requested, and failed maps each pair that wasn't to
+    the exception raised when fetching it.
+    '''
+    books: Dict[str, Union[BookSnapshot, TopOfBook]]
+    failed: Dict[str, Exception]
+    wall_time: float
+
+    @property
+    def all_succeeded(self) -> bool:
+        return len(self.failed) == 0
+
+    @property
+    def skew(self) -> float:
+        # How far apart in time the first and last books were fetched
+        if len(self.books) == 0:
+            return 0.0
+        fetched_at = [book.fetched_at for book in self.books.values()]
+        return max(fetched_at) - min(fetched_at)
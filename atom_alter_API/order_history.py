@@ -0,0 +1,63 @@
+from typing import Dict, Iterable, List, Optional, Set
+
+
+class OrderHistoryStore():
+    '''
+    A local copy of the order history, indexed by order id, pair and status. It is filled incrementally from
+    get_order_history responses: orders whose id is already stored are skipped. Orders in the history are done,
+    so once an id is stored it never needs to be fetched again.
+    '''
+
+    def __init__(self):
+        self.orders_by_id = {}
+        self.order_ids_by_pair = {}
+        self.order_ids_by_status = {}
+        self.latest_time_done = None
+
+    def __len__(self) -> int:
+        return len(self.orders_by_id)
+
+    def __contains__(self, order_id: int) -> bool:
+        return order_id in self.orders_by_id
+
+    def update(self, order_history: List[Dict]) -> List[Dict]:
+        '''
+        Merges a get_order_history response into the store and returns the orders that were new.
+        '''
+        new_orders = []
+        for order in order_history:
+            # The exchange doesn't guarantee the order of the list, so every order is checked by id
+            if order['id'] in self.orders_by_id:
+                continue
+
+            self._add(order)
+            new_orders.append(order)
+            time_done = order.get('time_done')
+            if time_done is not None and (self.latest_time_done is None or time_done > self.latest_time_done):
+                self.latest_time_done = time_done
+
+        return new_orders
+
+    def _add(self, order: Dict) -> None:
+        order_id = order['id']
+        self.orders_by_id[order_id] = order
+        self.order_ids_by_pair.setdefault(order['pair'], set()).add(order_id)
+        self.order_ids_by_status.setdefault(order['status'], set()).add(order_id)
+
+    def get_order(self, order_id: int) -> Optional[Dict]:
+        return self.orders_by_id.get(order_id)
+
+    def get_orders_for_pair(self, pair: str) -> List[Dict]:
+        return [self.orders_by_id[order_id] for order_id in self.order_ids_by_pair.get(pair, ())]
+
+    def get_orders_with_status(self, status: int) -> List[Dict]:
+        return [self.orders_by_id[order_id] for order_id in self.order_ids_by_status.get(status, ())]
+
+    def get_missing_order_ids(self, order_ids: Iterable[int]) -> Set[int]:
+        return {order_id for order_id in order_ids if order_id not in self.orders_by_id}
+
+    def clear(self) -> None:
+        self.orders_by_id.clear()
+        self.order_ids_by_pair.clear()
+        self.order_ids_by_status.clear()
+        self.latest_time_done = None
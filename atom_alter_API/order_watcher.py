@@ -0,0 +1,214 @@
+import asyncio
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Union, TYPE_CHECKING
+
+from .constants import (
+    ORDER_STATUS_FILLED,
+    DEFAULT_WATCHER_MIN_INTERVAL,
+    DEFAULT_WATCHER_MAX_INTERVAL,
+    DEFAULT_WATCHER_BACKOFF_FACTOR)
+from .models import Order
+from .utils.logging import BaseLoggingService
+
+if TYPE_CHECKING:
+    from .api import AtomarsAlterdiceAPI
+
+
+class OrderFilled(NamedTuple):
+    order_id: int
+    order: Union[Dict, Order]
+
+
+class OrderPartiallyFilled(NamedTuple):
+    '''
+    order is the active order with its new volume_done
+    '''
+    order_id: int
+    order: Union[Dict, Order]
+    previous_volume_done: Any
+
+
+class OrderCancelled(NamedTuple):
+    '''
+    order is the order from the order history. Its volume_done is how much was filled before it was cancelled.
+    '''
+    order_id: int
+    order: Union[Dict, Order]
+
+
+OrderEvent = Union[OrderFilled, OrderPartiallyFilled, OrderCancelled]
+
+# Put on the event queue when the watcher stops, to end the iteration
+_STOPPED = object()
+
+
+class OrderWatcher(BaseLoggingService):
+    '''
+    Polls the active orders in the background and yields an event whenever one of them is filled, partially
+    filled or cancelled:
+
+        async with OrderWatcher(api) as watcher:
+            async for event in watcher:
+                ...
+
+    Each poll is diffed against the previous one by order id. The order history is only requested when an
+    order disappears from the active orders, to find out whether it was filled or cancelled. While orders are
+    open the active orders are polled every min_interval seconds. When there are none, the interval is
+    multiplied by backoff_factor after each poll, up to max_interval.
+
+    Orders that are filled between two polls never show up as active. Pass their ids to watch() straight after
+    placing them so that they are still reported.
+    '''
+
+    def __init__(self,
+                 api: 'AtomarsAlterdiceAPI',
+                 pair: str = None,
+                 min_interval: float = DEFAULT_WATCHER_MIN_INTERVAL,
+                 max_interval: float = DEFAULT_WATCHER_MAX_INTERVAL,
+                 backoff_factor: float = DEFAULT_WATCHER_BACKOFF_FACTOR):
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError("Need 0 < min_interval <= max_interval. Got {} and {}".format(min_interval, max_interval))
+        self.api = api
+        self.pair = pair
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.interval = min_interval
+
+        # Order id to the volume_done of the last poll, for orders that are still open
+        self.open_orders = {}
+        # Order ids that have been placed but not seen in a poll yet
+        self.pending_order_ids = set()
+
+        self._events = asyncio.Queue()
+        self._wake = None
+        self._stopping = False
+        self._task = None
+
+    #
+    # Lifecycle
+    #
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._stopping = False
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        # The flag ends the loop even if the cancel arrives just as the task stops waiting and is lost
+        self._stopping = True
+        self._wake.set()
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        self._events.put_nowait(_STOPPED)
+
+    async def __aenter__(self) -> 'OrderWatcher':
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.stop()
+
+    def __aiter__(self) -> 'OrderWatcher':
+        return self
+
+    async def __anext__(self) -> OrderEvent:
+        event = await self._events.get()
+        if event is _STOPPED:
+            raise StopAsyncIteration
+        return event
+
+    def watch(self, order_ids: Iterable[int]) -> None:
+        '''
+        Starts tracking orders that were just placed, and polls again right away.
+        '''
+        for order_id in order_ids:
+            if order_id not in self.open_orders:
+                self.pending_order_ids.add(order_id)
+        self.interval = self.min_interval
+        if self._wake is not None:
+            self._wake.set()
+
+    #
+    # Polling
+    #
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                num_events = await self.poll()
+            except Exception as e:
+                self.logger.warning('Polling orders failed: %s', e)
+                self.interval = min(self.max_interval, self.interval * self.backoff_factor)
+            else:
+                self._update_interval(num_events)
+
+            if not self._stopping:
+                self._wake.clear()
+                await self._sleep()
+
+    async def _sleep(self) -> None:
+        # Waits for the interval, or until watch() or stop() wakes us up
+        wake_task = asyncio.ensure_future(self._wake.wait())
+        try:
+            await asyncio.wait({wake_task}, timeout=self.interval)
+        finally:
+            wake_task.cancel()
+
+    def _update_interval(self, num_events: int) -> None:
+        if num_events > 0 or len(self.open_orders) > 0 or len(self.pending_order_ids) > 0:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff_factor)
+
+    async def poll(self) -> int:
+        '''
+        Fetches the active orders once, queues an event for every change and returns the number of events.
+        '''
+        active_orders = await self.api.get_active_orders(self.pair)
+        active_by_id = {order['id']: order for order in active_orders}
+
+        num_events = 0
+        for order_id, order in active_by_id.items():
+            volume_done = order['volume_done']
+            previous_volume_done = self.open_orders.get(order_id)
+            if previous_volume_done is not None and volume_done != previous_volume_done:
+                self._events.put_nowait(OrderPartiallyFilled(order_id, order, previous_volume_done))
+                num_events += 1
+            self.open_orders[order_id] = volume_done
+            self.pending_order_ids.discard(order_id)
+
+        finished_order_ids = [order_id for order_id in self.open_orders if order_id not in active_by_id]
+        finished_order_ids.extend(self.pending_order_ids)
+        if len(finished_order_ids) > 0:
+            num_events += await self._resolve_finished_orders(finished_order_ids)
+
+        return num_events
+
+    async def _resolve_finished_orders(self, order_ids: List[int]) -> int:
+        # Finished orders may already be in the local history. Otherwise share the request with any other
+        # refresh of the order history that is in flight.
+        if len(self.api.order_history_store.get_missing_order_ids(order_ids)) > 0:
+            await self.api.refresh_order_history()
+
+        num_events = 0
+        for order_id in order_ids:
+            order = self.api.order_history_store.get_order(order_id)
+            if order is None:
+                # The exchange hasn't moved it to the history yet, so try again next poll
+                continue
+
+            self.open_orders.pop(order_id, None)
+            self.pending_order_ids.discard(order_id)
+            if order['status'] == ORDER_STATUS_FILLED:
+                self._events.put_nowait(OrderFilled(order_id, order))
+            else:
+                self._events.put_nowait(OrderCancelled(order_id, order))
+            num_events += 1
+
+        return num_events
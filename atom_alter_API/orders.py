@@ -0,0 +1,51 @@
+from typing import Dict, List, NamedTuple, Optional, Union
+
+
+class OrderRequest(NamedTuple):
+    '''
+    A limit order to be placed with AtomarsAlterdiceAPI.place_orders. buy_or_sell is BUY or SELL.
+    If pair is None, the default pair is used.
+    '''
+    buy_or_sell: int
+    price: Union[float, str]
+    volume: Union[float, str]
+    pair: str = None
+
+
+class BatchOrderResult(NamedTuple):
+    '''
+    The result of AtomarsAlterdiceAPI.place_orders. results has one entry per requested order, in the same order.
+    Each entry is either the new order id, or the exception raised when placing that order.
+    '''
+    results: List[Union[int, Exception]]
+    wall_time: float
+
+    @property
+    def order_ids(self) -> List[int]:
+        return [result for result in self.results if not isinstance(result, Exception)]
+
+    @property
+    def errors(self) -> List[Exception]:
+        return [result for result in self.results if isinstance(result, Exception)]
+
+    @property
+    def all_succeeded(self) -> bool:
+        return len(self.errors) == 0
+
+
+class CancelResult(NamedTuple):
+    '''
+    The result of AtomarsAlterdiceAPI.cancel_orders and cancel_order_ids. already_gone are orders that the exchange
+    no longer had, because they were filled or cancelled first. failed maps order id to the exception raised
+    when cancelling it. still_active is None unless the cancel was verified, and then lists the orders that
+    were still in the active orders afterwards.
+    '''
+    cancelled: List[int]
+    already_gone: List[int]
+    failed: Dict[int, Exception]
+    still_active: Optional[List[int]]
+    wall_time: float
+
+    @property
+    def all_succeeded(self) -> bool:
+        return len(self.failed) == 0 and not self.still_active
@@ -0,0 +1,549 @@
+import heapq
+import itertools
+import random
+import time
+
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union, TYPE_CHECKING
+
+from .api import AtomarsAlterdiceAPI
+from .constants import (
+    BUY,
+    SELL,
+    LIMIT_TRADE,
+    SATOSHIS_PER_COIN,
+    HTTP_STATUS_SUCCESS,
+    ORDER_STATUS_ACTIVE,
+    ORDER_STATUS_FILLED,
+    ORDER_STATUS_CANCELLED)
+from .exceptions import BadRequestError
+from .order_book import OrderBook
+from .utils.mathematical import Satoshis, to_satoshis
+
+if TYPE_CHECKING:
+    from .recorder import MarketDataReader
+
+#
+# Paper trading without the network. MatchingEngine keeps the market order book of each pair, our own
+# resting limit orders and our balances, all in integer satoshis. PaperTradingAPI is an AtomarsAlterdiceAPI
+# that sends its requests to a MatchingEngine in the same process instead of to the exchange, so every
+# method of AtomarsAlterdiceAPI works the same way on it.
+#
+# The market order book stands for everyone else's orders. It is set with set_order_book, or replayed from
+# data recorded with MarketDataRecorder. A new order first takes any market liquidity it crosses, at the
+# market's price, and the rest of it rests in the book. Resting orders are filled at their own price when a
+# later market order book crosses them, best price first and then oldest first. Our own orders never trade
+# with each other.
+#
+
+PAPER_API_URL = 'paper://atomars/v1/'
+
+DEFAULT_PAPER_SYMBOLS = [
+    {'base': 'HLS', 'pair': 'HLSBTC', 'quote': 'BTC'},
+    {'base': 'HLS', 'pair': 'HLSETH', 'quote': 'ETH'},
+    {'base': 'HLS', 'pair': 'HLSUSDT', 'quote': 'USDT'},
+]
+
+NANOSECONDS_PER_SECOND = 10 ** 9
+
+
+def _ceil_div(numerator: int, denominator: int) -> int:
+    return -(-numerator // denominator)
+
+
+class PaperOrder():
+    '''
+    An order in the matching engine. rate, volume and volume_done are in satoshis. quote_done is the quote
+    currency paid for a buy, or received for a sell, so far. reserved is the balance that is still held for
+    the order: quote currency for a buy and base currency for a sell.
+    '''
+    __slots__ = ('id', 'pair', 'type', 'rate', 'volume', 'volume_done', 'notional_done', 'quote_done',
+                 'reserved', 'status', 'time_create', 'time_done', 'sequence')
+
+    def __init__(self, id: int, pair: str, type: int, rate: int, volume: int, reserved: int, time_create: int,
+                 sequence: int):
+        self.id = id
+        self.pair = pair
+        self.type = type
+        self.rate = rate
+        self.volume = volume
+        self.volume_done = 0
+        # Sum of price * volume of every fill, in satoshis squared, so that rounding happens once per order
+        self.notional_done = 0
+        self.quote_done = 0
+        self.reserved = reserved
+        self.status = ORDER_STATUS_ACTIVE
+        self.time_create = time_create
+        self.time_done = None
+        self.sequence = sequence
+
+    @property
+    def volume_left(self) -> int:
+        return self.volume - self.volume_done
+
+
+class _PairBook():
+    __slots__ = ('market_buy', 'market_sell', 'buy_keys', 'buy_orders', 'sell_keys', 'sell_orders', 'levels')
+
+    def __init__(self):
+        # [price, volume, count] of everyone else's orders. Buys from highest price, sells from lowest.
+        self.market_buy = []
+        self.market_sell = []
+        # Our resting orders in priority order, with their sort keys
+        self.buy_keys = []
+        self.buy_orders = []
+        self.sell_keys = []
+        self.sell_orders = []
+        # The combined book, until something changes
+        self.levels = None
+
+    def add_resting(self, order: PaperOrder) -> None:
+        if order.type == BUY:
+            key, keys, orders = (-order.rate, order.sequence), self.buy_keys, self.buy_orders
+        else:
+            key, keys, orders = (order.rate, order.sequence), self.sell_keys, self.sell_orders
+        index = bisect_left(keys, key)
+        keys.insert(index, key)
+        orders.insert(index, order)
+
+    def remove_resting(self, order: PaperOrder) -> None:
+        if order.type == BUY:
+            key, keys, orders = (-order.rate, order.sequence), self.buy_keys, self.buy_orders
+        else:
+            key, keys, orders = (order.rate, order.sequence), self.sell_keys, self.sell_orders
+        index = bisect_left(keys, key)
+        del keys[index]
+        del orders[index]
+
+    def get_levels(self) -> Tuple[List[Tuple[int, int, int]], List[Tuple[int, int, int]]]:
+        # Market levels with our resting orders added in, as (price, volume, count)
+        if self.levels is None:
+            self.levels = (self._merge(self.market_buy, self.buy_orders, True),
+                           self._merge(self.market_sell, self.sell_orders, False))
+        return self.levels
+
+    @staticmethod
+    def _merge(market_levels: List[List[int]], orders: List[PaperOrder], highest_first: bool) -> List[Tuple[int, int, int]]:
+        if len(orders) == 0:
+            return [tuple(level) for level in market_levels]
+
+        levels = {level[0]: [level[1], level[2]] for level in market_levels}
+        for order in orders:
+            level = levels.get(order.rate)
+            if level is None:
+                levels[order.rate] = [order.volume_left, 1]
+            else:
+                level[0] += order.volume_left
+                level[1] += 1
+        return [(price, volume, count) for price, (volume, count) in sorted(levels.items(), reverse=highest_first)]
+
+
+class MatchingEngine():
+    '''
+    A price-time priority matching engine for one account. Prices, volumes and balances are integer satoshis.
+    symbols is a get_ticker_list style list of {'base', 'pair', 'quote'} and balances maps currency to satoshis.
+    '''
+
+    def __init__(self, symbols: List[Dict[str, str]] = None, balances: Dict[str, int] = None):
+        self.symbols = {}
+        for symbol in (symbols if symbols is not None else DEFAULT_PAPER_SYMBOLS):
+            self.add_pair(symbol['pair'], symbol['base'], symbol['quote'])
+
+        # Currency to [balance, balance_available]
+        self.balances = {}
+        if balances is not None:
+            for currency, amount in balances.items():
+                self.deposit(currency, amount)
+
+        # Active orders by id, and finished orders in the order they finished
+        self.orders = {}
+        self.history = []
+
+        # Seconds since the epoch for order times. Replaying sets it to the time of each snapshot, and when it
+        # is None the wall clock is used.
+        self.current_time = None
+
+        self._books = {}
+        self._order_ids = itertools.count(1)
+        self._sequence = itertools.count()
+
+    #
+    # Setup
+    #
+    def add_pair(self, pair: str, base: str, quote: str) -> None:
+        self.symbols[pair] = (base, quote)
+
+    def deposit(self, currency: str, amount: int) -> None:
+        balance = self._get_balance(currency)
+        balance[0] += amount
+        balance[1] += amount
+
+    def get_time(self) -> int:
+        if self.current_time is None:
+            return int(time.time())
+        return self.current_time
+
+    def _get_balance(self, currency: str) -> List[int]:
+        balance = self.balances.get(currency)
+        if balance is None:
+            balance = self.balances[currency] = [0, 0]
+        return balance
+
+    def _get_book(self, pair: str) -> _PairBook:
+        book = self._books.get(pair)
+        if book is None:
+            if pair not in self.symbols:
+                raise ValueError("Unknown pair {}".format(pair))
+            book = self._books[pair] = _PairBook()
+        return book
+
+    #
+    # Market data
+    #
+    def set_order_book(self, pair: str, order_book: Union[Dict, OrderBook]) -> None:
+        '''
+        Sets the market order book of a pair from a get_order_book style dict, or an OrderBook, in whole coins.
+        '''
+        if isinstance(order_book, OrderBook):
+            buy = [(to_satoshis(rate), to_satoshis(volume), 1)
+                   for rate, volume in zip(order_book.bid_prices, order_book.bid_volumes)]
+            sell = [(to_satoshis(rate), to_satoshis(volume), 1)
+                    for rate, volume in zip(order_book.ask_prices, order_book.ask_volumes)]
+        else:
+            buy = [(to_satoshis(level['rate']), to_satoshis(level['volume']), level.get('count', 1))
+                   for level in order_book.get('buy', [])]
+            sell = [(to_satoshis(level['rate']), to_satoshis(level['volume']), level.get('count', 1))
+                    for level in order_book.get('sell', [])]
+        self.set_order_book_satoshis(pair, buy, sell)
+
+    def set_order_book_satoshis(self, pair: str, buy: Iterable[Sequence[int]], sell: Iterable[Sequence[int]]) -> None:
+        '''
+        Sets the market order book of a pair from (price, volume, count) levels in satoshis, and fills any
+        resting orders that it crosses.
+        '''
+        self._set_market_levels(self._get_book(pair), [list(level) for level in buy], [list(level) for level in sell])
+
+    def _set_market_levels(self, book: _PairBook, buy: List[List[int]], sell: List[List[int]]) -> None:
+        buy.sort(reverse=True)
+        sell.sort()
+        book.market_buy = buy
+        book.market_sell = sell
+        book.levels = None
+
+        if len(book.buy_orders) > 0 and len(sell) > 0 and book.buy_orders[0].rate >= sell[0][0]:
+            self._fill_resting(book.buy_orders, book.buy_keys, sell, True)
+        if len(book.sell_orders) > 0 and len(buy) > 0 and book.sell_orders[0].rate <= buy[0][0]:
+            self._fill_resting(book.sell_orders, book.sell_keys, buy, False)
+
+    def _fill_resting(self, orders: List[PaperOrder], keys: List, levels: List[List[int]], is_buy: bool) -> None:
+        # The orders are in priority order, so the ones that are completely filled are always at the front
+        num_filled = 0
+        for order in orders:
+            while len(levels) > 0 and order.volume_done < order.volume:
+                level = levels[0]
+                if (is_buy and level[0] > order.rate) or (not is_buy and level[0] < order.rate):
+                    break
+                volume = min(level[1], order.volume_left)
+                self._fill(order, order.rate, volume)
+                level[1] -= volume
+                if level[1] == 0:
+                    del levels[0]
+
+            if order.volume_done < order.volume:
+                break
+            self._finish(order, ORDER_STATUS_FILLED)
+            num_filled += 1
+
+        del orders[:num_filled]
+        del keys[:num_filled]
+
+    def replay(self, reader: 'MarketDataReader', pairs: List[str] = None, start_time: int = None,
+               end_time: int = None) -> Iterator[Tuple[int, str]]:
+        '''
+        Sets the market order books from recorded snapshots, oldest first across all pairs, and yields the
+        timestamp in nanoseconds and the pair after each one. The engine's clock follows the snapshots.
+        '''
+        if pairs is None:
+            pairs = reader.pairs
+        books = {pair: self._get_book(pair) for pair in pairs}
+
+        snapshots = heapq.merge(*[self._iter_pair_snapshots(reader, pair, start_time, end_time) for pair in pairs])
+        for timestamp, pair, records in snapshots:
+            self.current_time = timestamp // NANOSECONDS_PER_SECOND
+            buy = []
+            sell = []
+            for side, count, price, volume in zip(records['side'].tolist(), records['count'].tolist(),
+                                                  records['price'].tolist(), records['volume'].tolist()):
+                (buy if side == BUY else sell).append([price, volume, count])
+            self._set_market_levels(books[pair], buy, sell)
+            yield timestamp, pair
+
+    @staticmethod
+    def _iter_pair_snapshots(reader: 'MarketDataReader', pair: str, start_time: Optional[int],
+                             end_time: Optional[int]) -> Iterator[Tuple[int, str, Any]]:
+        for timestamp, records in reader.iter_snapshots(pair, start_time, end_time):
+            yield timestamp, pair, records
+
+    def get_order_book_levels(self, pair: str) -> Tuple[List[Tuple[int, int, int]], List[Tuple[int, int, int]]]:
+        '''
+        Returns the buy and sell (price, volume, count) levels of the market with our resting orders added in.
+        '''
+        return self._get_book(pair).get_levels()
+
+    #
+    # Orders
+    #
+    def place_order(self, pair: str, buy_or_sell: int, rate: int, volume: int) -> PaperOrder:
+        '''
+        Places a limit order with rate and volume in satoshis. Raises ValueError if the order is invalid or the
+        balance is too low.
+        '''
+        book = self._get_book(pair)
+        if buy_or_sell not in (BUY, SELL):
+            raise ValueError("buy_or_sell must be BUY or SELL. Got {}".format(buy_or_sell))
+        if rate <= 0 or volume <= 0:
+            raise ValueError("Rate and volume must be positive. Got {} and {}".format(rate, volume))
+
+        base, quote = self.symbols[pair]
+        if buy_or_sell == BUY:
+            currency, reserved = quote, _ceil_div(rate * volume, SATOSHIS_PER_COIN)
+        else:
+            currency, reserved = base, volume
+        balance = self._get_balance(currency)
+        if balance[1] < reserved:
+            raise ValueError("Insufficient {} balance. Need {} satoshis and {} are available".format(
+                currency, reserved, balance[1]))
+        balance[1] -= reserved
+
+        order = PaperOrder(next(self._order_ids), pair, buy_or_sell, rate, volume, reserved, self.get_time(),
+                           next(self._sequence))
+        self.orders[order.id] = order
+        book.levels = None
+
+        # Take whatever the market has at our price or better
+        levels = book.market_sell if buy_or_sell == BUY else book.market_buy
+        while len(levels) > 0 and order.volume_done < volume:
+            level = levels[0]
+            if (buy_or_sell == BUY and level[0] > rate) or (buy_or_sell == SELL and level[0] < rate):
+                break
+            fill_volume = min(level[1], order.volume_left)
+            self._fill(order, level[0], fill_volume)
+            level[1] -= fill_volume
+            if level[1] == 0:
+                del levels[0]
+
+        if order.volume_done == volume:
+            self._finish(order, ORDER_STATUS_FILLED)
+        else:
+            book.add_resting(order)
+        return order
+
+    def cancel_order(self, order_id: int) -> bool:
+        '''
+        Returns True if the order was cancelled, and False if it isn't active.
+        '''
+        order = self.orders.get(order_id)
+        if order is None:
+            return False
+        book = self._get_book(order.pair)
+        book.remove_resting(order)
+        book.levels = None
+        self._finish(order, ORDER_STATUS_CANCELLED)
+        return True
+
+    def _fill(self, order: PaperOrder, price: int, volume: int) -> None:
+        base, quote = self.symbols[order.pair]
+        order.volume_done += volume
+        order.notional_done += price * volume
+
+        if order.type == BUY:
+            # Buys pay the rounded up total and sells receive the rounded down total
+            quote_done = _ceil_div(order.notional_done, SATOSHIS_PER_COIN)
+            paid = quote_done - order.quote_done
+            order.quote_done = quote_done
+            order.reserved -= paid
+            self._get_balance(quote)[0] -= paid
+            base_balance = self._get_balance(base)
+            base_balance[0] += volume
+            base_balance[1] += volume
+        else:
+            quote_done = order.notional_done // SATOSHIS_PER_COIN
+            received = quote_done - order.quote_done
+            order.quote_done = quote_done
+            order.reserved -= volume
+            self._get_balance(base)[0] -= volume
+            quote_balance = self._get_balance(quote)
+            quote_balance[0] += received
+            quote_balance[1] += received
+
+    def _finish(self, order: PaperOrder, status: int) -> None:
+        # Whatever is still reserved goes back to the available balance
+        base, quote = self.symbols[order.pair]
+        self._get_balance(quote if order.type == BUY else base)[1] += order.reserved
+        order.reserved = 0
+        order.status = status
+        order.time_done = self.get_time()
+        del self.orders[order.id]
+        self.history.append(order)
+
+
+class PaperTradingAPI(AtomarsAlterdiceAPI):
+    '''
+    An AtomarsAlterdiceAPI that trades against a MatchingEngine instead of the exchange. Requests are answered
+    in the same process with the same JSON as the exchange, without encoding it, so the scheduler and the
+    request metrics are not used. Prices and amounts are floats, or Satoshis if json_decoder decodes to
+    satoshis. Any username and password log in.
+    '''
+
+    def __init__(self, engine: MatchingEngine = None, default_pair: str = 'HLSETH', username: str = 'paper',
+                 password: str = 'paper', **api_kwargs):
+        super().__init__(username, password, PAPER_API_URL, default_pair, **api_kwargs)
+        self.engine = engine if engine is not None else MatchingEngine()
+        self._paper_token = None
+        # Pair to the engine's levels and the OrderBook parsed from them
+        self._parsed_order_books = {}
+
+        self._post_handlers = {
+            'login': self._handle_login,
+            'private/balances': self._handle_balances,
+            'private/create-order': self._handle_create_order,
+            'private/orders': self._handle_orders,
+            'private/history': self._handle_history,
+            'private/delete-order': self._handle_delete_order,
+        }
+        self._get_handlers = {
+            'public/symbols': self._handle_symbols,
+            'public/book': self._handle_book,
+        }
+
+    async def __aenter__(self) -> 'PaperTradingAPI':
+        return self
+
+    async def warm_up_connections(self, num_connections: int) -> None:
+        pass
+
+    def replay(self, reader: 'MarketDataReader', pairs: List[str] = None, start_time: int = None,
+               end_time: int = None) -> Iterator[Tuple[int, str]]:
+        return self.engine.replay(reader, pairs, start_time, end_time)
+
+    async def get_parsed_order_book(self, pair: str = None) -> OrderBook:
+        # Built straight from the engine's satoshis instead of formatting the book and parsing it again, and only
+        # once for each state of the book
+        if pair is None:
+            pair = self.default_pair
+        try:
+            levels = self.engine.get_order_book_levels(pair)
+        except ValueError as e:
+            raise BadRequestError(e)
+
+        levels_and_order_book = self._parsed_order_books.get(pair)
+        if levels_and_order_book is None or levels_and_order_book[0] is not levels:
+            buy, sell = levels
+            order_book = OrderBook([{'rate': price, 'volume': volume} for price, volume, count in buy],
+                                   [{'rate': price, 'volume': volume} for price, volume, count in sell],
+                                   in_satoshis=True)
+            levels_and_order_book = self._parsed_order_books[pair] = (levels, order_book)
+        return levels_and_order_book[1]
+
+    #
+    # Requests
+    #
+    async def _send_post_request(self, url, payload, headers):
+        endpoint = url[len(self.base_url):]
+        handler = self._post_handlers.get(endpoint)
+        if handler is None:
+            return {'status': False, 'error': 'Unknown endpoint {}'.format(endpoint)}, 404, {}
+        if endpoint != 'login' and (headers is None or headers.get('login-token') != self._paper_token):
+            return {'status': False, 'error': 'Unauthorized'}, 401, {}
+        return handler(payload), HTTP_STATUS_SUCCESS, {}
+
+    async def _send_get_request(self, url, params):
+        endpoint = url[len(self.base_url):]
+        handler = self._get_handlers.get(endpoint)
+        if handler is None:
+            return {'status': False, 'error': 'Unknown endpoint {}'.format(endpoint)}, 404, {}
+        return handler(params)
+
+    def _format_amount(self, satoshis: int) -> Union[Satoshis, float]:
+        if self.amounts_in_satoshis:
+            return Satoshis(satoshis)
+        return satoshis / SATOSHIS_PER_COIN
+
+    def _order_to_dict(self, order: PaperOrder) -> Dict:
+        return {
+            'id': order.id,
+            'pair': order.pair,
+            'price': self._format_amount((order.rate * order.volume + SATOSHIS_PER_COIN // 2) // SATOSHIS_PER_COIN),
+            'price_done': self._format_amount(order.quote_done),
+            'rate': self._format_amount(order.rate),
+            'status': order.status,
+            'time_create': order.time_create,
+            'time_done': order.time_done,
+            'type': order.type,
+            'type_trade': LIMIT_TRADE,
+            'volume': self._format_amount(order.volume),
+            'volume_done': self._format_amount(order.volume_done),
+        }
+
+    #
+    # Handlers
+    #
+    def _handle_login(self, payload: Dict) -> Dict:
+        self._paper_token = '%032x' % random.getrandbits(128)
+        return {'status': True, 'token': self._paper_token, 'data': {'secret': '%032x' % random.getrandbits(128)}}
+
+    def _handle_balances(self, payload: Dict) -> Dict:
+        currencies = set(self.engine.balances)
+        for base, quote in self.engine.symbols.values():
+            currencies.add(base)
+            currencies.add(quote)
+
+        balances = {}
+        for currency in sorted(currencies):
+            balance, balance_available = self.engine.balances.get(currency, (0, 0))
+            balances[currency] = {'balance': balance,
+                                  'balance_available': balance_available,
+                                  'currency': {'iso3': currency, 'name': currency}}
+        return {'status': True, 'data': {'list': balances}}
+
+    def _handle_create_order(self, payload: Dict) -> Dict:
+        try:
+            order = self.engine.place_order(payload['pair'], payload['type'], to_satoshis(payload['rate']),
+                                            to_satoshis(payload['volume']))
+        except ValueError as e:
+            return {'status': False, 'error': str(e)}
+        return {'status': True, 'data': {'id': order.id}}
+
+    def _handle_orders(self, payload: Dict) -> Dict:
+        # The exchange sends an empty list instead of a dict when there are no orders
+        if len(self.engine.orders) == 0:
+            return {'status': True, 'data': []}
+        return {'status': True, 'data': {'list': [self._order_to_dict(order) for order in self.engine.orders.values()]}}
+
+    def _handle_history(self, payload: Dict) -> Dict:
+        # Most recent first, like the exchange
+        return {'status': True, 'data': {'list': [self._order_to_dict(order) for order in reversed(self.engine.history)]}}
+
+    def _handle_delete_order(self, payload: Dict) -> Dict:
+        if self.engine.cancel_order(payload.get('order_id')):
+            return {'status': True}
+        return {'status': False, 'error': 'Order not found'}
+
+    def _handle_symbols(self, params: Dict) -> Tuple[Dict, int, Dict]:
+        symbols = [{'base': base, 'pair': pair, 'quote': quote} for pair, (base, quote) in self.engine.symbols.items()]
+        return {'status': True, 'data': symbols}, HTTP_STATUS_SUCCESS, {}
+
+    def _handle_book(self, params: Dict) -> Tuple[Dict, int, Dict]:
+        try:
+            buy, sell = self.engine.get_order_book_levels(params.get('pair'))
+        except ValueError as e:
+            return {'status': False, 'error': str(e)}, 400, {}
+
+        format_amount = self._format_amount
+        order_book = {
+            'buy': [{'count': count, 'rate': format_amount(price), 'volume': format_amount(volume)}
+                    for price, volume, count in buy],
+            'sell': [{'count': count, 'rate': format_amount(price), 'volume': format_amount(volume)}
+                     for price, volume, count in sell],
+        }
+        return {'status': True, 'data': order_book}, HTTP_STATUS_SUCCESS, {}
@@ -0,0 +1,129 @@
+import asyncio
+
+from typing import Any, Awaitable, Callable, Dict, List, Tuple, Union, TYPE_CHECKING
+
+from .api import AtomarsAlterdiceAPI, create_client_session
+from .constants import (
+    DEFAULT_BATCH_CONCURRENCY,
+    DEFAULT_CONNECTION_LIMIT,
+    DEFAULT_CONNECTION_LIMIT_PER_HOST,
+    DEFAULT_KEEPALIVE_TIMEOUT,
+    DEFAULT_DNS_CACHE_TTL)
+from .orders import CancelResult
+from .utils.logging import BaseLoggingService
+
+if TYPE_CHECKING:
+    import aiohttp
+
+
+class AtomarsAlterdiceAPIPool(BaseLoggingService):
+    '''
+    Manages one AtomarsAlterdiceAPI client per account over a single shared connection pool, and runs
+    requests across all accounts at once. Results are returned as a dict of username to result, where
+    the result is the exception that was raised if the request failed for that account.
+    '''
+
+    def __init__(self,
+                 accounts: List[Tuple[str, str]],
+                 API_url: str = 'https://api.atomars.com/v1/',
+                 default_pair: str = 'HLSETH',
+                 concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+                 connection_limit: int = DEFAULT_CONNECTION_LIMIT,
+                 connection_limit_per_host: int = DEFAULT_CONNECTION_LIMIT_PER_HOST,
+                 keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+                 dns_cache_ttl: int = DEFAULT_DNS_CACHE_TTL,
+                 **api_kwargs):
+        self.concurrency = concurrency
+        self.connection_limit = connection_limit
+        self.connection_limit_per_host = connection_limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        # If the clients are given metrics, the shared session has to trace requests for them
+        self.metrics = api_kwargs.get('metrics')
+        self._session = None
+
+        self.clients = {}
+        for username, password in accounts:
+            if username in self.clients:
+                raise ValueError("Account {} was given more than once".format(username))
+            self.clients[username] = AtomarsAlterdiceAPI(username, password, API_url, default_pair, **api_kwargs)
+
+    #
+    # Session lifecycle
+    #
+    async def __aenter__(self) -> 'AtomarsAlterdiceAPIPool':
+        self.get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    def get_session(self) -> 'aiohttp.ClientSession':
+        if self._session is None or self._session.closed:
+            self._session = create_client_session(self.connection_limit,
+                                                  self.connection_limit_per_host,
+                                                  self.keepalive_timeout,
+                                                  self.dns_cache_ttl,
+                                                  self.metrics)
+            for client in self.clients.values():
+                client.use_session(self._session)
+        return self._session
+
+    async def close(self) -> None:
+        for client in self.clients.values():
+            await client.close()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    #
+    # Fan out
+    #
+    async def run_all(self, function: Callable[[AtomarsAlterdiceAPI], Awaitable[Any]]) -> Dict[str, Any]:
+        '''
+        Calls function with every client, at most concurrency at a time.
+        '''
+        self.get_session()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(client):
+            async with semaphore:
+                return await function(client)
+
+        usernames = list(self.clients)
+        results = await asyncio.gather(*[run(self.clients[username]) for username in usernames],
+                                       return_exceptions=True)
+
+        for username, result in zip(usernames, results):
+            if isinstance(result, Exception):
+                self.logger.debug('Request for account %s failed: %s', username, result)
+        return dict(zip(usernames, results))
+
+    async def login_all(self) -> Dict[str, Union[None, Exception]]:
+        return await self.run_all(lambda client: client.login())
+
+    async def get_balances_all(self, only_non_zero: bool = False) -> Dict[str, Union[Dict, Exception]]:
+        return await self.run_all(lambda client: client.get_balances(only_non_zero))
+
+    async def get_active_orders_all(self, pair: str = None) -> Dict[str, Union[List[Dict], Exception]]:
+        return await self.run_all(lambda client: client.get_active_orders(pair))
+
+    async def delete_all_orders_all(self, pair: str = None, buy_or_sell: int = None) -> Dict[str, Union[CancelResult, Exception]]:
+        return await self.run_all(lambda client: client.delete_all_orders(pair, buy_or_sell))
+
+    async def get_total_balances(self) -> Dict[str, Dict[str, int]]:
+        '''
+        Returns the balance and available balance of each currency summed over every account, in satoshis.
+        Raises the first error if the balances of any account couldn't be fetched.
+        '''
+        balances_by_account = await self.get_balances_all()
+
+        totals = {}
+        for username, balances in balances_by_account.items():
+            if isinstance(balances, Exception):
+                raise balances
+            for currency, balance in balances.items():
+                total = totals.setdefault(currency, {'balance': 0, 'balance_available': 0})
+                total['balance'] += balance['balance']
+                total['balance_available'] += balance['balance_available']
+        return totals
@@ -0,0 +1,340 @@
+import json
+import mmap
+import os
+import struct
+import time
+
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union, TYPE_CHECKING
+
+from .constants import BUY, SELL, DEFAULT_SEGMENT_BYTES
+from .models import BookLevel
+from .order_book import OrderBook
+from .utils.logging import BaseLoggingService
+from .utils.mathematical import to_satoshis, satoshis_to_decimal
+
+if TYPE_CHECKING:
+    import numpy as np
+    from .api import AtomarsAlterdiceAPI
+
+#
+# Records order book and ticker list snapshots as fixed width binary records in append only segment files:
+#
+#   segment_000000.bin ...  records of RECORD_STRUCT, in the order they were recorded
+#   index_<pair id>.bin     one INDEX_STRUCT entry per snapshot of the pair: timestamp, segment, first record, count
+#   pairs.json              pair name to pair id
+#
+# Prices and volumes are integer satoshis and timestamps are integer nanoseconds since the epoch. All
+# records of a snapshot have the same timestamp and are in the same segment.
+#
+
+# timestamp, pair id, side, padding, count, price, volume
+RECORD_STRUCT = struct.Struct('<qHBxIqq')
+# timestamp, segment, first record, number of records
+INDEX_STRUCT = struct.Struct('<qIII')
+
+# Ticker list snapshots are indexed under this name, with one record per listed pair. The records have the
+# pair id of the listed pair, SIDE_TICKER and a price and volume of 0.
+TICKER_LIST_PAIR = '__ticker_list__'
+SIDE_TICKER = 2
+
+SEGMENT_FILENAME = 'segment_{:06d}.bin'
+INDEX_FILENAME = 'index_{}.bin'
+PAIRS_FILENAME = 'pairs.json'
+
+
+def _get_record_dtype():
+    import numpy as np
+    return np.dtype([('timestamp', '<i8'), ('pair_id', '<u2'), ('side', 'u1'), ('_padding', 'u1'),
+                     ('count', '<u4'), ('price', '<i8'), ('volume', '<i8')])
+
+
+def _get_index_dtype():
+    import numpy as np
+    return np.dtype([('timestamp', '<i8'), ('segment', '<u4'), ('start', '<u4'), ('count', '<u4')])
+
+
+def _now_ns() -> int:
+    if hasattr(time, 'time_ns'):
+        return time.time_ns()
+    return int(time.time() * 10 ** 9)
+
+
+def _load_pairs(directory: Path) -> Dict[str, int]:
+    path = directory / PAIRS_FILENAME
+    if not path.exists():
+        return {}
+    with path.open('r') as f:
+        return json.load(f)
+
+
+class MarketDataRecorder(BaseLoggingService):
+    '''
+    Appends order book and ticker list snapshots to segment files in directory. A new segment is started once
+    the current one is larger than max_segment_bytes. Recording into a directory that already has segments
+    continues after them.
+
+    Timestamps of the snapshots of a pair must not go backwards, so that the index can be binary searched.
+    If the order books were decoded with make_satoshi_json_loads, pass in_satoshis=True.
+    '''
+
+    def __init__(self, directory: Union[str, Path], max_segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+                 in_satoshis: bool = False):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_segment_bytes = max_segment_bytes
+        self.in_satoshis = in_satoshis
+
+        self.pair_ids = _load_pairs(self.directory)
+        self._latest_timestamps = {}
+        self._index_files = {}
+
+        segments = sorted(self.directory.glob(SEGMENT_FILENAME.replace('{:06d}', '*')))
+        self._segment = int(segments[-1].stem.split('_')[1]) if segments else 0
+        self._segment_file = None
+        self._num_records = 0
+        self._open_segment(self._segment)
+
+    #
+    # Files
+    #
+    def _open_segment(self, segment: int) -> None:
+        if self._segment_file is not None:
+            self._segment_file.close()
+        self._segment = segment
+        self._segment_file = (self.directory / SEGMENT_FILENAME.format(segment)).open('ab')
+        self._num_records = self._segment_file.tell() // RECORD_STRUCT.size
+
+    def _get_index_file(self, pair_id: int):
+        index_file = self._index_files.get(pair_id)
+        if index_file is None:
+            index_file = self._index_files[pair_id] = (self.directory / INDEX_FILENAME.format(pair_id)).open('ab')
+        return index_file
+
+    def get_pair_id(self, pair: str) -> int:
+        pair_id = self.pair_ids.get(pair)
+        if pair_id is None:
+            pair_id = self.pair_ids[pair] = len(self.pair_ids)
+            # Written to a temporary file first so that readers never see a half written file
+            temporary_path = self.directory / (PAIRS_FILENAME + '.tmp')
+            with temporary_path.open('w') as f:
+                json.dump(self.pair_ids, f)
+            os.replace(str(temporary_path), str(self.directory / PAIRS_FILENAME))
+        return pair_id
+
+    def flush(self) -> None:
+        self._segment_file.flush()
+        for index_file in self._index_files.values():
+            index_file.flush()
+
+    def close(self) -> None:
+        if self._segment_file is None:
+            return
+        self.flush()
+        self._segment_file.close()
+        self._segment_file = None
+        for index_file in self._index_files.values():
+            index_file.close()
+        self._index_files.clear()
+
+    def __enter__(self) -> 'MarketDataRecorder':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    #
+    # Recording
+    #
+    def record_order_book(self, pair: str, order_book: Union[Dict, OrderBook], timestamp: int = None) -> int:
+        '''
+        Records a get_order_book response, with dict or BookLevel levels, or an OrderBook. Returns the number
+        of records written.
+        '''
+        if isinstance(order_book, OrderBook):
+            levels = ([(BUY, to_satoshis(price), to_satoshis(volume), 1)
+                       for price, volume in zip(order_book.bid_prices, order_book.bid_volumes)] +
+                      [(SELL, to_satoshis(price), to_satoshis(volume), 1)
+                       for price, volume in zip(order_book.ask_prices, order_book.ask_volumes)])
+        else:
+            levels = ([(BUY,) + self._get_level_satoshis(level) for level in order_book.get('buy', [])] +
+                      [(SELL,) + self._get_level_satoshis(level) for level in order_book.get('sell', [])])
+
+        pair_id = self.get_pair_id(pair)
+        timestamp = self._check_timestamp(pair_id, timestamp)
+
+        buffer = bytearray(RECORD_STRUCT.size * len(levels))
+        for i, (side, price, volume, count) in enumerate(levels):
+            RECORD_STRUCT.pack_into(buffer, i * RECORD_STRUCT.size, timestamp, pair_id, side, count, price, volume)
+        self._write_snapshot(pair_id, timestamp, buffer, len(levels))
+        return len(levels)
+
+    def _get_level_satoshis(self, level: Union[Dict, BookLevel]) -> Tuple[int, int, int]:
+        # BookLevel rates and volumes are always in coins
+        if self.in_satoshis and type(level) is dict:
+            return level['rate'], level['volume'], level.get('count', 1)
+        return to_satoshis(level['rate']), to_satoshis(level['volume']), level.get('count', 1)
+
+    def record_ticker_list(self, ticker_list: List[Dict], timestamp: int = None) -> int:
+        '''
+        Records a get_ticker_list response as one record per listed pair. Returns the number of records written.
+        '''
+        list_id = self.get_pair_id(TICKER_LIST_PAIR)
+        timestamp = self._check_timestamp(list_id, timestamp)
+        records = b''.join(RECORD_STRUCT.pack(timestamp, self.get_pair_id(ticker['pair']), SIDE_TICKER, 0, 0, 0)
+                           for ticker in ticker_list)
+        self._write_snapshot(list_id, timestamp, records, len(ticker_list))
+        return len(ticker_list)
+
+    async def record_from_api(self, api: 'AtomarsAlterdiceAPI', pairs: List[str]) -> int:
+        '''
+        Fetches and records the order book of each pair. Returns the number of records written.
+        '''
+        num_records = 0
+        for pair in pairs:
+            num_records += self.record_order_book(pair, await api.get_order_book(pair))
+        return num_records
+
+    def _check_timestamp(self, pair_id: int, timestamp: Optional[int]) -> int:
+        if timestamp is None:
+            timestamp = _now_ns()
+        latest_timestamp = self._latest_timestamps.get(pair_id)
+        if latest_timestamp is not None and timestamp < latest_timestamp:
+            raise ValueError("Snapshots of a pair must be recorded in time order. Got {} after {}".format(
+                timestamp, latest_timestamp))
+        self._latest_timestamps[pair_id] = timestamp
+        return timestamp
+
+    def _write_snapshot(self, pair_id: int, timestamp: int, records: bytes, num_records: int) -> None:
+        if self._num_records > 0 and self._segment_file.tell() + len(records) > self.max_segment_bytes:
+            self._segment_file.flush()
+            self._open_segment(self._segment + 1)
+
+        self._segment_file.write(records)
+        # The records are flushed before the index entry, so a reader never finds an entry without its records
+        self._segment_file.flush()
+        index_file = self._get_index_file(pair_id)
+        index_file.write(INDEX_STRUCT.pack(timestamp, self._segment, self._num_records, num_records))
+        index_file.flush()
+        self._num_records += num_records
+
+
+class MarketDataReader():
+    '''
+    Reads a directory written by MarketDataRecorder. Segments are memory mapped and viewed as NumPy structured
+    arrays without copying, with fields timestamp, pair_id, side, count, price and volume. Requires numpy.
+    '''
+
+    def __init__(self, directory: Union[str, Path]):
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("MarketDataReader requires numpy. Install it with pip install atom-alter-api[analytics]")
+        self._np = np
+        self.directory = Path(directory)
+        self.pair_ids = _load_pairs(self.directory)
+        self.record_dtype = _get_record_dtype()
+        self._segments = {}
+        self._mmaps = []
+
+    def close(self) -> None:
+        self._segments.clear()
+        for mapped in self._mmaps:
+            try:
+                mapped.close()
+            except BufferError:
+                # Arrays returned by the reader still point into it. It is closed when they are garbage collected.
+                pass
+        self._mmaps = []
+
+    def __enter__(self) -> 'MarketDataReader':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def pairs(self) -> List[str]:
+        return [pair for pair in self.pair_ids if pair != TICKER_LIST_PAIR]
+
+    def get_segment(self, segment: int) -> 'np.ndarray':
+        records = self._segments.get(segment)
+        if records is None:
+            path = self.directory / SEGMENT_FILENAME.format(segment)
+            size = path.stat().st_size // RECORD_STRUCT.size * RECORD_STRUCT.size
+            if size == 0:
+                return self._np.empty(0, dtype=self.record_dtype)
+            with path.open('rb') as f:
+                mapped = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+            self._mmaps.append(mapped)
+            records = self._segments[segment] = self._np.frombuffer(mapped, dtype=self.record_dtype)
+        return records
+
+    def get_index(self, pair: str) -> 'np.ndarray':
+        '''
+        Returns one entry per snapshot of the pair with fields timestamp, segment, start and count. This is read
+        fresh every call, so snapshots recorded since are included.
+        '''
+        pair_id = self.pair_ids.get(pair)
+        if pair_id is None:
+            self.pair_ids = _load_pairs(self.directory)
+            pair_id = self.pair_ids.get(pair)
+        if pair_id is None:
+            raise KeyError("No snapshots were recorded for pair {}".format(pair))
+        with (self.directory / INDEX_FILENAME.format(pair_id)).open('rb') as f:
+            data = f.read()
+        # Leave out an entry that is still being written
+        return self._np.frombuffer(data[:len(data) // INDEX_STRUCT.size * INDEX_STRUCT.size], dtype=_get_index_dtype())
+
+    def _get_index_range(self, pair: str, start_time: int = None, end_time: int = None) -> 'np.ndarray':
+        index = self.get_index(pair)
+        first = 0 if start_time is None else self._np.searchsorted(index['timestamp'], start_time, side='left')
+        last = len(index) if end_time is None else self._np.searchsorted(index['timestamp'], end_time, side='right')
+        return index[first:last]
+
+    def iter_snapshots(self, pair: str, start_time: int = None, end_time: int = None) -> Iterator[Tuple[int, 'np.ndarray']]:
+        '''
+        Yields the timestamp and records of each snapshot of the pair between start_time and end_time,
+        inclusive. The records are views into the memory mapped segment.
+        '''
+        for timestamp, segment, start, count in self._get_index_range(pair, start_time, end_time).tolist():
+            # A segment that grew since it was mapped is mapped again
+            records = self.get_segment(segment)
+            if start + count > len(records):
+                self._segments.pop(segment, None)
+                records = self.get_segment(segment)
+            yield timestamp, records[start:start + count]
+
+    def scan(self, pair: str, start_time: int = None, end_time: int = None) -> 'np.ndarray':
+        '''
+        Returns every record of the pair between start_time and end_time, inclusive, as one array. Unlike
+        iter_snapshots, this copies the records.
+        '''
+        snapshots = [records for _, records in self.iter_snapshots(pair, start_time, end_time)]
+        if len(snapshots) == 0:
+            return self._np.empty(0, dtype=self.record_dtype)
+        return self._np.concatenate(snapshots)
+
+    def iter_ticker_lists(self, start_time: int = None, end_time: int = None) -> Iterator[Tuple[int, List[str]]]:
+        '''
+        Yields the timestamp and listed pairs of each ticker list snapshot between start_time and end_time, inclusive.
+        '''
+        pairs_by_id = {pair_id: pair for pair, pair_id in self.pair_ids.items()}
+        for timestamp, records in self.iter_snapshots(TICKER_LIST_PAIR, start_time, end_time):
+            pair_ids = records['pair_id'].tolist()
+            if any(pair_id not in pairs_by_id for pair_id in pair_ids):
+                self.pair_ids = _load_pairs(self.directory)
+                pairs_by_id = {pair_id: pair for pair, pair_id in self.pair_ids.items()}
+            yield timestamp, [pairs_by_id[pair_id] for pair_id in pair_ids]
+
+    @staticmethod
+    def to_order_book(records: 'np.ndarray') -> Dict[str, List[Dict]]:
+        '''
+        Converts the records of one snapshot back into a get_order_book style dict, with Decimal rates and volumes.
+        '''
+        order_book = {'buy': [], 'sell': []}
+        for side, count, price, volume in zip(records['side'].tolist(), records['count'].tolist(),
+                                              records['price'].tolist(), records['volume'].tolist()):
+            order_book['buy' if side == BUY else 'sell'].append(
+                {'count': count, 'rate': satoshis_to_decimal(price), 'volume': satoshis_to_decimal(volume)})
+        return order_book
@@ -0,0 +1,58 @@
+import hashlib
+
+from decimal import Decimal
+from typing import Dict, List
+
+from .exceptions import HeaderCreationError
+
+
+class PayloadSigner():
+    '''
+    Creates the x-auth-sign signature for a payload: the sha256 hex digest of all payload values, ordered by
+    sorted key and flattened, followed by the secret. The values are collected into a list and joined once,
+    and the secret is encoded to bytes once when the signer is created.
+    '''
+    __slots__ = ('secret', '_secret_bytes')
+
+    def __init__(self, secret: str):
+        self.secret = secret
+        self._secret_bytes = str(secret).encode('utf-8')
+
+    def get_raw_signature(self, payload) -> str:
+        '''
+        The string that gets hashed, without the secret
+        '''
+        fragments = []
+        _collect_fragments(payload, fragments)
+        return ''.join(fragments)
+
+    def sign(self, payload) -> str:
+        hash = hashlib.sha256(self.get_raw_signature(payload).encode('utf-8'))
+        hash.update(self._secret_bytes)
+        return hash.hexdigest()
+
+    def sign_batch(self, payloads: List[Dict]) -> List[str]:
+        return [self.sign(payload) for payload in payloads]
+
+
+def _collect_fragments(payload, fragments: List[str]) -> None:
+    payload_type = type(payload)
+    if payload_type is dict:
+        for key in sorted(payload):
+            _collect_fragments(payload[key], fragments)
+    elif payload_type is str:
+        fragments.append(payload)
+    elif payload_type is int:
+        fragments.append(str(payload))
+    # Subclasses of the types above are rare, so they are checked separately after the exact types
+    elif isinstance(payload, dict):
+        for key in sorted(payload.keys()):
+            _collect_fragments(payload[key], fragments)
+    elif isinstance(payload, Decimal):
+        fragments.append(str(payload))
+    elif isinstance(payload, float):
+        fragments.append(str(Decimal(payload)))
+    elif isinstance(payload, (str, int)):
+        fragments.append(str(payload))
+    else:
+        raise HeaderCreationError("I don't know how to create signature with this payload.")
@@ -0,0 +1,140 @@
+import asyncio
+import concurrent.futures
+import functools
+import threading
+
+from typing import Any, Callable, Coroutine, Optional
+
+from .api import AtomarsAlterdiceAPI
+from .constants import DEFAULT_SYNC_TIMEOUT
+from .utils.logging import BaseLoggingService
+
+
+class SyncAtomarsAlterdiceAPI(BaseLoggingService):
+    '''
+    A blocking, thread safe wrapper around AtomarsAlterdiceAPI for synchronous code. One event loop runs in a
+    background thread for the life of the wrapper, and every call is sent to it, so the connection pool and
+    login are kept between calls and calls from many threads share them:
+
+        with SyncAtomarsAlterdiceAPI(username, password) as api:
+            api.login()
+            api.get_balance('ETH', timeout=5)
+
+    Every method of AtomarsAlterdiceAPI can be called this way. Each call waits at most timeout seconds,
+    defaulting to the timeout given here, and raises concurrent.futures.TimeoutError when it runs out. The
+    request is cancelled when that happens. Other attributes, like default_pair, are read from the client.
+    Pass api to wrap a client that was already made, such as a PaperTradingAPI.
+    '''
+
+    def __init__(self, username: str = None, password: str = None, API_url: str = 'https://api.atomars.com/v1/',
+                 default_pair: str = 'HLSETH', timeout: float = DEFAULT_SYNC_TIMEOUT,
+                 api: AtomarsAlterdiceAPI = None, **api_kwargs):
+        self.timeout = timeout
+        # Futures of the calls that are running, so close() can cancel them
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+        self._closed = False
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name='SyncAtomarsAlterdiceAPI', daemon=True)
+        self._thread.start()
+
+        if api is None:
+            # Made on the loop thread, in case anything in it binds to the running loop
+            api = self.run(self._create_api(username, password, API_url, default_pair, api_kwargs))
+        self.api = api
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    @staticmethod
+    async def _create_api(username, password, API_url, default_pair, api_kwargs) -> AtomarsAlterdiceAPI:
+        return AtomarsAlterdiceAPI(username, password, API_url, default_pair, **api_kwargs)
+
+    #
+    # Lifecycle
+    #
+    def __enter__(self) -> 'SyncAtomarsAlterdiceAPI':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self, timeout: float = None) -> None:
+        '''
+        Cancels any calls that are still running, closes the client and stops the background thread.
+        '''
+        if self._closed:
+            return
+        with self._pending_lock:
+            pending = list(self._pending)
+        for future in pending:
+            future.cancel()
+        try:
+            self.run(self.api.close(), timeout)
+        finally:
+            self._closed = True
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+    #
+    # Calls
+    #
+    def run(self, coroutine: Coroutine, timeout: float = None) -> Any:
+        '''
+        Runs a coroutine on the background loop and blocks until it is done, for at most timeout seconds.
+        '''
+        try:
+            self._check_can_block()
+        except RuntimeError:
+            coroutine.close()
+            raise
+
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        with self._pending_lock:
+            self._pending.add(future)
+        try:
+            return future.result(timeout if timeout is not None else self.timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+        finally:
+            with self._pending_lock:
+                self._pending.discard(future)
+
+    def _check_can_block(self) -> None:
+        if self._closed:
+            raise RuntimeError("SyncAtomarsAlterdiceAPI is closed")
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("Blocking calls can't be made from the event loop thread. Await the client instead.")
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for names that aren't set on the wrapper, so once a method is wrapped it is looked up directly
+        if name == 'api':
+            raise AttributeError(name)
+        attribute = getattr(self.api, name)
+        if not callable(attribute):
+            return attribute
+
+        blocking_method = self._make_blocking(attribute)
+        setattr(self, name, blocking_method)
+        return blocking_method
+
+    def _make_blocking(self, method: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(method):
+            @functools.wraps(method)
+            def blocking_method(*args, timeout: Optional[float] = None, **kwargs):
+                self._check_can_block()
+                return self.run(method(*args, **kwargs), timeout)
+        else:
+            # Plain methods run on the loop thread too, so they never see the client half way through a request
+            async def call(args, kwargs):
+                return method(*args, **kwargs)
+
+            @functools.wraps(method)
+            def blocking_method(*args, timeout: Optional[float] = None, **kwargs):
+                return self.run(call(args, kwargs), timeout)
+
+        return blocking_method
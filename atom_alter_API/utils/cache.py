@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class TTLCache():
+    '''
+    A least recently used cache whose entries expire after ttl seconds. Concurrent requests for the same key
+    that is not cached share a single in flight future, so only one of them goes to the network.
+    '''
+
+    def __init__(self, ttl: float, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries = OrderedDict()
+        self._in_flight = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            future = asyncio.ensure_future(fetch())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda f: self._on_fetch_done(key, f))
+
+        # Shield so that one caller being cancelled doesn't cancel the request for everyone else waiting on it
+        return await asyncio.shield(future)
+
+    def _on_fetch_done(self, key: Hashable, future: asyncio.Future) -> None:
+        self._in_flight.pop(key, None)
+        if not future.cancelled() and future.exception() is None:
+            self.set(key, future.result())
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'entries': len(self._entries),
+        }
+
+
+_MISSING = object()
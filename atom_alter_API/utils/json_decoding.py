@@ -0,0 +1,99 @@
+import json
+
+from decimal import Decimal
+from typing import Any, Callable, Iterable
+
+from atom_alter_API.utils.mathematical import Satoshis
+
+#
+# JSON decoders for API responses. A decoder is any callable that takes the raw response body as bytes and
+# returns the decoded object. Pass one to AtomarsAlterdiceAPI(json_decoder=...).
+#
+
+# Fields that hold prices or amounts in API responses
+DECIMAL_FIELDS = frozenset(['rate', 'volume', 'price', 'price_done', 'volume_done'])
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_loads(body: bytes) -> Any:
+    return json.loads(body.decode('utf-8'))
+
+
+def fast_json_loads(body: bytes) -> Any:
+    '''
+    Decodes with orjson if it is installed, otherwise with the standard library. Both return floats.
+    '''
+    if orjson is not None:
+        return orjson.loads(body)
+    return json_loads(body)
+
+
+def copy_json(decoded: Any) -> Any:
+    '''
+    Copies the dicts and lists of a decoded response. Numbers, strings and Decimals are immutable and shared.
+    '''
+    decoded_type = type(decoded)
+    if decoded_type is dict:
+        return {key: copy_json(value) for key, value in decoded.items()}
+    if decoded_type is list:
+        return [copy_json(value) for value in decoded]
+    return decoded
+
+
+def _convert_fields(decoded: Any, fields: Iterable[str], convert: Callable[[Any], Any]) -> Any:
+    # Exact type checks are used because this runs on every value of large order books
+    decoded_type = type(decoded)
+    if decoded_type is dict:
+        for key, value in decoded.items():
+            value_type = type(value)
+            if value_type is dict or value_type is list:
+                _convert_fields(value, fields, convert)
+            elif key in fields and value is not None and value_type is not bool:
+                decoded[key] = convert(value)
+    elif decoded_type is list:
+        for value in decoded:
+            value_type = type(value)
+            if value_type is dict or value_type is list:
+                _convert_fields(value, fields, convert)
+    return decoded
+
+
+def make_decimal_json_loads(fields: Iterable[str] = DECIMAL_FIELDS) -> Callable[[bytes], Any]:
+    '''
+    Returns a decoder that parses every JSON number with a fraction straight into a Decimal without going
+    through float, and also turns the given fields into Decimal when the API sends them as strings or ints.
+    '''
+    fields = frozenset(fields)
+
+    def to_decimal(value) -> Decimal:
+        return value if type(value) is Decimal else Decimal(value)
+
+    def decimal_json_loads(body: bytes) -> Any:
+        decoded = json.loads(body.decode('utf-8'), parse_float=Decimal)
+        return _convert_fields(decoded, fields, to_decimal)
+
+    return decimal_json_loads
+
+
+def make_satoshi_json_loads(fields: Iterable[str] = DECIMAL_FIELDS) -> Callable[[bytes], Any]:
+    '''
+    Returns a decoder that turns the given fields into Satoshis, integer amounts of 1e-8 coins. Other numbers are
+    decoded as they normally are. Balances are already sent by the API as integer satoshis and are left as they are.
+    The client's helpers that return Decimal prices, OrderBook and the typed models still return whole coins.
+    '''
+    fields = frozenset(fields)
+
+    def satoshi_json_loads(body: bytes) -> Any:
+        return _convert_fields(fast_json_loads(body), fields, Satoshis.from_coins)
+
+    # Tells AtomarsAlterdiceAPI to convert these amounts back to coins in OrderBook and the typed models
+    satoshi_json_loads.amounts_in_satoshis = True
+    return satoshi_json_loads
+
+
+def decodes_to_satoshis(json_decoder: Callable[[bytes], Any]) -> bool:
+    return getattr(json_decoder, 'amounts_in_satoshis', False)
@@ -1,6 +1,10 @@
+import atexit
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from pathlib import Path
+from typing import Optional
 
 from .xdg import get_xdg_trading_bot_root, get_logfile_path, initialize_dir, get_logfile_dir
 
@@ -17,7 +21,42 @@ class BaseLogFormatter(logging.Formatter):
         return super().format(record)
 
 
-def setup_logger(filename_path: Path, log_level = logging.DEBUG):
+class JsonLinesFormatter(logging.Formatter):
+    '''
+    Formats each record as one JSON object per line with the time in seconds since the epoch, the level, the
+    logger name and the message
+    '''
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': record.created,
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class StoppableQueueListener(QueueListener):
+    '''
+    A QueueListener that can be stopped more than once, so it can be stopped by its owner and again at exit
+    '''
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            super().stop()
+
+
+def setup_logger(filename_path: Path, log_level = logging.DEBUG, use_queue: bool = False,
+                 json_lines: bool = False) -> Optional[QueueListener]:
+    '''
+    Logs to a rotating file and to stderr. If use_queue is True, the root logger only puts records on a queue,
+    and a QueueListener thread writes them, so logging never waits for the disk. The listener is returned, and
+    is stopped at exit to write whatever is left on the queue. If json_lines is True, the file gets one JSON
+    object per record.
+    '''
     logger = logging.getLogger()
     logger.setLevel(log_level)
     stream_handler = logging.StreamHandler()
@@ -32,15 +71,25 @@ def setup_logger(filename_path: Path, log_level = logging.DEBUG):
         datefmt='%m-%d %H:%M:%S'
     )
 
-    file_handler.setFormatter(formatter)
+    file_handler.setFormatter(JsonLinesFormatter() if json_lines else formatter)
     stream_handler.setFormatter(formatter)
 
-    logger.addHandler(file_handler)
+    if not use_queue:
+        logger.addHandler(file_handler)
+
+        logger.addHandler(stream_handler)
+        return None
 
-    logger.addHandler(stream_handler)
+    log_queue = queue.Queue(-1)
+    listener = StoppableQueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    logger.addHandler(QueueHandler(log_queue))
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
 
 
-def initialize_logger_and_directories(trading_bot_name: str = "trading_bot") -> None:
+def initialize_logger_and_directories(trading_bot_name: str = "trading_bot", use_queue: bool = False,
+                                      json_lines: bool = False) -> Optional[QueueListener]:
     base_location = get_xdg_trading_bot_root(trading_bot_name)
 
     logger_dir = get_logfile_dir(base_location)
@@ -48,7 +97,7 @@ def initialize_logger_and_directories(trading_bot_name: str = "trading_bot") ->
 
     logger_location = get_logfile_path(base_location)
 
-    setup_logger(logger_location)
+    return setup_logger(logger_location, use_queue=use_queue, json_lines=json_lines)
 
 
 class BaseLoggingService():
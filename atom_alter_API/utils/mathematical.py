@@ -1,23 +1,37 @@
 import hashlib
+import logging
 import time
 
-from eth_utils import to_bytes
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_EVEN
 from random import uniform
 from random import randint
 from random import choices
+from typing import Iterable, List, Union, TYPE_CHECKING
 
 from atom_alter_API.constants import(
     NUM_DECIMALS,
+    SATOSHIS_PER_COIN,
     BUY,
     SELL
 )
 
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Below this, a float that was sent with at most 8 decimals converts to the right satoshi amount with one
+# float multiply and round. Larger values go through Decimal.
+MAX_FAST_SATOSHI_FLOAT = 1e7
+
+# Whole coins and the satoshis after the decimal point
+_SATOSHI_FORMAT = '%d.%0{}d'.format(NUM_DECIMALS)
+
 
 import random
 
 def sha256(input_text):
-    input_bytes = to_bytes(text=input_text)
+    input_bytes = input_text.encode('utf-8')
     hash = hashlib.sha256(input_bytes).hexdigest()
     return hash
 
@@ -46,31 +60,43 @@ def generate_request_id():
     #return int(time.time()*1000)
 
 def float_to_string(input):
+    if type(input) is Satoshis:
+        return format_satoshis(input)
     if isinstance(input, str):
         return input
     output = "{:.{}f}".format(input, NUM_DECIMALS)
     return output
 
 def to_decimal(input):
+    if type(input) is Satoshis:
+        return satoshis_to_decimal(input)
     input_string = float_to_string(input)
     return Decimal(input_string)
 
 def add_random_percentage(amount, max_percentage):
+    # Satoshis stay Satoshis, rounded to a whole satoshi
+    if isinstance(amount, Satoshis):
+        return amount + amount * (uniform(-1*max_percentage, max_percentage) / 100)
     amount = to_decimal(amount)
     percentage = uniform(-1*max_percentage, max_percentage)
     amount_change = amount*Decimal(percentage/100)
     return Decimal(amount+amount_change)
 
 def scale_by_random_percentage(amount, max_percentage):
+    if isinstance(amount, Satoshis):
+        return amount * (uniform(0, max_percentage) / 100)
     amount = to_decimal(amount)
     percentage = uniform(0, max_percentage)
     scaled_amount = amount*Decimal(percentage/100)
     return Decimal(scaled_amount)
 
 def calculate_order_amount_based_on_current_balance(initial_balance, current_balance, max_sold_per_day, num_orders):
-    print('calculating calculate_order_amount_based_on_current_balance with parameters {} {} {} {}'.format(initial_balance, current_balance, max_sold_per_day, num_orders))
+    # If the balances are Satoshis, the amount is Satoshis too, and is worked out without Decimal
+    logger.debug('calculating calculate_order_amount_based_on_current_balance with parameters %s %s %s %s',
+                 initial_balance, current_balance, max_sold_per_day, num_orders)
+    in_satoshis = isinstance(current_balance, Satoshis)
     if current_balance == 0:
-        return Decimal(0)
+        return Satoshis(0) if in_satoshis else Decimal(0)
     amount_sold = initial_balance - current_balance
     if amount_sold < 0:
         amount_sold = 0
@@ -82,14 +108,173 @@ def calculate_order_amount_based_on_current_balance(initial_balance, current_bal
     if amount_left_to_sell < 0:
         amount_left_to_sell = 0
 
+    if in_satoshis:
+        # 5% split over the orders, rounded once
+        return Satoshis(_round_div(int(amount_left_to_sell) * 5, 100 * num_orders))
+
     amount_for_all_orders = amount_left_to_sell*Decimal('0.05')
     amount_per_order = amount_for_all_orders/num_orders
     return Decimal(amount_per_order)
 
 def satoshi_to_actual(satoshi):
+    # Integer satoshis give the same Decimal without formatting and dividing
+    if isinstance(satoshi, int):
+        return satoshis_to_decimal(satoshi)
     satoshi = to_decimal(satoshi)
     return Decimal(satoshi/Decimal('100000000'))
 
+def to_satoshis(amount):
+    # Converts an amount in coins, as a float, int, str or Decimal, to integer satoshis
+    amount_type = type(amount)
+    if amount_type is float and -MAX_FAST_SATOSHI_FLOAT < amount < MAX_FAST_SATOSHI_FLOAT:
+        return int(round(amount * SATOSHIS_PER_COIN))
+    if amount_type is int:
+        return amount * SATOSHIS_PER_COIN
+    if amount_type is Satoshis:
+        return int(amount)
+    if amount_type is float:
+        amount = float_to_string(amount)
+    return int(Decimal(amount).scaleb(NUM_DECIMALS).to_integral_value())
+
+def satoshis_to_decimal(satoshis):
+    # Exact, and keeps only the digits that are needed
+    return Decimal(satoshis).scaleb(-NUM_DECIMALS)
+
+def format_satoshis(satoshis: int) -> str:
+    # The same string as float_to_string gives for the amount in coins, without going through float or Decimal
+    if satoshis < 0:
+        return '-' + _SATOSHI_FORMAT % divmod(-satoshis, SATOSHIS_PER_COIN)
+    return _SATOSHI_FORMAT % divmod(satoshis, SATOSHIS_PER_COIN)
+
+def _round_div(numerator: int, denominator: int) -> int:
+    # Integer division rounded half to even, like Decimal
+    if denominator < 0:
+        numerator, denominator = -numerator, -denominator
+    quotient, remainder = divmod(numerator, denominator)
+    if 2 * remainder > denominator or (2 * remainder == denominator and quotient % 2 == 1):
+        quotient += 1
+    return quotient
+
+
+class Satoshis(int):
+    '''
+    A fixed point amount in whole satoshis (SATOSHI coins). It is an int, so it can be compared, summed, packed
+    and sent as JSON like one. Adding or subtracting Satoshis or ints gives Satoshis. Multiplying two Satoshis
+    gives their product in coins as Satoshis, so price * volume is the cost, and dividing them gives the
+    quotient, so cost / price is the volume. Multiplying or dividing by an int, float or Decimal scales the
+    amount. Results are rounded half to even to a whole satoshi, which is what Decimal does with NUM_DECIMALS
+    places. Adding a float or Decimal raises TypeError because it can't tell whether that is in coins.
+    str() gives the amount in coins with NUM_DECIMALS places, the same as float_to_string.
+    '''
+    __slots__ = ()
+
+    @classmethod
+    def from_coins(cls, amount) -> 'Satoshis':
+        return cls(to_satoshis(amount))
+
+    def to_decimal(self) -> Decimal:
+        return satoshis_to_decimal(int(self))
+
+    def __str__(self) -> str:
+        return format_satoshis(self)
+
+    def __repr__(self) -> str:
+        return 'Satoshis({})'.format(int(self))
+
+    def __add__(self, other) -> 'Satoshis':
+        if isinstance(other, int):
+            return Satoshis(int(self) + int(other))
+        raise TypeError("Only Satoshis or ints can be added to Satoshis. Use Satoshis.from_coins({!r})".format(other))
+
+    __radd__ = __add__
+
+    def __sub__(self, other) -> 'Satoshis':
+        if isinstance(other, int):
+            return Satoshis(int(self) - int(other))
+        raise TypeError("Only Satoshis or ints can be subtracted from Satoshis. Use Satoshis.from_coins({!r})".format(other))
+
+    def __rsub__(self, other) -> 'Satoshis':
+        if isinstance(other, int):
+            return Satoshis(int(other) - int(self))
+        raise TypeError("Satoshis can only be subtracted from Satoshis or ints. Use Satoshis.from_coins({!r})".format(other))
+
+    def __neg__(self) -> 'Satoshis':
+        return Satoshis(-int(self))
+
+    def __abs__(self) -> 'Satoshis':
+        return Satoshis(abs(int(self)))
+
+    def __mul__(self, other) -> 'Satoshis':
+        if isinstance(other, Satoshis):
+            return Satoshis(_round_div(int(self) * int(other), SATOSHIS_PER_COIN))
+        if isinstance(other, int):
+            return Satoshis(int(self) * int(other))
+        if isinstance(other, float):
+            return Satoshis(round(int(self) * other))
+        if isinstance(other, Decimal):
+            return Satoshis(int((int(self) * other).to_integral_value(ROUND_HALF_EVEN)))
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other) -> 'Satoshis':
+        if isinstance(other, Satoshis):
+            return Satoshis(_round_div(int(self) * SATOSHIS_PER_COIN, int(other)))
+        if isinstance(other, int):
+            return Satoshis(_round_div(int(self), int(other)))
+        if isinstance(other, float):
+            return Satoshis(round(int(self) / other))
+        if isinstance(other, Decimal):
+            return Satoshis(int((int(self) / other).to_integral_value(ROUND_HALF_EVEN)))
+        return NotImplemented
+
+
+#
+# Bulk conversions
+#
+def to_satoshis_list(amounts: Iterable) -> List[Satoshis]:
+    '''
+    Converts amounts in coins, as floats, ints, strs or Decimals, to Satoshis
+    '''
+    return [Satoshis(to_satoshis(amount)) for amount in amounts]
+
+def format_satoshis_list(satoshis: Union[Iterable[int], 'np.ndarray']) -> List[str]:
+    '''
+    Formats satoshis, from a list or an integer array, as strings in coins for request payloads
+    '''
+    if hasattr(satoshis, 'tolist'):
+        satoshis = satoshis.tolist()
+    return [format_satoshis(amount) for amount in satoshis]
+
+def to_satoshis_array(amounts: Union[Iterable, 'np.ndarray']) -> 'np.ndarray':
+    '''
+    Converts amounts in coins to an int64 array of satoshis. Float arrays are converted in one vectorized
+    multiply and round, and give the same result as to_satoshis on each value. A list of Satoshis is kept as it is.
+    '''
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("to_satoshis_array requires numpy. Install it with pip install atom-alter-api[analytics]")
+
+    if not isinstance(amounts, np.ndarray):
+        amounts = list(amounts)
+        if len(amounts) > 0 and isinstance(amounts[0], Satoshis):
+            return np.array(amounts, dtype=np.int64)
+        array = np.asarray(amounts)
+    else:
+        array = amounts
+
+    if array.dtype.kind == 'f':
+        satoshis = np.rint(array * SATOSHIS_PER_COIN).astype(np.int64)
+        # Large values lose digits when multiplied as floats, so they go through Decimal like to_satoshis does
+        large = np.abs(array) >= MAX_FAST_SATOSHI_FLOAT
+        if large.any():
+            satoshis[large] = [to_satoshis(amount) for amount in array[large].tolist()]
+        return satoshis
+    if array.dtype.kind in 'iu':
+        return array.astype(np.int64) * SATOSHIS_PER_COIN
+    return np.array([to_satoshis(amount) for amount in array.tolist()], dtype=np.int64)
+
 
 #
 # Tests
@@ -0,0 +1,211 @@
+import time
+
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from .logging import BaseLoggingService
+
+if TYPE_CHECKING:
+    import aiohttp
+
+# Histogram buckets in seconds
+DEFAULT_LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# The parts of a request that are timed. total is the whole HTTP request including decoding.
+PHASE_TOTAL = 'total'
+PHASE_DNS = 'dns'
+PHASE_CONNECT = 'connect'
+PHASE_TTFB = 'ttfb'
+PHASE_DECODE = 'decode'
+
+
+class Histogram():
+    __slots__ = ('buckets', 'bucket_counts', 'count', 'sum')
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        # The last count is for values above the largest bucket
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def get_cumulative_counts(self) -> List[Tuple[float, int]]:
+        cumulative = []
+        total = 0
+        for bucket, count in zip(self.buckets + (float('inf'),), self.bucket_counts):
+            total += count
+            cumulative.append((bucket, total))
+        return cumulative
+
+    def get_percentile(self, percent: float) -> Optional[float]:
+        '''
+        Returns the upper bound of the bucket that the percentile falls in
+        '''
+        if self.count == 0:
+            return None
+        rank = percent / 100 * self.count
+        for bucket, total in self.get_cumulative_counts():
+            if total >= rank:
+                return bucket
+        return float('inf')
+
+
+class RequestMetrics(BaseLoggingService):
+    '''
+    Records per endpoint request counts, error counts by exception class, and latency histograms for each
+    phase of a request: DNS lookup, connecting, time to first byte, JSON decoding and the total. Signing time
+    is recorded separately since it happens before the request. Hooks are called with a dict describing each
+    request after it finishes. Pass one to AtomarsAlterdiceAPI(metrics=...).
+    '''
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.request_counts = {}
+        self.error_counts = {}
+        self.latencies = {}
+        self.signing_latency = Histogram(buckets)
+        self.hooks = []
+
+    def add_hook(self, hook: Callable[[Dict], None]) -> None:
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[Dict], None]) -> None:
+        self.hooks.remove(hook)
+
+    #
+    # Recording
+    #
+    def observe_latency(self, endpoint: str, phase: str, seconds: float) -> None:
+        histogram = self.latencies.get((endpoint, phase))
+        if histogram is None:
+            histogram = self.latencies[(endpoint, phase)] = Histogram(self.buckets)
+        histogram.observe(seconds)
+
+    def observe_signing(self, seconds: float) -> None:
+        self.signing_latency.observe(seconds)
+
+    def record_request(self, endpoint: str, method: str, status: Optional[int], timings: Dict[str, float]) -> None:
+        self.request_counts[endpoint] = self.request_counts.get(endpoint, 0) + 1
+        for phase, seconds in timings.items():
+            if not phase.startswith('_'):
+                self.observe_latency(endpoint, phase, seconds)
+        self._call_hooks({'endpoint': endpoint, 'method': method, 'status': status, 'timings': timings, 'error': None})
+
+    def record_error(self, endpoint: str, error: Exception) -> None:
+        key = (endpoint, error.__class__.__name__)
+        self.error_counts[key] = self.error_counts.get(key, 0) + 1
+        self._call_hooks({'endpoint': endpoint, 'method': None, 'status': None, 'timings': {}, 'error': error})
+
+    def _call_hooks(self, event: Dict) -> None:
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception as e:
+                self.logger.warning('Metrics hook %s raised %s', hook, e)
+
+    #
+    # aiohttp tracing
+    #
+    def create_trace_config(self) -> 'aiohttp.TraceConfig':
+        '''
+        Returns a TraceConfig that fills in the dns, connect and ttfb timings of the dict passed to the
+        request as trace_request_ctx.
+        '''
+        import aiohttp
+
+        def get_timings(trace_config_ctx) -> Optional[Dict[str, float]]:
+            return trace_config_ctx.trace_request_ctx
+
+        async def on_request_start(session, trace_config_ctx, params):
+            timings = get_timings(trace_config_ctx)
+            if timings is not None:
+                timings['_start'] = time.perf_counter()
+
+        async def on_dns_resolvehost_start(session, trace_config_ctx, params):
+            timings = get_timings(trace_config_ctx)
+            if timings is not None:
+                timings['_dns_start'] = time.perf_counter()
+
+        async def on_dns_resolvehost_end(session, trace_config_ctx, params):
+            timings = get_timings(trace_config_ctx)
+            if timings is not None and '_dns_start' in timings:
+                timings[PHASE_DNS] = time.perf_counter() - timings['_dns_start']
+
+        async def on_connection_create_start(session, trace_config_ctx, params):
+            timings = get_timings(trace_config_ctx)
+            if timings is not None:
+                timings['_connect_start'] = time.perf_counter()
+
+        async def on_connection_create_end(session, trace_config_ctx, params):
+            timings = get_timings(trace_config_ctx)
+            if timings is not None and '_connect_start' in timings:
+                timings[PHASE_CONNECT] = time.perf_counter() - timings['_connect_start']
+
+        async def on_request_end(session, trace_config_ctx, params):
+            # Called when the response headers have arrived
+            timings = get_timings(trace_config_ctx)
+            if timings is not None and '_start' in timings:
+                timings[PHASE_TTFB] = time.perf_counter() - timings['_start']
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+        trace_config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+        trace_config.on_connection_create_start.append(on_connection_create_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_request_end.append(on_request_end)
+        return trace_config
+
+    #
+    # Export
+    #
+    def to_prometheus(self, prefix: str = 'atom_alter_api') -> str:
+        '''
+        Returns all metrics in the Prometheus text exposition format
+        '''
+        lines = []
+
+        lines.append('# HELP {}_requests_total HTTP requests sent, by endpoint.'.format(prefix))
+        lines.append('# TYPE {}_requests_total counter'.format(prefix))
+        for endpoint, count in sorted(self.request_counts.items()):
+            lines.append('{}_requests_total{{endpoint="{}"}} {}'.format(prefix, _escape(endpoint), count))
+
+        lines.append('# HELP {}_errors_total Failed requests, by endpoint and exception class.'.format(prefix))
+        lines.append('# TYPE {}_errors_total counter'.format(prefix))
+        for (endpoint, error), count in sorted(self.error_counts.items()):
+            lines.append('{}_errors_total{{endpoint="{}",error="{}"}} {}'.format(prefix, _escape(endpoint), _escape(error), count))
+
+        name = '{}_request_phase_seconds'.format(prefix)
+        lines.append('# HELP {} Request latency, by endpoint and phase.'.format(name))
+        lines.append('# TYPE {} histogram'.format(name))
+        for (endpoint, phase), histogram in sorted(self.latencies.items()):
+            labels = 'endpoint="{}",phase="{}"'.format(_escape(endpoint), _escape(phase))
+            lines.extend(_histogram_lines(name, labels, histogram))
+
+        name = '{}_signing_seconds'.format(prefix)
+        lines.append('# HELP {} Time spent signing request payloads.'.format(name))
+        lines.append('# TYPE {} histogram'.format(name))
+        lines.extend(_histogram_lines(name, '', self.signing_latency))
+
+        return '\n'.join(lines) + '\n'
+
+
+def _histogram_lines(name: str, labels: str, histogram: Histogram) -> List[str]:
+    separator = ',' if labels else ''
+    lines = []
+    for bucket, total in histogram.get_cumulative_counts():
+        bucket_label = '+Inf' if bucket == float('inf') else repr(float(bucket))
+        lines.append('{}_bucket{{{}{}le="{}"}} {}'.format(name, labels, separator, bucket_label, total))
+    label_block = '{{{}}}'.format(labels) if labels else ''
+    lines.append('{}_sum{} {}'.format(name, label_block, repr(histogram.sum)))
+    lines.append('{}_count{} {}'.format(name, label_block, histogram.count))
+    return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
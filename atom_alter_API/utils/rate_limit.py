@@ -0,0 +1,150 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+from typing import Dict
+
+from atom_alter_API.constants import (
+    PRIORITY_READ,
+    ENDPOINT_PRIORITIES,
+)
+
+
+class TokenBucket():
+    '''
+    Allows rate requests per second on average, with bursts of up to capacity requests.
+    '''
+
+    def __init__(self, rate: float, capacity: float = None):
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0. Got {}".format(rate))
+        if capacity is not None and capacity < 1:
+            raise ValueError("capacity must be at least 1, or no request could ever be sent. Got {}".format(capacity))
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self._last_refill = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def try_take(self) -> bool:
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def time_until_next_token(self) -> float:
+        self._refill()
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class PriorityRateLimiter():
+    '''
+    A token bucket with a priority queue in front of it. When requests have to wait for a token, the one
+    with the lowest priority number goes first, and requests with the same priority go first in first out.
+    '''
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.bucket = TokenBucket(rate, capacity)
+        self._waiters = []
+        self._counter = itertools.count()
+        self._dispatcher = None
+
+        self.total_requests = 0
+        self.total_delayed = 0
+        self.total_wait_time = 0.0
+        self.max_queue_depth = 0
+
+    async def acquire(self, priority: int = PRIORITY_READ) -> None:
+        self.total_requests += 1
+        if not self._waiters and self.bucket.try_take():
+            return
+
+        future = asyncio.get_event_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        self.total_delayed += 1
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+
+        start = time.monotonic()
+        try:
+            await future
+        finally:
+            self.total_wait_time += time.monotonic() - start
+
+    async def _dispatch(self) -> None:
+        while self._waiters:
+            # Drop waiters that were cancelled while queued so they don't use up a token
+            while self._waiters and self._waiters[0][2].done():
+                heapq.heappop(self._waiters)
+            if not self._waiters:
+                break
+
+            if self.bucket.try_take():
+                _, _, future = heapq.heappop(self._waiters)
+                future.set_result(None)
+            else:
+                await asyncio.sleep(self.bucket.time_until_next_token())
+
+    @property
+    def queue_depth(self) -> int:
+        return len([waiter for waiter in self._waiters if not waiter[2].done()])
+
+    def get_queue_depth_by_priority(self) -> Dict[int, int]:
+        depths = {}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                depths[priority] = depths.get(priority, 0) + 1
+        return depths
+
+    def get_stats(self) -> Dict:
+        return {
+            'queue_depth': self.queue_depth,
+            'queue_depth_by_priority': self.get_queue_depth_by_priority(),
+            'max_queue_depth': self.max_queue_depth,
+            'total_requests': self.total_requests,
+            'total_delayed': self.total_delayed,
+            'total_wait_time': self.total_wait_time,
+        }
+
+
+class RequestScheduler():
+    '''
+    Sends every request through a rate limiter. Public and private endpoints have separate limits, and
+    within each, cancels go before creates, which go before reads. A rate of None means no limit.
+    '''
+
+    def __init__(self,
+                 public_rate: float = None,
+                 private_rate: float = None,
+                 public_burst: float = None,
+                 private_burst: float = None):
+        self.limiters = {}
+        if public_rate is not None:
+            self.limiters['public'] = PriorityRateLimiter(public_rate, public_burst)
+        if private_rate is not None:
+            self.limiters['private'] = PriorityRateLimiter(private_rate, private_burst)
+
+    @staticmethod
+    def get_bucket_name(endpoint: str) -> str:
+        return 'public' if endpoint.startswith('public/') else 'private'
+
+    @staticmethod
+    def get_priority(endpoint: str) -> int:
+        return ENDPOINT_PRIORITIES.get(endpoint, PRIORITY_READ)
+
+    async def acquire(self, endpoint: str) -> None:
+        limiter = self.limiters.get(self.get_bucket_name(endpoint))
+        if limiter is not None:
+            await limiter.acquire(self.get_priority(endpoint))
+
+    def get_stats(self) -> Dict[str, Dict]:
+        return {name: limiter.get_stats() for name, limiter in self.limiters.items()}
+
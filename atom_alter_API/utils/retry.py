@@ -0,0 +1,58 @@
+import random
+
+from typing import Tuple, Type
+
+from atom_alter_API.constants import (
+    DEFAULT_RETRY_MAX_ATTEMPTS,
+    DEFAULT_RETRY_BASE_DELAY,
+    DEFAULT_RETRY_MAX_DELAY,
+)
+from atom_alter_API.exceptions import HTTPRequestError, BadRequestError, UnauthorizedError
+
+
+class RetryPolicy():
+    '''
+    Decides which failed requests are sent again, and how long to wait first. The wait grows exponentially
+    from base_delay up to max_delay, and a random amount is taken off it (full jitter) so that many clients
+    don't retry at the same moment.
+
+    Errors are classified by exception type: instances of retry_on are retried unless they are also instances
+    of dont_retry_on. By default connection errors and 5xx responses are retried, but 400 and 401 are not.
+    401 is handled by logging in again instead.
+
+    If hedge_delay is set, public GET requests that haven't answered after hedge_delay seconds are sent a
+    second time, and whichever answers first is used.
+    '''
+
+    def __init__(self,
+                 max_attempts: int = DEFAULT_RETRY_MAX_ATTEMPTS,
+                 base_delay: float = DEFAULT_RETRY_BASE_DELAY,
+                 max_delay: float = DEFAULT_RETRY_MAX_DELAY,
+                 jitter: bool = True,
+                 retry_on: Tuple[Type[Exception], ...] = (HTTPRequestError,),
+                 dont_retry_on: Tuple[Type[Exception], ...] = (BadRequestError, UnauthorizedError),
+                 hedge_delay: float = None):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1. Got {}".format(max_attempts))
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.retry_on = retry_on
+        self.dont_retry_on = dont_retry_on
+        self.hedge_delay = hedge_delay
+
+    def is_retryable(self, exception_class: Type[Exception]) -> bool:
+        return issubclass(exception_class, self.retry_on) and not issubclass(exception_class, self.dont_retry_on)
+
+    def should_retry(self, attempt: int, exception_class: Type[Exception]) -> bool:
+        '''
+        attempt is the number of the attempt that just failed, starting at 0
+        '''
+        return attempt + 1 < self.max_attempts and self.is_retryable(exception_class)
+
+    def get_delay(self, attempt: int) -> float:
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        if self.jitter:
+            return random.uniform(0, delay)
+        return delay
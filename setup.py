@@ -5,8 +5,13 @@ from setuptools import setup, find_packages
 deps = {
     'api': [
         "aiohttp==3.5.4",
-        "eth_utils==1.8.1",
-    ]
+    ],
+    'fast': [
+        "orjson",
+    ],
+    'analytics': [
+        "numpy",
+    ],
 }
 
 install_requires =  deps['api']
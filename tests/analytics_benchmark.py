@@ -0,0 +1,64 @@
+import random
+import timeit
+
+from atom_alter_API.analytics import BookArrays
+from atom_alter_API.constants import BUY
+from atom_alter_API.order_book import OrderBook
+
+from fake_exchange import make_order_book
+
+#
+# Compares the NumPy order book analytics in atom_alter_API/analytics.py with per level Python loops.
+# Usage: python analytics_benchmark.py
+#
+
+def python_vwap(asks, volume):
+    remaining = volume
+    cost = 0.0
+    for level in sorted(asks, key=lambda level: float(level['rate'])):
+        price = float(level['rate'])
+        taken = min(remaining, float(level['volume']))
+        cost += taken * price
+        remaining -= taken
+        if remaining <= 0:
+            return cost / volume
+    return float('nan')
+
+
+def python_depth(order_book, percent):
+    best_bid = max(float(level['rate']) for level in order_book['buy'])
+    best_ask = min(float(level['rate']) for level in order_book['sell'])
+    mid = (best_bid + best_ask) / 2
+    bid_depth = sum(float(level['volume']) for level in order_book['buy'] if float(level['rate']) >= mid * (1 - percent / 100))
+    ask_depth = sum(float(level['volume']) for level in order_book['sell'] if float(level['rate']) <= mid * (1 + percent / 100))
+    return bid_depth, ask_depth
+
+
+def main(num_levels: int = 10000, num_targets: int = 100, number: int = 5) -> None:
+    order_book = make_order_book(num_levels)
+    random.shuffle(order_book['buy'])
+    random.shuffle(order_book['sell'])
+    total_ask_volume = sum(level['volume'] for level in order_book['sell'])
+    target_volumes = [total_ask_volume * (i + 1) / num_targets for i in range(num_targets)]
+    percents = [0.1 * (i + 1) for i in range(num_targets)]
+    book = BookArrays.from_order_book(order_book)
+
+    benchmarks = [
+        ('BookArrays.from_order_book', lambda: BookArrays.from_order_book(order_book)),
+        ('OrderBook.from_order_book', lambda: OrderBook.from_order_book(order_book)),
+        ('python vwap x{}'.format(num_targets), lambda: [python_vwap(order_book['sell'], v) for v in target_volumes]),
+        ('numpy vwap x{}'.format(num_targets), lambda: book.vwap(BUY, target_volumes)),
+        ('python depth x{}'.format(num_targets), lambda: [python_depth(order_book, p) for p in percents]),
+        ('numpy depth x{}'.format(num_targets), lambda: book.depth_within_percent(percents)),
+        ('numpy slippage x{}'.format(num_targets), lambda: book.slippage_both_sides(target_volumes)),
+    ]
+
+    print('Order book with {} levels per side'.format(num_levels))
+    print('{:<34}{:>12}'.format('operation', 'ms'))
+    for name, benchmark in benchmarks:
+        elapsed = timeit.timeit(benchmark, number=number)
+        print('{:<34}{:>12.3f}'.format(name, elapsed / number * 1000))
+
+
+if __name__ == "__main__":
+    main()
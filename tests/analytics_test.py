@@ -0,0 +1,46 @@
+import math
+
+import numpy as np
+
+from atom_alter_API.analytics import BookArrays
+from atom_alter_API.constants import BUY, SELL
+from atom_alter_API.order_book import OrderBook
+
+TEST_ORDER_BOOK = {'buy': [{'count': 1, 'rate': 99, 'volume': 1},
+                           {'count': 1, 'rate': 98, 'volume': 2},
+                           {'count': 1, 'rate': '90', 'volume': 10}],
+                   'sell': [{'count': 1, 'rate': 102, 'volume': 2},
+                            {'count': 1, 'rate': 101, 'volume': 1},
+                            {'count': 1, 'rate': 110, 'volume': 10}]}
+
+
+def test_arrays_are_sorted_best_first():
+    book = BookArrays.from_order_book(TEST_ORDER_BOOK)
+    assert list(book.bid_prices) == [99, 98, 90]
+    assert list(book.ask_prices) == [101, 102, 110]
+    assert book.mid == 100
+
+    from_order_book = BookArrays.from_order_book(OrderBook.from_order_book(TEST_ORDER_BOOK))
+    assert np.array_equal(from_order_book.ask_volumes, book.ask_volumes)
+
+
+def test_depth_within_percent():
+    book = BookArrays.from_order_book(TEST_ORDER_BOOK)
+    depth = book.depth_within_percent([0.5, 2, 10])
+    assert list(depth['buy']) == [0, 3, 13]
+    assert list(depth['sell']) == [0, 3, 13]
+
+
+def test_vwap_and_slippage():
+    book = BookArrays.from_order_book(TEST_ORDER_BOOK)
+    vwap = book.vwap(BUY, [0, 1, 2, 3, 100])
+    assert vwap[0] == 101
+    assert vwap[1] == 101
+    assert vwap[2] == (101 + 102) / 2
+    assert vwap[3] == (101 + 102 * 2) / 3
+    assert math.isnan(vwap[4])
+
+    assert book.vwap(SELL, 3) == (99 + 98 * 2) / 3
+    slippage = book.slippage_both_sides(1)
+    assert slippage['buy'] == 0.01
+    assert slippage['sell'] == 0.01
@@ -0,0 +1,109 @@
+import argparse
+import asyncio
+import time
+
+from typing import Callable, Dict, List
+
+from atom_alter_API.api import AtomarsAlterdiceAPI
+
+from fake_exchange import FakeExchange, make_order_book
+
+#
+# Measures requests/sec and p50/p99 latency of every AtomarsAlterdiceAPI method against the local fake exchange.
+# Usage: python api_benchmark.py --requests 500 --concurrency 1 10 50 --latency 0.002
+#
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    if len(sorted_values) == 0:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(percent / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_benchmark(call: Callable, num_requests: int, concurrency: int) -> Dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def timed_call(i):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await call(i)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[timed_call(i) for i in range(num_requests)])
+    wall_time = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'requests_per_second': num_requests / wall_time,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'errors': errors,
+    }
+
+
+def get_benchmarked_methods(api: AtomarsAlterdiceAPI, pair: str) -> Dict[str, Callable]:
+    order_ids = []
+
+    async def limit_buy(i):
+        order_ids.append(await api.limit_buy(0.0001, 1, pair))
+
+    async def limit_sell(i):
+        order_ids.append(await api.limit_sell(0.0003, 1, pair))
+
+    async def delete_order(i):
+        await api.delete_order(order_ids.pop() if order_ids else i)
+
+    return {
+        'login': lambda i: api.login(),
+        'get_balances': lambda i: api.get_balances(),
+        'get_balance': lambda i: api.get_balance('HLS'),
+        'limit_buy': limit_buy,
+        'limit_sell': limit_sell,
+        'get_active_orders': lambda i: api.get_active_orders(pair),
+        'get_order_history': lambda i: api.get_order_history(),
+        'is_order_complete': lambda i: api.is_order_complete(i),
+        'delete_order': delete_order,
+        'get_ticker_list': lambda i: api.get_ticker_list(),
+        'get_order_book': lambda i: api.get_order_book(pair),
+        'get_lowest_sell_and_highest_buy': lambda i: api.get_lowest_sell_and_highest_buy(pair),
+    }
+
+
+async def main(num_requests: int, concurrency_levels: List[int], latency: float, book_levels: int) -> None:
+    exchange = FakeExchange(latency=latency, order_book=make_order_book(book_levels))
+    await exchange.start()
+    pair = 'HLSETH'
+
+    print('{:<34}{:>8}{:>12}{:>10}{:>10}{:>8}'.format('method', 'conc', 'req/s', 'p50 ms', 'p99 ms', 'errors'))
+    try:
+        for concurrency in concurrency_levels:
+            async with AtomarsAlterdiceAPI(exchange.username, exchange.password, exchange.base_url, pair) as api:
+                await api.login()
+                methods = get_benchmarked_methods(api, pair)
+                for name, call in methods.items():
+                    result = await run_benchmark(call, num_requests, concurrency)
+                    if name == 'login':
+                        # Every concurrent login rotates the token, so log in once more to get a consistent one.
+                        await api.login()
+                    print('{:<34}{:>8}{:>12.1f}{:>10.2f}{:>10.2f}{:>8}'.format(
+                        name, concurrency, result['requests_per_second'], result['p50_ms'], result['p99_ms'], result['errors']))
+    finally:
+        await exchange.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark AtomarsAlterdiceAPI against a local fake exchange')
+    parser.add_argument('--requests', type=int, default=200, help='Number of calls per method and concurrency level')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50], help='Concurrency levels to test')
+    parser.add_argument('--latency', type=float, default=0, help='Simulated server latency in seconds')
+    parser.add_argument('--book-levels', type=int, default=20, help='Number of levels on each side of the order book')
+    args = parser.parse_args()
+
+    asyncio.run(main(args.requests, args.concurrency, args.latency, args.book_levels))
@@ -0,0 +1,42 @@
+import asyncio
+import time
+
+from atom_alter_API.api import AtomarsAlterdiceAPI
+
+from fake_exchange import FakeExchange
+
+#
+# Times a strategy loop that checks the available balance before every order and cancels it afterwards,
+# with and without the balance cache.
+# Usage: python balance_cache_benchmark.py
+#
+
+async def check_place_and_cancel(exchange: FakeExchange, num_orders: int, api_kwargs: dict) -> float:
+    async with AtomarsAlterdiceAPI(exchange.username, exchange.password, exchange.base_url, **api_kwargs) as api:
+        await api.login()
+        start = time.perf_counter()
+        for _ in range(num_orders):
+            balance = await api.get_balance('ETH')
+            if balance['balance_available'] > 100000:
+                order_id = await api.limit_buy(0.0001, 1)
+                await api.delete_order(order_id)
+        return time.perf_counter() - start
+
+
+async def run(num_orders: int, latency: float) -> None:
+    async with FakeExchange(latency=latency) as exchange:
+        print('{} orders, {}ms server latency'.format(num_orders, latency * 1000))
+        print('{:<28}{:>12}{:>20}'.format('balances', 'ms/order', 'balance requests'))
+        for name, api_kwargs in [('fetched every time', {}), ('balance_cache_ttl=60', {'balance_cache_ttl': 60})]:
+            exchange.request_counts.clear()
+            elapsed = await check_place_and_cancel(exchange, num_orders, api_kwargs)
+            print('{:<28}{:>12.2f}{:>20}'.format(name, elapsed / num_orders * 1000,
+                                                 exchange.request_counts.get('private/balances', 0)))
+
+
+def main(num_orders: int = 200, latency: float = 0.005) -> None:
+    asyncio.run(run(num_orders, latency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import asyncio
+
+from atom_alter_API.balance_cache import BalanceCache
+from atom_alter_API.models import Balance
+from atom_alter_API.paper_trading import MatchingEngine, PaperTradingAPI
+
+from fake_exchange import run_with_exchange
+
+
+def test_balances_are_served_locally_and_reserved_by_orders():
+    async def test(exchange, api):
+        await api.login()
+        balance = await api.get_balance('ETH')
+        assert balance['balance_available'] == 500000000
+        for _ in range(10):
+            await api.get_balance('HLS')
+        await api.get_balances(only_non_zero=True)
+        assert exchange.request_counts['private/balances'] == 1
+
+        # 0.00018018 * 1.5 = 0.00027027 ETH, and 2 HLS
+        buy_id = await api.limit_buy(0.00018018, 1.5)
+        sell_id = await api.limit_sell(0.0002, 2)
+        assert (await api.get_balance('ETH'))['balance_available'] == 500000000 - 27027
+        assert (await api.get_balance('HLS'))['balance_available'] == 19957756355391 - 200000000
+        assert (await api.get_balance('ETH'))['balance'] == 500000000
+
+        await api.delete_order(buy_id)
+        assert (await api.get_balance('ETH'))['balance_available'] == 500000000
+        assert exchange.request_counts['private/balances'] == 1
+        # Only the first order looked up which currencies the pair trades
+        assert exchange.request_counts['public/symbols'] == 1
+
+        # A filled order changes balances we can't see, so they are fetched again
+        exchange.fill_order(sell_id)
+        assert await api.is_order_complete(sell_id)
+        await api.get_balance('HLS')
+        assert exchange.request_counts['private/balances'] == 2
+        assert api.get_cache_stats()['private/balances']['reservations'] == 0
+
+        # Changing what we were given doesn't change the cache
+        balances = await api.get_balances()
+        balances['ETH']['balance_available'] = 0
+        assert (await api.get_balance('ETH'))['balance_available'] == 500000000
+    run_with_exchange(test, api_kwargs={'balance_cache_ttl': 60})
+
+
+def test_balance_cache_expires_and_shares_fetches():
+    async def test(exchange, api):
+        await api.login()
+        balances = await asyncio.gather(*[api.get_balance('ETH') for _ in range(5)])
+        assert all(type(balance) is Balance for balance in balances)
+        assert exchange.request_counts['private/balances'] == 1
+        assert api.get_cache_stats()['private/balances']['coalesced'] == 4
+
+        await asyncio.sleep(0.06)
+        await api.get_balance('ETH')
+        assert exchange.request_counts['private/balances'] == 2
+
+        # Orders we no longer have are treated as filled
+        api.clear_caches()
+        await api.get_balances()
+        assert exchange.request_counts['private/balances'] == 3
+        order_id = await api.limit_sell(0.0002, 1)
+        exchange.fill_order(order_id)
+        await api.delete_order(order_id)
+        await api.get_balances()
+        assert exchange.request_counts['private/balances'] == 4
+    run_with_exchange(test, api_kwargs={'balance_cache_ttl': 0.05, 'typed_returns': True})
+
+
+def test_fetch_sent_before_an_order_isnt_cached_over_it():
+    async def test():
+        balances = {'ETH': {'balance': 100, 'balance_available': 100}}
+        fetch_started = asyncio.Event()
+        order_placed = asyncio.Event()
+
+        async def fetch():
+            fetch_started.set()
+            await order_placed.wait()
+            # The exchange answered before it saw the order
+            return {'ETH': dict(balances['ETH'])}
+
+        cache = BalanceCache(60)
+        fetching = asyncio.ensure_future(cache.get_or_fetch(fetch))
+        await fetch_started.wait()
+        cache.reserve(1, 'ETH', 40)
+        order_placed.set()
+        await fetching
+        assert cache.get() is None
+
+        cache.set(await fetch())
+        cache.release(1)
+        assert cache.get()['ETH']['balance_available'] == 140
+    asyncio.run(test())
+
+
+def test_paper_trading_balances_match_the_cache():
+    async def test():
+        async with PaperTradingAPI(MatchingEngine(balances={'ETH': 10 ** 8}), balance_cache_ttl=60) as api:
+            await api.login()
+            await api.get_balances()
+            for _ in range(3):
+                await api.limit_buy(0.0001, 1.23456789)
+            cached = await api.get_balances()
+            api.clear_caches()
+            assert await api.get_balances() == cached
+    asyncio.run(test())
@@ -0,0 +1,48 @@
+import asyncio
+
+from atom_alter_API.exceptions import HTTPRequestError
+from atom_alter_API.utils.cache import TTLCache
+
+from fake_exchange import run_with_exchange
+
+
+def test_concurrent_requests_are_coalesced():
+    async def test(exchange, api):
+        books = await asyncio.gather(*[api.get_order_book('HLSETH') for _ in range(10)])
+        assert all(book == books[0] for book in books)
+        await api.get_order_book('HLSETH')
+        await api.get_order_book('HLSBTC')
+
+        assert exchange.request_counts['public/book'] == 2
+        assert api.get_cache_stats()['public/book'] == {'hits': 1, 'misses': 2, 'coalesced': 9, 'entries': 2}
+    run_with_exchange(test, api_kwargs={'public_cache_ttls': {'public/book': 60}}, latency=0.01)
+
+
+def test_failures_are_not_cached():
+    async def test(exchange, api):
+        exchange.fail_next(1)
+        results = await asyncio.gather(*[api.get_ticker_list() for _ in range(3)], return_exceptions=True)
+        assert all(isinstance(result, HTTPRequestError) for result in results)
+        assert len(await api.get_ticker_list()) == 3
+        assert exchange.request_counts['public/symbols'] == 2
+    run_with_exchange(test, api_kwargs={'public_cache_ttls': {'public/symbols': 60}}, latency=0.01)
+
+
+def test_cached_responses_can_be_modified():
+    async def test(exchange, api):
+        (await api.get_order_book('HLSETH'))['sell'].clear()
+        order_book = await api.get_order_book('HLSETH')
+        assert len(order_book['sell']) == 20
+        assert exchange.request_counts['public/book'] == 1
+    run_with_exchange(test, api_kwargs={'public_cache_ttls': {'public/book': 60}})
+
+
+def test_lru_eviction():
+    cache = TTLCache(ttl=60, max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
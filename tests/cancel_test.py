@@ -0,0 +1,81 @@
+import asyncio
+
+from atom_alter_API.constants import BUY, SELL
+from atom_alter_API.exceptions import APIExecutionError
+from atom_alter_API.orders import OrderRequest
+
+from fake_exchange import run_with_exchange
+
+
+async def place_quotes(api):
+    result = await api.place_orders([
+        OrderRequest(BUY, 0.0001, 1, 'HLSETH'),
+        OrderRequest(BUY, 0.0002, 1, 'HLSETH'),
+        OrderRequest(SELL, 0.0003, 1, 'HLSETH'),
+        OrderRequest(SELL, 0.0003, 1, 'HLSBTC'),
+        OrderRequest(SELL, 0.0003, 1, 'HLSUSDT'),
+    ])
+    return result.order_ids
+
+
+def test_cancel_with_filters():
+    async def test(exchange, api):
+        await api.login()
+        order_ids = await place_quotes(api)
+
+        result = await api.cancel_orders('HLSETH', BUY, min_price='0.00015')
+        assert result.cancelled == [order_ids[1]]
+
+        result = await api.cancel_orders(['HLSETH', 'HLSBTC'], SELL, max_price=0.0003, verify=True)
+        assert sorted(result.cancelled) == [order_ids[2], order_ids[3]]
+        assert result.still_active == []
+        assert result.all_succeeded
+
+        result = await api.cancel_orders(concurrency=1)
+        assert sorted(result.cancelled) == [order_ids[0], order_ids[4]]
+        assert len(exchange.active_orders) == 0
+    run_with_exchange(test)
+
+
+def test_cancel_report():
+    async def test(exchange, api):
+        await api.login()
+        order_ids = await place_quotes(api)
+        exchange.fill_order(order_ids[1])
+        # The first cancel is rejected
+        exchange.fail_next(1, 400)
+
+        result = await api.cancel_order_ids(order_ids, concurrency=1, verify=True)
+        assert list(result.failed) == [order_ids[0]]
+        assert isinstance(result.failed[order_ids[0]], APIExecutionError)
+        assert result.already_gone == [order_ids[1]]
+        assert result.cancelled == order_ids[2:]
+        assert result.still_active == [order_ids[0]]
+        assert not result.all_succeeded
+    run_with_exchange(test)
+
+
+def test_cancels_are_bounded():
+    async def test(exchange, api):
+        await api.login()
+        await place_quotes(api)
+
+        in_flight = 0
+        max_in_flight = 0
+        send_delete_order = api._send_delete_order
+
+        async def counting_send_delete_order(payload, headers):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            try:
+                return await send_delete_order(payload, headers)
+            finally:
+                in_flight -= 1
+
+        api._send_delete_order = counting_send_delete_order
+        result = await api.cancel_orders(concurrency=2)
+        assert len(result.cancelled) == 5
+        assert max_in_flight == 2
+    run_with_exchange(test)
@@ -0,0 +1,350 @@
+import asyncio
+import hashlib
+import itertools
+import random
+import threading
+import time
+
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+from atom_alter_API.api import AtomarsAlterdiceAPI
+from atom_alter_API.constants import BUY, SELL, ORDER_STATUS_ACTIVE, ORDER_STATUS_FILLED, ORDER_STATUS_CANCELLED
+
+#
+# An in-process stand-in for the Atomars/Alterdice API. It speaks the same JSON as the real exchange so
+# that AtomarsAlterdiceAPI can be tested and benchmarked offline.
+#
+
+DEFAULT_SYMBOLS = [
+    {'base': 'HLS', 'pair': 'HLSBTC', 'quote': 'BTC'},
+    {'base': 'HLS', 'pair': 'HLSETH', 'quote': 'ETH'},
+    {'base': 'HLS', 'pair': 'HLSUSDT', 'quote': 'USDT'},
+]
+
+DEFAULT_BALANCES = {
+    'HLS': {'balance': 19957756355391,
+            'balance_available': 19957756355391,
+            'currency': {'iso3': 'HLS', 'name': 'Helios Protocol'}},
+    'ETH': {'balance': 500000000,
+            'balance_available': 500000000,
+            'currency': {'iso3': 'ETH', 'name': 'Ethereum'}},
+    'BTC': {'balance': 0,
+            'balance_available': 0,
+            'currency': {'iso3': 'BTC', 'name': 'Bitcoin'}},
+}
+
+
+def make_order_book(num_levels: int = 20, mid_price: float = 0.00018) -> Dict:
+    tick = mid_price / 1000
+    buy = [{'count': 1, 'rate': round(mid_price - tick * (i + 1), 8), 'volume': round(1 + i * 0.5, 8)}
+           for i in range(num_levels)]
+    sell = [{'count': 1, 'rate': round(mid_price + tick * (i + 1), 8), 'volume': round(1 + i * 0.5, 8)}
+            for i in range(num_levels)]
+    return {'buy': buy, 'sell': sell}
+
+
+def sign_payload(payload, secret: str) -> str:
+    # Deliberately written separately from the client so that it checks the client's signatures instead of copying them.
+    def flatten(value) -> str:
+        if isinstance(value, dict):
+            return ''.join(flatten(value[key]) for key in sorted(value.keys()))
+        if isinstance(value, float):
+            return str(Decimal(value))
+        return str(value)
+
+    return hashlib.sha256((flatten(payload) + secret).encode('utf-8')).hexdigest()
+
+
+class FakeExchange():
+    def __init__(self,
+                 username: str = 'test@test.com',
+                 password: str = 'password',
+                 latency: float = 0,
+                 error_rate: float = 0,
+                 error_status: int = 500,
+                 order_book: Dict = None,
+                 order_books: Dict[str, Dict] = None,
+                 symbols: List[Dict] = None,
+                 balances: Dict = None,
+                 accounts: Dict[str, str] = None):
+        self.username = username
+        self.password = password
+        # username to password. Every account sees the same balances and orders.
+        self.accounts = dict(accounts) if accounts is not None else {}
+        self.accounts[username] = password
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.order_book = order_book if order_book is not None else make_order_book()
+        # Books for particular pairs. Every other pair gets order_book.
+        self.order_books = dict(order_books) if order_books is not None else {}
+        self.symbols = symbols if symbols is not None else list(DEFAULT_SYMBOLS)
+        self.balances = balances if balances is not None else {k: dict(v) for k, v in DEFAULT_BALANCES.items()}
+
+        # The most recent login, and the secret for every token that is still valid
+        self.token = None
+        self.secret = None
+        self.secrets_by_token = {}
+        self.active_orders = {}
+        self.history = []
+        self.request_counts = {}
+        self.base_url = None
+
+        self.request_ids = []
+        self._forced_errors = []
+        self._forced_delays = []
+        self._order_ids_by_request_id = {}
+        self._order_ids = itertools.count(1000)
+        self._runner = None
+
+    #
+    # Lifecycle
+    #
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        app = web.Application()
+        app.router.add_post('/v1/login', self.handle_login)
+        app.router.add_post('/v1/private/balances', self.handle_balances)
+        app.router.add_post('/v1/private/create-order', self.handle_create_order)
+        app.router.add_post('/v1/private/orders', self.handle_orders)
+        app.router.add_post('/v1/private/history', self.handle_history)
+        app.router.add_post('/v1/private/delete-order', self.handle_delete_order)
+        app.router.add_get('/v1/public/symbols', self.handle_symbols)
+        app.router.add_get('/v1/public/book', self.handle_book)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = 'http://{}:{}/v1/'.format(host, port)
+        return self.base_url
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> 'FakeExchange':
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    #
+    # Test controls
+    #
+    def fail_next(self, num_requests: int = 1, status: int = 500) -> None:
+        self._forced_errors.extend([status] * num_requests)
+
+    def slow_next(self, num_requests: int = 1, delay: float = 1) -> None:
+        self._forced_delays.extend([delay] * num_requests)
+
+    def expire_token(self) -> None:
+        self.token = None
+        self.secrets_by_token.clear()
+
+    def fill_order(self, order_id: int, volume: float = None) -> None:
+        # Fills volume of the order, or all of it if volume is None
+        order = self.active_orders[order_id]
+        if volume is not None and order['volume_done'] + volume < order['volume']:
+            order['volume_done'] = round(order['volume_done'] + volume, 8)
+            order['price_done'] = round(order['volume_done'] * order['rate'], 8)
+            return
+        self._finish_order(order_id, ORDER_STATUS_FILLED)
+
+    def _finish_order(self, order_id: int, status: int) -> None:
+        order = self.active_orders.pop(order_id)
+        order['status'] = status
+        order['time_done'] = int(time.time())
+        if status == ORDER_STATUS_FILLED:
+            order['volume_done'] = order['volume']
+            order['price_done'] = order['price']
+        self.history.insert(0, order)
+
+    #
+    # Request plumbing
+    #
+    async def _before_request(self, request: web.Request) -> Optional[web.Response]:
+        name = request.path[len('/v1/'):]
+        self.request_counts[name] = self.request_counts.get(name, 0) + 1
+        if request.method == 'POST':
+            payload = await request.json()
+            self.request_ids.append(payload.get('request_id'))
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self._forced_delays:
+            await asyncio.sleep(self._forced_delays.pop(0))
+
+        if self._forced_errors:
+            return self._error_response(self._forced_errors.pop(0))
+        if self.error_rate and random.random() < self.error_rate:
+            return self._error_response(self.error_status)
+        return None
+
+    def _error_response(self, status: int) -> web.Response:
+        return web.json_response({'status': False, 'error': 'Injected error'}, status=status)
+
+    async def _check_private_request(self, request: web.Request):
+        payload = await request.json()
+        secret = self.secrets_by_token.get(request.headers.get('login-token'))
+        if secret is None:
+            return payload, web.json_response({'status': False, 'error': 'Unauthorized'}, status=401)
+        if request.headers.get('x-auth-sign') != sign_payload(payload, secret):
+            return payload, web.json_response({'status': False, 'error': 'Invalid signature'}, status=401)
+        if 'request_id' not in payload:
+            return payload, web.json_response({'status': False, 'error': 'Missing request_id'}, status=400)
+        return payload, None
+
+    #
+    # Handlers
+    #
+    async def handle_login(self, request: web.Request) -> web.Response:
+        error = await self._before_request(request)
+        if error is not None:
+            return error
+
+        payload = await request.json()
+        if payload.get('username') not in self.accounts or payload.get('password') != self.accounts[payload['username']]:
+            return web.json_response({'status': False, 'errors': ['Wrong username or password']})
+
+        self.token = '%032x' % random.getrandbits(128)
+        self.secret = '%032x' % random.getrandbits(128)
+        self.secrets_by_token[self.token] = self.secret
+        return web.json_response({'status': True, 'token': self.token, 'data': {'secret': self.secret}})
+
+    async def handle_balances(self, request: web.Request) -> web.Response:
+        error = await self._before_request(request)
+        if error is not None:
+            return error
+        payload, error = await self._check_private_request(request)
+        if error is not None:
+            return error
+
+        return web.json_response({'status': True, 'data': {'list': self.balances}})
+
+    async def handle_create_order(self, request: web.Request) -> web.Response:
+        error = await self._before_request(request)
+        if error is not None:
+            return error
+        payload, error = await self._check_private_request(request)
+        if error is not None:
+            return error
+
+        if payload.get('type') not in (BUY, SELL) or 'rate' not in payload or 'volume' not in payload:
+            return web.json_response({'status': False, 'error': 'Invalid order'}, status=400)
+
+        # Sending the same request_id again returns the order that was already placed
+        if payload['request_id'] in self._order_ids_by_request_id:
+            return web.json_response({'status': True, 'data': {'id': self._order_ids_by_request_id[payload['request_id']]}})
+
+        order_id = next(self._order_ids)
+        self._order_ids_by_request_id[payload['request_id']] = order_id
+        rate = float(payload['rate'])
+        volume = float(payload['volume'])
+        self.active_orders[order_id] = {
+            'id': order_id,
+            'pair': payload['pair'],
+            'price': round(rate * volume, 8),
+            'price_done': 0,
+            'rate': rate,
+            'status': ORDER_STATUS_ACTIVE,
+            'time_create': int(time.time()),
+            'time_done': None,
+            'type': payload['type'],
+            'type_trade': payload['type_trade'],
+            'volume': volume,
+            'volume_done': 0,
+        }
+        return web.json_response({'status': True, 'data': {'id': order_id}})
+
+    async def handle_orders(self, request: web.Request) -> web.Response:
+        error = await self._before_request(request)
+        if error is not None:
+            return error
+        payload, error = await self._check_private_request(request)
+        if error is not None:
+            return error
+
+        # The real exchange sends an empty list instead of a dict when there are no orders
+        if len(self.active_orders) == 0:
+            return web.json_response({'status': True, 'data': []})
+        return web.json_response({'status': True, 'data': {'list': list(self.active_orders.values())}})
+
+    async def handle_history(self, request: web.Request) -> web.Response:
+        error = await self._before_request(request)
+        if error is not None:
+            return error
+        payload, error = await self._check_private_request(request)
+        if error is not None:
+            return error
+
+        return web.json_response({'status': True, 'data': {'list': self.history}})
+
+    async def handle_delete_order(self, request: web.Request) -> web.Response:
+        error = await self._before_request(request)
+        if error is not None:
+            return error
+        payload, error = await self._check_private_request(request)
+        if error is not None:
+            return error
+
+        order_id = payload.get('order_id')
+        if order_id not in self.active_orders:
+            return web.json_response({'status': False, 'error': 'Order not found'})
+
+        self._finish_order(order_id, ORDER_STATUS_CANCELLED)
+        return web.json_response({'status': True})
+
+    async def handle_symbols(self, request: web.Request) -> web.Response:
+        error = await self._before_request(request)
+        if error is not None:
+            return error
+
+        return web.json_response({'status': True, 'data': self.symbols})
+
+    async def handle_book(self, request: web.Request) -> web.Response:
+        error = await self._before_request(request)
+        if error is not None:
+            return error
+
+        order_book = self.order_books.get(request.query.get('pair'), self.order_book)
+        return web.json_response({'status': True, 'data': order_book})
+
+
+def run_with_exchange(test_coroutine, api_kwargs=None, **exchange_kwargs):
+    '''
+    Runs test_coroutine(exchange, api) against a new FakeExchange, with an AtomarsAlterdiceAPI pointed at it
+    '''
+    async def runner():
+        async with FakeExchange(**exchange_kwargs) as exchange:
+            async with AtomarsAlterdiceAPI(exchange.username, exchange.password, exchange.base_url,
+                                           **(api_kwargs or {})) as api:
+                await test_coroutine(exchange, api)
+    asyncio.run(runner())
+
+
+class ExchangeThread():
+    '''
+    Runs a FakeExchange on its own event loop in a background thread, for tests of synchronous callers
+    '''
+
+    def __init__(self, **exchange_kwargs):
+        self.exchange = FakeExchange(**exchange_kwargs)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    def __enter__(self) -> FakeExchange:
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self.exchange.start(), self.loop).result()
+        return self.exchange
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        asyncio.run_coroutine_threadsafe(self.exchange.close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+
+from atom_alter_API.constants import BUY, SELL
+from atom_alter_API.exceptions import HTTPRequestError, UnauthorizedError
+from atom_alter_API.orders import OrderRequest
+
+from fake_exchange import run_with_exchange
+
+#
+# Offline tests that run AtomarsAlterdiceAPI against the local fake exchange
+#
+
+
+def test_login_and_get_balances():
+    async def test(exchange, api):
+        await api.login()
+        balances = await api.get_balances()
+        assert set(balances) == {'HLS', 'ETH', 'BTC'}
+
+        nonzero_balances = await api.get_balances(True)
+        assert set(nonzero_balances) == {'HLS', 'ETH'}
+
+        balance = await api.get_balance('HLS')
+        assert balance['balance'] == 19957756355391
+    run_with_exchange(test)
+
+
+def test_order_lifecycle():
+    async def test(exchange, api):
+        await api.login()
+        buy_id = await api.limit_buy(0.0001, 1.5)
+        sell_id = await api.limit_sell(0.0003, 2, 'HLSBTC')
+
+        active_orders = await api.get_active_orders('HLSETH')
+        assert [order['id'] for order in active_orders] == [buy_id]
+        assert active_orders[0]['type'] == BUY
+
+        await api.delete_order(buy_id)
+        # Deleting an order that is already gone counts as a success
+        await api.delete_order(buy_id)
+        assert await api.is_order_complete(buy_id)
+        assert not await api.is_order_complete(sell_id)
+
+        await api.delete_all_orders('HLSBTC')
+        assert await api.get_active_orders() == []
+    run_with_exchange(test)
+
+
+def test_order_book_helpers():
+    async def test(exchange, api):
+        lowest_sell, highest_buy = await api.get_lowest_sell_and_highest_buy()
+        assert lowest_sell > highest_buy
+        assert lowest_sell == await api.get_lowest_sell()
+        assert highest_buy == await api.get_highest_buy()
+    run_with_exchange(test)
+
+
+def test_bad_signature_is_rejected():
+    async def test(exchange, api):
+        await api.login()
+        api.secret = 'wrong secret'
+        with pytest.raises(UnauthorizedError):
+            await api.get_balances()
+    run_with_exchange(test, api_kwargs={'auto_relogin': False})
+
+
+def test_injected_errors():
+    async def test(exchange, api):
+        exchange.fail_next(1, 500)
+        with pytest.raises(HTTPRequestError):
+            await api.get_ticker_list()
+        assert len(await api.get_ticker_list()) == 3
+    run_with_exchange(test)
+
+
+def test_place_orders():
+    async def test(exchange, api):
+        await api.login()
+        exchange.fail_next(1)
+        orders = [OrderRequest(BUY, 0.0001 + i * 0.000001, 1) for i in range(5)]
+        orders.append(OrderRequest(SELL, '0.00030000', '2', 'HLSBTC'))
+        result = await api.place_orders(orders, concurrency=2)
+
+        assert len(result.results) == 6
+        assert len(result.errors) == 1
+        assert isinstance(result.errors[0], HTTPRequestError)
+        assert not result.all_succeeded
+        active_order_ids = {order['id'] for order in await api.get_active_orders()}
+        assert active_order_ids == set(result.order_ids)
+    run_with_exchange(test)
+
+
+def test_are_orders_complete_uses_local_history():
+    async def test(exchange, api):
+        await api.login()
+        result = await api.place_orders([OrderRequest(BUY, 0.0001, 1) for _ in range(4)])
+        order_ids = result.order_ids
+        exchange.fill_order(order_ids[0])
+        await api.delete_order(order_ids[1])
+
+        complete = await asyncio.gather(*[api.is_order_complete(order_id) for order_id in order_ids])
+        assert complete == [True, True, False, False]
+        assert exchange.request_counts['private/history'] == 1
+
+        # Both are already in the local store so no request is needed
+        assert await api.are_orders_complete(order_ids[:2]) == {order_ids[0]: True, order_ids[1]: True}
+        assert exchange.request_counts['private/history'] == 1
+
+        exchange.fill_order(order_ids[2])
+        assert await api.are_orders_complete(order_ids[2:]) == {order_ids[2]: True, order_ids[3]: False}
+        assert exchange.request_counts['private/history'] == 2
+        assert len(api.order_history_store.get_orders_for_pair('HLSETH')) == 3
+    run_with_exchange(test)
+
+
+def test_expired_token_logs_in_once():
+    async def test(exchange, api):
+        await api.login()
+        exchange.expire_token()
+
+        results = await asyncio.gather(*[api.get_balances() for _ in range(10)], api.delete_order(12345))
+        assert all('HLS' in balances for balances in results[:10])
+        assert exchange.request_counts['login'] == 2
+    run_with_exchange(test)
+
+
+def test_token_is_refreshed_before_it_expires():
+    async def test(exchange, api):
+        await api.login()
+        await api.get_balances()
+        assert exchange.request_counts['login'] == 1
+
+        await asyncio.sleep(0.06)
+        await asyncio.gather(*[api.get_balances() for _ in range(5)])
+        assert exchange.request_counts['login'] == 2
+        # No request was rejected and sent again
+        assert exchange.request_counts['private/balances'] == 6
+    run_with_exchange(test, api_kwargs={'token_refresh_after': 0.05})
@@ -0,0 +1,80 @@
+import subprocess
+import sys
+
+from typing import List, Set, Tuple
+
+#
+# Measures the import time of the atom_alter_API modules with python -X importtime and checks it against a budget.
+# Heavy dependencies like aiohttp must only be imported on first network use.
+# Usage: python import_time_benchmark.py
+#
+
+# Cumulative import time budgets in microseconds. These are generous so they hold on slow machines,
+# but are far below what importing aiohttp costs.
+IMPORT_TIME_BUDGETS = {
+    'atom_alter_API.constants': 30000,
+    'atom_alter_API.utils.mathematical': 50000,
+    'atom_alter_API.api': 150000,
+}
+
+# Modules that must not be imported just by importing the package
+FORBIDDEN_MODULES = ['aiohttp', 'eth_utils', 'numpy']
+
+NUM_RUNS = 5
+
+
+def measure_import(module: str) -> Tuple[int, Set[str]]:
+    '''
+    Returns the cumulative import time of module in microseconds, and the names of all modules it imported.
+    '''
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import {}'.format(module)],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+
+    cumulative_time = None
+    imported_modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        parts = line[len('import time:'):].split('|')
+        if not parts[1].strip().isdigit():
+            # header line
+            continue
+        name = parts[2].strip()
+        imported_modules.add(name)
+        if name == module:
+            cumulative_time = int(parts[1])
+    return cumulative_time, imported_modules
+
+
+def check_forbidden_imports() -> List[str]:
+    '''
+    Returns a list of the heavy modules that are imported by importing the atom_alter_API modules.
+    '''
+    violations = []
+    for module in IMPORT_TIME_BUDGETS:
+        imported_modules = measure_import(module)[1]
+        for forbidden in FORBIDDEN_MODULES:
+            if forbidden in imported_modules:
+                violations.append('{} imports {}'.format(module, forbidden))
+    return violations
+
+
+def check_import_budgets() -> List[str]:
+    '''
+    Returns a list of budget violations. The best of several runs is used to reduce noise.
+    '''
+    violations = []
+    for module, budget in IMPORT_TIME_BUDGETS.items():
+        best_time = min(measure_import(module)[0] for _ in range(NUM_RUNS))
+
+        print('{:<40}{:>10} us{:>12} us budget'.format(module, best_time, budget))
+        if best_time > budget:
+            violations.append('{} took {} us to import, the budget is {} us'.format(module, best_time, budget))
+    return violations
+
+
+if __name__ == "__main__":
+    violations = check_import_budgets() + check_forbidden_imports()
+    for violation in violations:
+        print(violation)
+    sys.exit(1 if violations else 0)
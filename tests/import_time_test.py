@@ -0,0 +1,6 @@
+from import_time_benchmark import check_forbidden_imports
+
+
+def test_heavy_modules_are_not_imported():
+    # Import times depend on the machine, so the time budgets are only checked by import_time_benchmark.py
+    assert check_forbidden_imports() == []
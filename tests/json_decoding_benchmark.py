@@ -0,0 +1,51 @@
+import json
+import timeit
+
+from atom_alter_API.utils.json_decoding import (
+    json_loads,
+    fast_json_loads,
+    make_decimal_json_loads,
+    make_satoshi_json_loads,
+)
+from atom_alter_API.utils.mathematical import to_decimal
+
+from fake_exchange import make_order_book
+
+#
+# Compares decoding a large order book response into Decimal prices with the old path
+# (resp.json() into floats, then to_decimal on every level) and the decoders in utils/json_decoding.py.
+# Usage: python json_decoding_benchmark.py
+#
+
+def decode_then_to_decimal(loads, body):
+    order_book = loads(body)['data']
+    return [(to_decimal(level['rate']), to_decimal(level['volume'])) for level in order_book['buy'] + order_book['sell']]
+
+
+def decode_only(loads, body):
+    order_book = loads(body)['data']
+    return [(level['rate'], level['volume']) for level in order_book['buy'] + order_book['sell']]
+
+
+def main(num_levels: int = 10000, number: int = 10) -> None:
+    body = json.dumps({'status': True, 'data': make_order_book(num_levels)}).encode('utf-8')
+    decimal_json_loads = make_decimal_json_loads()
+    satoshi_json_loads = make_satoshi_json_loads()
+
+    benchmarks = [
+        ('json + to_decimal (old)', lambda: decode_then_to_decimal(json_loads, body)),
+        ('fast_json_loads + to_decimal', lambda: decode_then_to_decimal(fast_json_loads, body)),
+        ('fast_json_loads (floats)', lambda: decode_only(fast_json_loads, body)),
+        ('decimal_json_loads', lambda: decode_only(decimal_json_loads, body)),
+        ('satoshi_json_loads', lambda: decode_only(satoshi_json_loads, body)),
+    ]
+
+    print('Order book with {} levels per side, {} KB'.format(num_levels, len(body) // 1024))
+    print('{:<34}{:>12}'.format('decoder', 'ms/book'))
+    for name, benchmark in benchmarks:
+        elapsed = timeit.timeit(benchmark, number=number)
+        print('{:<34}{:>12.2f}'.format(name, elapsed / number * 1000))
+
+
+if __name__ == "__main__":
+    main()
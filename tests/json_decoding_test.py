@@ -0,0 +1,76 @@
+from decimal import Decimal
+
+import pytest
+
+from atom_alter_API.constants import SELL
+from atom_alter_API.utils.json_decoding import fast_json_loads, make_decimal_json_loads, make_satoshi_json_loads
+
+from fake_exchange import run_with_exchange
+
+ORDER_BOOK_BODY = (b'{"status": true, "data": {'
+                   b'"buy": [{"count": 1, "rate": 0.00018328, "volume": 0.07408359},'
+                   b'        {"count": 3, "rate": "0.000001", "volume": 13900}],'
+                   b'"sell": [{"count": 1, "rate": 1, "volume": 562}]}}')
+
+
+def test_fast_json_loads():
+    decoded = fast_json_loads(ORDER_BOOK_BODY)
+    assert decoded['data']['buy'][0]['rate'] == 0.00018328
+
+
+def test_decimal_json_loads():
+    decoded = make_decimal_json_loads()(ORDER_BOOK_BODY)
+    assert decoded['data']['buy'][0] == {'count': 1, 'rate': Decimal('0.00018328'), 'volume': Decimal('0.07408359')}
+    assert decoded['data']['buy'][1]['rate'] == Decimal('0.000001')
+    assert decoded['data']['sell'][0]['rate'] == Decimal(1)
+    assert decoded['status'] is True
+
+
+def test_satoshi_json_loads():
+    decoded = make_satoshi_json_loads()(ORDER_BOOK_BODY)
+    assert decoded['data']['buy'][0] == {'count': 1, 'rate': 18328, 'volume': 7408359}
+    assert decoded['data']['buy'][1]['rate'] == 100
+    assert decoded['data']['sell'][0] == {'count': 1, 'rate': 100000000, 'volume': 56200000000}
+
+
+def test_api_with_decimal_decoder():
+    async def test(exchange, api):
+        order_book = await api.get_order_book()
+        assert isinstance(order_book['buy'][0]['rate'], Decimal)
+        lowest_sell, highest_buy = await api.get_lowest_sell_and_highest_buy(order_book=order_book)
+        assert lowest_sell > highest_buy
+    run_with_exchange(test, api_kwargs={'json_decoder': make_decimal_json_loads()})
+
+
+def test_order_book_helpers_return_coins_with_every_decoder():
+    expected = (Decimal('0.00018018'), Decimal('0.00017982'))
+
+    async def test(exchange, api):
+        await api.login()
+        await api.limit_buy(0.00017, 2.5)
+
+        assert await api.get_lowest_sell_and_highest_buy() == expected
+        assert await api.get_lowest_sell_and_highest_buy(order_book=await api.get_order_book()) == expected
+        assert await api.get_lowest_sell() == expected[0]
+        assert await api.get_highest_buy() == expected[1]
+        order_book = await api.get_parsed_order_book()
+        assert order_book.get_volume_at_price(SELL, expected[0]) == 1
+
+        order = (await api.get_active_orders())[0]
+        if api.typed_returns:
+            assert order.rate == Decimal('0.00017')
+            assert order.volume == Decimal('2.5')
+
+    for json_decoder in [None, make_decimal_json_loads(), make_satoshi_json_loads()]:
+        for typed_returns in [False, True]:
+            run_with_exchange(test, api_kwargs={'json_decoder': json_decoder, 'typed_returns': typed_returns})
+
+
+def test_book_arrays_from_satoshi_order_book():
+    pytest.importorskip('numpy')
+    from atom_alter_API.analytics import BookArrays
+
+    decoded = make_satoshi_json_loads()(ORDER_BOOK_BODY)['data']
+    book = BookArrays.from_order_book(decoded, in_satoshis=True)
+    assert book.best_bid == 0.00018328
+    assert book.best_ask == 1
@@ -0,0 +1,75 @@
+import asyncio
+import logging
+import tempfile
+import time
+import timeit
+
+from pathlib import Path
+
+from atom_alter_API.paper_trading import MatchingEngine, PaperTradingAPI
+from atom_alter_API.utils.logging import setup_logger
+
+#
+# Measures the logging overhead on the calling thread. First for a single debug call with DEBUG off, formatted
+# eagerly with .format and lazily with % arguments, and then per order placed and cancelled with
+# PaperTradingAPI, which has no network, under each logging setup.
+# Usage: python logging_benchmark.py
+#
+
+def reset_root_logger() -> None:
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.setLevel(logging.WARNING)
+
+
+async def place_and_cancel(num_orders: int) -> float:
+    async with PaperTradingAPI(MatchingEngine(balances={'ETH': 10 ** 12})) as api:
+        await api.login()
+        start = time.perf_counter()
+        for _ in range(num_orders):
+            order_id = await api.limit_buy(0.0001, 1)
+            await api.delete_order(order_id)
+        return time.perf_counter() - start
+
+
+def main(num_calls: int = 100000, num_orders: int = 5000) -> None:
+    reset_root_logger()
+    logger = logging.getLogger('atom_alter_API.benchmark')
+    price, volume, pair = '0.00018018', '1.00000000', 'HLSETH'
+    eager = timeit.timeit(lambda: logger.debug('Executing limit_buy with price: {}, volume: {}, pair: {}'.format(price, volume, pair)),
+                          number=num_calls)
+    lazy = timeit.timeit(lambda: logger.debug('Executing limit_buy with price: %s, volume: %s, pair: %s', price, volume, pair),
+                         number=num_calls)
+    print('One debug call with DEBUG off')
+    print('{:<34}{:>12}'.format('formatting', 'us/call'))
+    print('{:<34}{:>12.3f}'.format('eager .format', eager / num_calls * 1e6))
+    print('{:<34}{:>12.3f}'.format('lazy %', lazy / num_calls * 1e6))
+
+    setups = [
+        ('no handlers, WARNING', None),
+        ('file and stderr, DEBUG', {}),
+        ('queue, DEBUG', {'use_queue': True}),
+        ('queue with JSON lines, DEBUG', {'use_queue': True, 'json_lines': True}),
+    ]
+    print('\nlimit_buy and delete_order with PaperTradingAPI, stderr to /dev/null')
+    print('{:<34}{:>12}'.format('logging', 'us/order'))
+    with tempfile.TemporaryDirectory() as directory, open('/dev/null', 'w') as devnull:
+        for name, kwargs in setups:
+            reset_root_logger()
+            listener = None
+            if kwargs is not None:
+                listener = setup_logger(Path(directory) / 'log.txt', **kwargs)
+                for handler in list(logging.getLogger().handlers) + (list(listener.handlers) if listener else []):
+                    if type(handler) is logging.StreamHandler:
+                        handler.setStream(devnull)
+            elapsed = asyncio.run(place_and_cancel(num_orders))
+            if listener is not None:
+                listener.stop()
+            print('{:<34}{:>12.1f}'.format(name, elapsed / num_orders * 1e6))
+    reset_root_logger()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import asyncio
+import json
+import logging
+
+from logging.handlers import QueueHandler
+
+import pytest
+
+from atom_alter_API.paper_trading import MatchingEngine, PaperTradingAPI
+from atom_alter_API.utils.logging import setup_logger
+
+
+@pytest.fixture
+def root_logger():
+    # setup_logger configures the root logger, so put it back the way it was afterwards
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    level = root.level
+    yield root
+    for handler in list(root.handlers):
+        if handler not in handlers:
+            root.removeHandler(handler)
+            handler.close()
+    root.setLevel(level)
+
+
+def test_queue_logging_writes_json_lines_from_a_background_thread(tmp_path, root_logger):
+    listener = setup_logger(tmp_path / 'log.txt', use_queue=True, json_lines=True)
+    new_handlers = [handler for handler in root_logger.handlers if isinstance(handler, QueueHandler)]
+    assert len(new_handlers) == 1
+
+    logging.getLogger('atom_alter_API.test').info('placed %s orders', 3)
+    try:
+        raise ValueError('bad order')
+    except ValueError:
+        logging.getLogger('atom_alter_API.test').exception('order failed')
+    listener.stop()
+    # Stopping again, as happens at exit, is fine
+    listener.stop()
+
+    lines = [json.loads(line) for line in (tmp_path / 'log.txt').read_text().splitlines()]
+    assert lines[0]['message'] == 'placed 3 orders'
+    assert lines[0]['level'] == 'INFO'
+    assert lines[0]['logger'] == 'atom_alter_API.test'
+    assert 'ValueError: bad order' in lines[1]['message']
+
+
+def test_api_logs_lazily(tmp_path, root_logger):
+    assert setup_logger(tmp_path / 'log.txt') is None
+
+    async def run():
+        async with PaperTradingAPI(MatchingEngine(balances={'ETH': 10 ** 8})) as api:
+            await api.login()
+            await api.limit_buy(0.0001, 1)
+
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    root_logger.addHandler(handler)
+    asyncio.run(run())
+
+    [record] = [record for record in records if record.getMessage().startswith('Executing limit_buy')]
+    assert record.args == ('0.00010000', '1.00000000', 'HLSETH')
+    assert 'Executing limit_buy' in (tmp_path / 'log.txt').read_text()
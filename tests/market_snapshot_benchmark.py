@@ -0,0 +1,43 @@
+import asyncio
+import time
+
+from atom_alter_API.api import AtomarsAlterdiceAPI
+
+from fake_exchange import FakeExchange
+
+#
+# Compares reading the top of book of every pair one pair at a time with get_top_of_book, which fetches them
+# all at once.
+# Usage: python market_snapshot_benchmark.py
+#
+
+async def top_of_book_pair_by_pair(api: AtomarsAlterdiceAPI, pairs):
+    tops = {}
+    for pair in pairs:
+        order_book = await api.get_order_book(pair)
+        tops[pair] = await api.get_lowest_sell_and_highest_buy(pair, order_book)
+    return tops
+
+
+async def run(num_pairs: int, latency: float, number: int) -> None:
+    symbols = [{'base': 'COIN{}'.format(i), 'pair': 'COIN{}ETH'.format(i), 'quote': 'ETH'} for i in range(num_pairs)]
+    pairs = [symbol['pair'] for symbol in symbols]
+    async with FakeExchange(latency=latency, symbols=symbols) as exchange:
+        async with AtomarsAlterdiceAPI(exchange.username, exchange.password, exchange.base_url) as api:
+            await api.validate_pairs(pairs)
+            print('{} pairs, {}ms server latency'.format(num_pairs, latency * 1000))
+            print('{:<28}{:>12}'.format('method', 'ms/sweep'))
+            for name, sweep in [('pair by pair', lambda: top_of_book_pair_by_pair(api, pairs)),
+                                ('get_top_of_book', lambda: api.get_top_of_book(pairs, validate=True))]:
+                start = time.perf_counter()
+                for _ in range(number):
+                    await sweep()
+                print('{:<28}{:>12.1f}'.format(name, (time.perf_counter() - start) / number * 1000))
+
+
+def main(num_pairs: int = 20, latency: float = 0.02, number: int = 10) -> None:
+    asyncio.run(run(num_pairs, latency, number))
+
+
+if __name__ == "__main__":
+    main()
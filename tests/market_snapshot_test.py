@@ -0,0 +1,75 @@
+import time
+
+from decimal import Decimal
+
+import pytest
+
+from atom_alter_API.exceptions import HTTPRequestError
+from atom_alter_API.order_book import BookSnapshot
+from atom_alter_API.utils.json_decoding import make_satoshi_json_loads
+
+from fake_exchange import run_with_exchange, make_order_book
+
+SYMBOLS = [{'base': 'COIN{}'.format(i), 'pair': 'COIN{}ETH'.format(i), 'quote': 'ETH'} for i in range(20)]
+PAIRS = [symbol['pair'] for symbol in SYMBOLS]
+
+
+def test_order_books_are_fetched_concurrently():
+    async def test(exchange, api):
+        start = time.perf_counter()
+        snapshot = await api.get_order_books(PAIRS + [PAIRS[0]])
+        elapsed = time.perf_counter() - start
+
+        # 20 books at 50ms each take about one round trip, not twenty
+        assert elapsed < 0.5
+        assert snapshot.all_succeeded
+        assert list(snapshot.books) == PAIRS
+        assert exchange.request_counts['public/book'] == 20
+        assert all(type(book) is BookSnapshot for book in snapshot.books.values())
+        assert snapshot.skew < 0.5
+        assert snapshot.books['COIN0ETH'].best_ask == Decimal('0.00018018')
+        assert snapshot.books['COIN1ETH'].best_bid == Decimal('0.00099900')
+        assert len(snapshot.books['COIN1ETH'].order_book) == 4
+
+        tops = await api.get_top_of_book(PAIRS[:2], concurrency=1)
+        assert tops.books['COIN1ETH'].best_ask == Decimal('0.00100100')
+        assert tops.books['COIN0ETH'].best_bid == Decimal('0.00017982')
+        assert tops.books['COIN0ETH'].fetched_at <= tops.books['COIN1ETH'].fetched_at
+    run_with_exchange(test, latency=0.05, symbols=SYMBOLS, order_books={'COIN1ETH': make_order_book(2, 0.001)})
+
+
+def test_pairs_are_validated_against_the_cached_ticker_list():
+    async def test(exchange, api):
+        with pytest.raises(ValueError, match='NOPE, HLSXRP'):
+            await api.get_order_books(['HLSETH', 'NOPE', 'HLSXRP'], validate=True)
+        assert 'public/book' not in exchange.request_counts
+
+        snapshot = await api.get_top_of_book(['HLSETH', 'HLSBTC'], validate=True)
+        assert snapshot.books['HLSBTC'] == (Decimal('0.00018018'), Decimal('0.00017982'), snapshot.books['HLSBTC'].fetched_at)
+        await api.validate_pairs(['HLSUSDT'])
+        assert exchange.request_counts['public/symbols'] == 1
+
+        pairs = await api.get_pairs()
+        assert pairs['HLSETH']['quote'] == 'ETH'
+        pairs.clear()
+        assert 'HLSETH' in await api.get_pairs()
+
+        api.clear_caches()
+        await api.validate_pairs(['HLSETH'])
+        assert exchange.request_counts['public/symbols'] == 2
+    run_with_exchange(test)
+
+
+def test_failed_pairs_are_reported_separately():
+    async def test(exchange, api):
+        exchange.fail_next(1)
+        snapshot = await api.get_order_books(['HLSETH', 'HLSBTC'], concurrency=1)
+        assert not snapshot.all_succeeded
+        assert list(snapshot.books) == ['HLSBTC']
+        assert isinstance(snapshot.failed['HLSETH'], HTTPRequestError)
+        assert snapshot.skew == 0
+
+        # Satoshi decoded books are still parsed in whole coins
+        tops = await api.get_top_of_book(['HLSETH'])
+        assert tops.books['HLSETH'].best_ask == Decimal('0.00018018')
+    run_with_exchange(test, api_kwargs={'json_decoder': make_satoshi_json_loads()})
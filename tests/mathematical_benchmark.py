@@ -0,0 +1,68 @@
+import random
+import timeit
+
+from decimal import Decimal
+
+from atom_alter_API.utils.mathematical import (
+    Satoshis,
+    float_to_string,
+    to_decimal,
+    add_random_percentage,
+    calculate_order_amount_based_on_current_balance,
+    to_satoshis_list,
+    format_satoshis_list,
+    to_satoshis_array)
+
+#
+# Compares sizing orders and converting amounts with Decimal against the integer Satoshis type.
+# Usage: python mathematical_benchmark.py
+#
+
+def size_orders_with_decimal(prices, balance):
+    payloads = []
+    for price in prices:
+        volume = calculate_order_amount_based_on_current_balance(Decimal(1000), balance, Decimal(100), 10)
+        payloads.append((float_to_string(add_random_percentage(price, 1)), float_to_string(volume)))
+    return payloads
+
+
+def size_orders_with_satoshis(prices, balance):
+    payloads = []
+    for price in prices:
+        volume = calculate_order_amount_based_on_current_balance(Satoshis(1000 * 10 ** 8), balance, Satoshis(100 * 10 ** 8), 10)
+        payloads.append((float_to_string(add_random_percentage(price, 1)), float_to_string(volume)))
+    return payloads
+
+
+def main(num_orders: int = 10000, num_amounts: int = 100000, number: int = 5) -> None:
+    prices = [round(random.uniform(0.0001, 0.0002), 8) for _ in range(num_orders)]
+    satoshi_prices = to_satoshis_list(prices)
+    amounts = [round(random.uniform(0, 10000), 8) for _ in range(num_amounts)]
+    decimal_amounts = [to_decimal(amount) for amount in amounts]
+    satoshi_amounts = to_satoshis_array(amounts)
+
+    benchmarks = [
+        ('size {} orders'.format(num_orders), [
+            ('Decimal', lambda: size_orders_with_decimal(prices, Decimal('950.5'))),
+            ('Satoshis', lambda: size_orders_with_satoshis(satoshi_prices, Satoshis(95050000000))),
+        ]),
+        ('convert {} floats'.format(num_amounts), [
+            ('to_decimal', lambda: [to_decimal(amount) for amount in amounts]),
+            ('to_satoshis_list', lambda: to_satoshis_list(amounts)),
+            ('to_satoshis_array', lambda: to_satoshis_array(amounts)),
+        ]),
+        ('format {} amounts'.format(num_amounts), [
+            ('float_to_string(Decimal)', lambda: [float_to_string(amount) for amount in decimal_amounts]),
+            ('format_satoshis_list', lambda: format_satoshis_list(satoshi_amounts)),
+        ]),
+    ]
+
+    print('{:<24}{:<28}{:>12}'.format('benchmark', 'method', 'ms'))
+    for benchmark_name, methods in benchmarks:
+        for name, method in methods:
+            elapsed = timeit.timeit(method, number=number)
+            print('{:<24}{:<28}{:>12.2f}'.format(benchmark_name, name, elapsed / number * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import random
+
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from atom_alter_API.constants import SATOSHI
+from atom_alter_API.utils.json_decoding import make_satoshi_json_loads
+from atom_alter_API.utils.mathematical import (
+    Satoshis,
+    float_to_string,
+    to_decimal,
+    to_satoshis,
+    add_random_percentage,
+    scale_by_random_percentage,
+    calculate_order_amount_based_on_current_balance,
+    satoshi_to_actual,
+    format_satoshis,
+    to_satoshis_list,
+    format_satoshis_list,
+    to_satoshis_array)
+
+from fake_exchange import run_with_exchange
+
+
+def test_satoshis_format_like_floats():
+    for amount in [0.00018018, 1.0, 12345.12345678, 0.00000001, 0.0, 99999.99999999]:
+        satoshis = Satoshis.from_coins(amount)
+        assert str(satoshis) == float_to_string(satoshis) == float_to_string(amount)
+        assert to_decimal(satoshis) == satoshis.to_decimal() == to_decimal(amount)
+    assert format_satoshis(-150000000) == '-1.50000000'
+    assert repr(Satoshis(5)) == 'Satoshis(5)'
+
+
+def test_satoshis_arithmetic_rounds_half_to_even():
+    price = Satoshis.from_coins('0.00018018')
+    volume = Satoshis.from_coins('1.5')
+
+    cost = price * volume
+    assert type(cost) is Satoshis
+    assert cost == Satoshis.from_coins('0.00027027')
+    assert cost / price == volume
+    assert sum([price, price]) == Satoshis(36036)
+    assert type(price - 1) is Satoshis
+    assert 100 - price == Satoshis(-17918)
+
+    # 0.5 and 1.5 satoshis round to even, like Decimal
+    assert Satoshis(1) / 2 == 0
+    assert Satoshis(3) / 2 == 2
+    assert Satoshis(5) * 0.5 == 2
+    assert Satoshis(-3) / 2 == -2
+    assert Satoshis(10) * Decimal('0.25') == 2
+    for _ in range(200):
+        a, b = random.randint(-10 ** 12, 10 ** 12), random.randint(1, 10 ** 12)
+        expected = (Decimal(a) * SATOSHI * Decimal(b) * SATOSHI).quantize(SATOSHI)
+        assert (Satoshis(a) * Satoshis(b)).to_decimal() == expected
+
+    with pytest.raises(TypeError):
+        price + 0.1
+    with pytest.raises(TypeError):
+        price - Decimal('0.1')
+
+
+def test_helpers_keep_satoshis():
+    amount = Satoshis.from_coins(2)
+    random.seed(1)
+    changed = add_random_percentage(amount, 10)
+    assert type(changed) is Satoshis
+    assert Satoshis.from_coins(1.8) <= changed <= Satoshis.from_coins(2.2)
+    scaled = scale_by_random_percentage(amount, 10)
+    assert type(scaled) is Satoshis
+    assert 0 <= scaled <= Satoshis.from_coins(0.2)
+
+    assert satoshi_to_actual(18018) == Decimal('0.00018018')
+    assert str(satoshi_to_actual(100000000)) == str(satoshi_to_actual(100000000.0)) == '1.00000000'
+
+    # The same sizing as with Decimals, rounded to a satoshi
+    for current_balance in ['1', '0.99', '0.5', '0']:
+        expected = calculate_order_amount_based_on_current_balance(1, Decimal(current_balance), Decimal('0.05'), 3)
+        amount = calculate_order_amount_based_on_current_balance(Satoshis.from_coins(1),
+                                                                 Satoshis.from_coins(current_balance),
+                                                                 Satoshis.from_coins('0.05'), 3)
+        assert type(amount) is Satoshis
+        assert amount.to_decimal() == expected.quantize(SATOSHI)
+
+
+def test_bulk_conversions():
+    amounts = [0.00018018, 1.5, 12345.12345678, 20000000.00000001, -0.1]
+    satoshis = to_satoshis_array(amounts)
+    assert satoshis.dtype == np.int64
+    assert satoshis.tolist() == [to_satoshis(amount) for amount in amounts]
+    assert to_satoshis_array(np.array(amounts)).tolist() == satoshis.tolist()
+    assert to_satoshis_array(['0.1', Decimal('2')]).tolist() == [10000000, 200000000]
+    assert to_satoshis_array([3, 4]).tolist() == [300000000, 400000000]
+
+    satoshis_list = to_satoshis_list(amounts)
+    assert all(type(amount) is Satoshis for amount in satoshis_list)
+    assert to_satoshis_array(satoshis_list).tolist() == satoshis.tolist()
+
+    assert format_satoshis_list(satoshis) == format_satoshis_list(satoshis_list) == \
+        [float_to_string(amount) for amount in amounts]
+
+
+def test_satoshi_decoder_to_payload():
+    loads = make_satoshi_json_loads()
+    level = loads(b'{"rate": 0.00018018, "volume": 12345.12345678, "count": 1}')
+    assert type(level['rate']) is Satoshis
+    assert level['count'] == 1
+    assert float_to_string(level['rate'] * level['volume']) == '2.22434434'
+    assert float_to_string(level['volume']) == '12345.12345678'
+
+
+def test_satoshis_from_response_to_payload():
+    async def test(exchange, api):
+        await api.login()
+        best_bid = (await api.get_order_book())['buy'][0]
+        order_id = await api.limit_sell(best_bid['rate'], best_bid['volume'] / 2)
+        assert exchange.active_orders[order_id]['rate'] == 0.00017982
+        assert exchange.active_orders[order_id]['volume'] == 0.5
+    run_with_exchange(test, api_kwargs={'json_decoder': make_satoshi_json_loads()})
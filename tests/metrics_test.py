@@ -0,0 +1,61 @@
+import pytest
+
+from atom_alter_API.exceptions import HTTPRequestError
+from atom_alter_API.utils.metrics import Histogram, RequestMetrics
+
+from fake_exchange import run_with_exchange
+
+
+def test_histogram():
+    histogram = Histogram([0.1, 1, 10])
+    for value in [0.05, 0.5, 0.5, 5, 50]:
+        histogram.observe(value)
+
+    assert histogram.get_cumulative_counts() == [(0.1, 1), (1, 3), (10, 4), (float('inf'), 5)]
+    assert histogram.get_percentile(50) == 1
+    assert histogram.get_percentile(100) == float('inf')
+    assert Histogram().get_percentile(50) is None
+
+
+def test_requests_and_errors_are_recorded():
+    metrics = RequestMetrics()
+    events = []
+    metrics.add_hook(events.append)
+
+    async def test(exchange, api):
+        await api.login()
+        await api.limit_buy(0.0001, 1)
+        await api.get_order_book()
+
+        exchange.fail_next(1, 500)
+        with pytest.raises(HTTPRequestError):
+            await api.get_ticker_list()
+    run_with_exchange(test, api_kwargs={'metrics': metrics})
+
+    assert metrics.request_counts == {'login': 1, 'private/create-order': 1, 'public/book': 1, 'public/symbols': 1}
+    assert metrics.error_counts == {('public/symbols', 'HTTPRequestError'): 1}
+    assert metrics.signing_latency.count == 1
+
+    for phase in ['total', 'ttfb', 'decode']:
+        assert metrics.latencies[('private/create-order', phase)].count == 1
+    # The first request opens the connection
+    assert metrics.latencies[('login', 'connect')].count == 1
+
+    assert [event['endpoint'] for event in events] == ['login', 'private/create-order', 'public/book',
+                                                       'public/symbols', 'public/symbols']
+    assert isinstance(events[-1]['error'], HTTPRequestError)
+
+
+def test_prometheus_export():
+    metrics = RequestMetrics()
+
+    async def test(exchange, api):
+        await api.login()
+        await api.limit_buy(0.0001, 1)
+    run_with_exchange(test, api_kwargs={'metrics': metrics})
+
+    text = metrics.to_prometheus()
+    assert 'atom_alter_api_requests_total{endpoint="private/create-order"} 1\n' in text
+    assert 'atom_alter_api_request_phase_seconds_bucket{endpoint="private/create-order",phase="ttfb",le="+Inf"} 1\n' in text
+    assert 'atom_alter_api_request_phase_seconds_count{endpoint="private/create-order",phase="ttfb"} 1\n' in text
+    assert 'atom_alter_api_signing_seconds_count 1\n' in text
@@ -0,0 +1,65 @@
+import gc
+import json
+import tracemalloc
+
+from typing import Callable, List
+
+from atom_alter_API.models import Order, BookLevel
+
+from fake_exchange import make_order_book
+
+#
+# Compares the memory used by order history and order book records stored as the raw dicts from the API
+# with the __slots__ models in atom_alter_API/models.py.
+# Usage: python models_benchmark.py
+#
+
+def make_order_history_body(num_orders: int) -> bytes:
+    orders = [{'id': 418138992 + i,
+               'pair': 'HLSBTC',
+               'price': 6e-08 + i * 1e-10,
+               'price_done': 6e-08,
+               'rate': 2.34e-06 + i * 1e-10,
+               'status': 2,
+               'time_create': 1571422528 + i,
+               'time_done': 1571422764 + i,
+               'type': i % 2,
+               'type_trade': 0,
+               'volume': 0.02903803 + i * 1e-8,
+               'volume_done': 0.02903803} for i in range(num_orders)]
+    return json.dumps(orders).encode('utf-8')
+
+
+def measure_memory(build: Callable[[], List]) -> int:
+    '''
+    Returns the number of bytes still allocated by the records that build returns.
+    '''
+    gc.collect()
+    tracemalloc.start()
+    records = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return current
+
+
+def main(num_orders: int = 50000, num_levels: int = 50000) -> None:
+    history_body = make_order_history_body(num_orders)
+    book_body = json.dumps(make_order_book(num_levels)['buy']).encode('utf-8')
+
+    benchmarks = [
+        ('order history as dicts', lambda: json.loads(history_body), num_orders),
+        ('order history as Order', lambda: [Order.from_dict(order) for order in json.loads(history_body)], num_orders),
+        ('book levels as dicts', lambda: json.loads(book_body), num_levels),
+        ('book levels as BookLevel', lambda: [BookLevel.from_dict(level) for level in json.loads(book_body)], num_levels),
+    ]
+
+    print('{:<30}{:>12}{:>16}'.format('representation', 'MB', 'bytes/record'))
+    for name, build, num_records in benchmarks:
+        memory = measure_memory(build)
+        print('{:<30}{:>12.2f}{:>16.0f}'.format(name, memory / 1e6, memory / num_records))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import asyncio
+
+from decimal import Decimal
+
+from atom_alter_API.api import AtomarsAlterdiceAPI
+from atom_alter_API.models import Order, Balance, BookLevel
+
+from fake_exchange import FakeExchange
+
+TEST_ORDER = {'id': 418138992,
+              'pair': 'HLSBTC',
+              'price': 6e-08,
+              'price_done': 6e-08,
+              'rate': 2.34e-06,
+              'status': 2,
+              'time_create': 1571422528,
+              'time_done': 1571422764,
+              'type': 1,
+              'type_trade': 0,
+              'volume': 0.02903803,
+              'volume_done': 0.02903803}
+
+
+def test_order_lazy_conversion():
+    order = Order.from_dict(TEST_ORDER)
+    assert order._rate == 2.34e-06
+    assert order.rate == Decimal('0.00000234')
+    assert type(order._rate) is Decimal
+    assert order['volume_done'] == Decimal('0.02903803')
+    assert order.get('time_done') == 1571422764
+    assert order.get('missing') is None
+    assert set(order.to_dict()) == set(TEST_ORDER)
+    assert not hasattr(order, '__dict__')
+
+
+def test_balance_and_book_level():
+    balance = Balance.from_dict({'balance': 199577563553,
+                                 'balance_available': 100000000,
+                                 'currency': {'iso3': 'HLS', 'name': 'Helios Protocol'}})
+    assert balance.currency == 'HLS'
+    assert balance.balance_actual == Decimal('1995.77563553')
+    assert balance.balance_available_actual == Decimal(1)
+
+    level = BookLevel.from_dict({'count': 3, 'rate': '0.000001', 'volume': 13900})
+    assert level.rate == Decimal('0.000001')
+    assert level.volume == Decimal(13900)
+
+
+def test_api_typed_returns():
+    async def test():
+        async with FakeExchange() as exchange:
+            async with AtomarsAlterdiceAPI(exchange.username, exchange.password, exchange.base_url,
+                                           typed_returns=True) as api:
+                await api.login()
+                balances = await api.get_balances(True)
+                assert all(isinstance(balance, Balance) for balance in balances.values())
+
+                order_id = await api.limit_buy(0.0001, 2)
+                active_orders = await api.get_active_orders()
+                assert isinstance(active_orders[0], Order)
+                assert active_orders[0].rate == Decimal('0.0001')
+
+                await api.delete_all_orders()
+                assert await api.is_order_complete(order_id)
+
+                order_book = await api.get_order_book()
+                assert isinstance(order_book['buy'][0], BookLevel)
+                lowest_sell, highest_buy = await api.get_lowest_sell_and_highest_buy(order_book=order_book)
+                assert lowest_sell > highest_buy
+    asyncio.run(test())
@@ -0,0 +1,38 @@
+from decimal import Decimal
+
+from atom_alter_API.constants import BUY, SELL
+from atom_alter_API.order_book import OrderBook
+
+
+def get_test_order_book():
+    return {'buy': [{'count': 1, 'rate': 0.00016, 'volume': 0.0708424},
+                    {'count': 1, 'rate': 0.00018328, 'volume': 0.07408359},
+                    {'count': 3, 'rate': '0.000001', 'volume': 13900},
+                    {'count': 1, 'rate': '0.000001', 'volume': 100}],
+            'sell': [{'count': 1, 'rate': 1, 'volume': 562},
+                     {'count': 1, 'rate': 0.00018406, 'volume': 1.85251332},
+                     {'count': 1, 'rate': 0.054, 'volume': 1000}]}
+
+
+def test_top_of_book():
+    order_book = OrderBook.from_order_book(get_test_order_book())
+    assert order_book.best_bid == Decimal('0.00018328')
+    assert order_book.best_ask == Decimal('0.00018406')
+    assert order_book.spread == Decimal('0.00000078')
+    assert order_book.mid == Decimal('0.00018367')
+    assert len(order_book) == 6
+
+
+def test_price_level_lookup():
+    order_book = OrderBook.from_order_book(get_test_order_book())
+    assert order_book.get_volume_at_price(BUY, '0.000001') == Decimal(14000)
+    assert order_book.get_volume_at_price(SELL, 0.054) == Decimal(1000)
+    assert order_book.get_volume_at_price(SELL, 0.055) == Decimal(0)
+
+
+def test_empty_side():
+    order_book = OrderBook.from_order_book({'buy': [], 'sell': [{'count': 1, 'rate': 1, 'volume': 1}]})
+    assert order_book.best_bid is None
+    assert order_book.best_ask == Decimal(1)
+    assert order_book.spread is None
+    assert order_book.mid is None
@@ -0,0 +1,18 @@
+from atom_alter_API.order_history import OrderHistoryStore
+
+
+def make_order(order_id, time_done, status=2, pair='HLSETH'):
+    return {'id': order_id, 'pair': pair, 'status': status, 'time_done': time_done}
+
+
+def test_orders_that_finished_earlier_are_still_added():
+    store = OrderHistoryStore()
+    assert store.update([make_order(1, 100)]) == [make_order(1, 100)]
+
+    # The second order finished before the first, but only shows up in a later response
+    new_orders = store.update([make_order(1, 100), make_order(2, 99, status=3)])
+    assert new_orders == [make_order(2, 99, status=3)]
+    assert 2 in store
+    assert store.latest_time_done == 100
+    assert [order['id'] for order in store.get_orders_with_status(3)] == [2]
+    assert store.get_missing_order_ids([1, 2, 3]) == {3}
@@ -0,0 +1,99 @@
+import asyncio
+
+from atom_alter_API.order_watcher import OrderWatcher, OrderFilled, OrderPartiallyFilled, OrderCancelled
+
+from fake_exchange import run_with_exchange
+
+
+def run_with_watcher(test_coroutine, **watcher_kwargs):
+    async def test(exchange, api):
+        await api.login()
+        async with OrderWatcher(api, **watcher_kwargs) as watcher:
+            await test_coroutine(exchange, api, watcher)
+    run_with_exchange(test)
+
+
+async def next_event(watcher):
+    return await asyncio.wait_for(watcher.__anext__(), 2)
+
+
+def test_fills_and_cancels_are_reported():
+    async def test(exchange, api, watcher):
+        first_id = await api.limit_buy(0.0001, 2)
+        second_id = await api.limit_sell(0.0002, 1)
+        watcher.watch([first_id, second_id])
+        await asyncio.sleep(0.05)
+
+        exchange.fill_order(first_id, 0.5)
+        event = await next_event(watcher)
+        assert isinstance(event, OrderPartiallyFilled)
+        assert event.order_id == first_id
+        assert event.previous_volume_done == 0
+        assert event.order['volume_done'] == 0.5
+
+        exchange.fill_order(first_id)
+        event = await next_event(watcher)
+        assert isinstance(event, OrderFilled)
+        assert event.order_id == first_id
+
+        await api.delete_order(second_id)
+        event = await next_event(watcher)
+        assert isinstance(event, OrderCancelled)
+        assert event.order_id == second_id
+    run_with_watcher(test, min_interval=0.01, max_interval=0.1)
+
+
+def test_orders_filled_before_the_first_poll_are_reported():
+    async def test(exchange, api, watcher):
+        order_id = await api.limit_buy(0.0001, 1)
+        exchange.fill_order(order_id)
+        watcher.watch([order_id])
+
+        event = await next_event(watcher)
+        assert isinstance(event, OrderFilled)
+        assert event.order_id == order_id
+    run_with_watcher(test, min_interval=0.01, max_interval=1)
+
+
+def test_polling_backs_off_when_idle():
+    async def test(exchange, api, watcher):
+        await asyncio.sleep(0.3)
+        # Polls after 0.02, 0.06, 0.14 and 0.3 seconds instead of every 0.01
+        assert exchange.request_counts['private/orders'] <= 5
+        assert 'private/history' not in exchange.request_counts
+
+        watcher.watch([await api.limit_buy(0.0001, 1)])
+        assert watcher.interval == 0.01
+    run_with_watcher(test, min_interval=0.01, max_interval=1)
+
+
+def test_iteration_ends_when_stopped():
+    async def test(exchange, api):
+        await api.login()
+        watcher = OrderWatcher(api, min_interval=0.01)
+        watcher.start()
+        await watcher.stop()
+        assert [event async for event in watcher] == []
+    run_with_exchange(test)
+
+
+def test_stop_right_after_watch():
+    async def test(exchange, api, watcher):
+        for _ in range(20):
+            watcher.watch([])
+            await asyncio.sleep(0)
+    # Exiting the watcher must not hang even though watch() has just woken it up
+    run_with_watcher(test, min_interval=0.01, max_interval=0.1)
+
+
+def test_concurrent_history_refreshes_share_one_request():
+    async def test(exchange, api, watcher):
+        order_id = await api.limit_buy(0.0001, 1)
+        exchange.fill_order(order_id)
+        watcher.watch([order_id])
+        assert await api.is_order_complete(order_id)
+
+        event = await next_event(watcher)
+        assert isinstance(event, OrderFilled)
+        assert exchange.request_counts['private/history'] == 1
+    run_with_watcher(test, min_interval=0.01, max_interval=0.1)
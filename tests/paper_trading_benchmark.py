@@ -0,0 +1,66 @@
+import asyncio
+import random
+import tempfile
+import time
+
+from pathlib import Path
+
+from atom_alter_API.constants import BUY, SELL
+from atom_alter_API.orders import OrderRequest
+from atom_alter_API.paper_trading import MatchingEngine, PaperTradingAPI
+from atom_alter_API.recorder import MarketDataRecorder, MarketDataReader
+
+from fake_exchange import make_order_book
+
+#
+# Replays a day of one second order book snapshots through PaperTradingAPI with a simple market making
+# strategy. Every tick reads the top of the book, and every requote_every ticks the strategy cancels its
+# orders and places a new bid and ask around the mid price.
+# Usage: python paper_trading_benchmark.py
+#
+
+def record_random_walk(directory: Path, num_snapshots: int, num_levels: int) -> None:
+    mid_price = 0.00018
+    with MarketDataRecorder(directory) as recorder:
+        for second in range(num_snapshots):
+            mid_price = round(mid_price * (1 + random.gauss(0, 0.001)), 8)
+            recorder.record_order_book('HLSETH', make_order_book(num_levels, mid_price), timestamp=second * 10 ** 9)
+
+
+async def run_strategy(reader: MarketDataReader, requote_every: int) -> PaperTradingAPI:
+    engine = MatchingEngine(balances={'HLS': 10 ** 6 * 10 ** 8, 'ETH': 1000 * 10 ** 8})
+    async with PaperTradingAPI(engine) as api:
+        await api.login()
+        for tick, (timestamp, pair) in enumerate(api.replay(reader)):
+            lowest_sell, highest_buy = await api.get_lowest_sell_and_highest_buy(pair)
+            if tick % requote_every == 0:
+                await api.cancel_orders(pair)
+                mid_price = (lowest_sell + highest_buy) / 2
+                await api.place_orders([OrderRequest(BUY, float(mid_price * 995 / 1000), 10, pair),
+                                        OrderRequest(SELL, float(mid_price * 1005 / 1000), 10, pair)])
+    return api
+
+
+def main(num_snapshots: int = 86400, num_levels: int = 20, requote_every: int = 10) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        start = time.perf_counter()
+        record_random_walk(directory, num_snapshots, num_levels)
+        print('Recorded {} snapshots with {} levels per side in {:.2f}s'.format(
+            num_snapshots, num_levels, time.perf_counter() - start))
+
+        with MarketDataReader(directory) as reader:
+            start = time.perf_counter()
+            api = asyncio.run(run_strategy(reader, requote_every))
+            replay_time = time.perf_counter() - start
+
+    num_filled = len([order for order in api.engine.history if order.volume_done > 0])
+    print('Replayed {} ticks in {:.2f}s, {:.1f} us per tick'.format(
+        num_snapshots, replay_time, replay_time / num_snapshots * 1e6))
+    print('{} orders placed, {} filled or partially filled'.format(len(api.engine.history) + len(api.engine.orders),
+                                                                  num_filled))
+    print('Balances: {}'.format({currency: balance for currency, (balance, _) in api.engine.balances.items()}))
+
+
+if __name__ == "__main__":
+    main()
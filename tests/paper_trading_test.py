@@ -0,0 +1,172 @@
+import asyncio
+
+from decimal import Decimal
+
+import pytest
+
+from atom_alter_API.constants import ORDER_STATUS_FILLED, ORDER_STATUS_CANCELLED
+from atom_alter_API.exceptions import APIOperationStatusError, BadRequestError
+from atom_alter_API.models import Order
+from atom_alter_API.order_watcher import OrderWatcher, OrderFilled
+from atom_alter_API.paper_trading import MatchingEngine, PaperTradingAPI
+from atom_alter_API.recorder import MarketDataRecorder, MarketDataReader
+from atom_alter_API.utils.json_decoding import make_satoshi_json_loads
+
+from fake_exchange import make_order_book
+
+BALANCES = {'HLS': 1000 * 10 ** 8, 'ETH': 10 ** 8}
+
+
+def run_with_paper_api(test_coroutine, engine=None, **api_kwargs):
+    async def runner():
+        async with PaperTradingAPI(engine if engine is not None else MatchingEngine(balances=BALANCES),
+                                   **api_kwargs) as api:
+            await api.login()
+            await test_coroutine(api)
+    asyncio.run(runner())
+
+
+def test_orders_rest_and_fill_from_the_market():
+    async def test(api):
+        api.engine.set_order_book('HLSETH', make_order_book(3))
+        assert await api.get_lowest_sell_and_highest_buy() == (Decimal('0.00018018'), Decimal('0.00017982'))
+
+        order_id = await api.limit_buy(0.0001, 10)
+        balances = await api.get_balances()
+        assert balances['ETH']['balance'] == 10 ** 8
+        assert balances['ETH']['balance_available'] == 10 ** 8 - 100000
+
+        [order] = await api.get_active_orders('HLSETH')
+        assert order['id'] == order_id
+        assert order['rate'] == 0.0001
+        assert order['volume_done'] == 0
+
+        # The market trades down through our price. We are filled at our own price.
+        api.engine.set_order_book('HLSETH', {'buy': [], 'sell': [{'rate': 0.00009, 'volume': 4}]})
+        [order] = await api.get_active_orders()
+        assert order['volume_done'] == 4
+        api.engine.set_order_book('HLSETH', {'buy': [], 'sell': [{'rate': 0.00009, 'volume': 100}]})
+        assert await api.get_active_orders() == []
+        assert await api.is_order_complete(order_id)
+
+        [order] = await api.get_order_history()
+        assert order['status'] == ORDER_STATUS_FILLED
+        assert order['price_done'] == 0.001
+        balances = await api.get_balances()
+        assert balances['ETH']['balance'] == balances['ETH']['balance_available'] == 10 ** 8 - 100000
+        assert balances['HLS']['balance'] == 1010 * 10 ** 8
+    run_with_paper_api(test)
+
+
+def test_new_orders_take_market_liquidity_at_the_market_price():
+    async def test(api):
+        api.engine.set_order_book('HLSETH', make_order_book(3))
+
+        # Takes 1 at 0.00018018 and 1.5 at 0.00018036, and the last 0.5 rests
+        order_id = await api.limit_buy(0.00018036, 3)
+        [order] = await api.get_active_orders()
+        assert order['volume_done'] == 2.5
+        assert order['price_done'] == 0.00045072
+        assert (await api.get_order_book())['buy'][0] == {'count': 1, 'rate': 0.00018036, 'volume': 0.5}
+        assert await api.get_lowest_sell() == Decimal('0.00018054')
+
+        await api.delete_order(order_id)
+        [order] = await api.get_order_history()
+        assert order['status'] == ORDER_STATUS_CANCELLED
+        balances = await api.get_balances()
+        assert balances['ETH']['balance'] == balances['ETH']['balance_available'] == 10 ** 8 - 45072
+        assert balances['HLS']['balance'] == balances['HLS']['balance_available'] == 100250000000
+    run_with_paper_api(test)
+
+
+def test_price_time_priority():
+    async def test(api):
+        first = await api.limit_sell(0.0003, 1)
+        better = await api.limit_sell(0.00029, 1)
+        second = await api.limit_sell(0.0003, 1)
+        book = await api.get_order_book()
+        assert book['sell'] == [{'count': 1, 'rate': 0.00029, 'volume': 1.0},
+                                {'count': 2, 'rate': 0.0003, 'volume': 2.0}]
+
+        api.engine.set_order_book('HLSETH', {'buy': [{'rate': 0.0003, 'volume': 1.5}], 'sell': []})
+        orders = {order['id']: order['volume_done'] for order in await api.get_active_orders()}
+        assert orders == {first: 0.5, second: 0}
+        assert await api.are_orders_complete([better, first, second]) == {better: True, first: False, second: False}
+
+        # Seller receives the rounded down total
+        balances = await api.get_balances()
+        assert balances['ETH']['balance'] == 10 ** 8 + 29000 + 15000
+    run_with_paper_api(test)
+
+
+def test_rejected_orders():
+    async def test(api):
+        with pytest.raises(APIOperationStatusError):
+            await api.limit_buy(1, 10)
+        with pytest.raises(APIOperationStatusError):
+            await api.limit_sell(0.1, 1, 'DOGEETH')
+        with pytest.raises(BadRequestError):
+            await api.get_order_book('DOGEETH')
+
+        result = await api.cancel_order_ids([12345])
+        assert result.already_gone == [12345]
+        assert await api.get_ticker_list() == [{'base': 'HLS', 'pair': 'HLSBTC', 'quote': 'BTC'},
+                                               {'base': 'HLS', 'pair': 'HLSETH', 'quote': 'ETH'},
+                                               {'base': 'HLS', 'pair': 'HLSUSDT', 'quote': 'USDT'}]
+    run_with_paper_api(test)
+
+
+def test_typed_returns_and_satoshi_decoder():
+    async def test(api):
+        api.engine.set_order_book('HLSETH', make_order_book(2))
+        await api.limit_sell(0.00017964, 1.5)
+
+        [order] = await api.get_order_history()
+        assert isinstance(order, Order)
+        assert order.price_done == Decimal('0.00026964')
+        assert (await api.get_parsed_order_book()).best_bid == Decimal('0.00017964')
+    run_with_paper_api(test, typed_returns=True, json_decoder=make_satoshi_json_loads())
+
+    async def test(api):
+        await api.limit_buy(0.0001, 1)
+        [order] = await api.get_active_orders()
+        assert order['rate'] == 10000
+        assert order['volume'] == 10 ** 8
+    run_with_paper_api(test, json_decoder=make_satoshi_json_loads())
+
+
+def test_order_watcher_sees_fills():
+    async def test(api):
+        order_id = await api.limit_buy(0.0001, 1)
+        async with OrderWatcher(api, min_interval=0.01) as watcher:
+            await watcher.poll()
+            api.engine.set_order_book('HLSETH', {'buy': [], 'sell': [{'rate': 0.0001, 'volume': 1}]})
+            event = await asyncio.wait_for(watcher.__anext__(), 5)
+        assert isinstance(event, OrderFilled)
+        assert event.order_id == order_id
+    run_with_paper_api(test)
+
+
+def test_replay_recorded_order_books(tmp_path):
+    with MarketDataRecorder(tmp_path) as recorder:
+        for second in range(1, 4):
+            recorder.record_order_book('HLSETH', make_order_book(2, mid_price=0.00018 - second * 0.00001),
+                                       timestamp=second * 10 ** 9)
+            recorder.record_order_book('HLSBTC', make_order_book(2, mid_price=0.00000002), timestamp=second * 10 ** 9)
+
+    async def test(api):
+        with MarketDataReader(tmp_path) as reader:
+            replayed = []
+            for timestamp, pair in api.replay(reader):
+                replayed.append((timestamp, pair))
+                if pair == 'HLSETH' and timestamp == 10 ** 9:
+                    order_id = await api.limit_buy(0.00016, 1)
+        assert replayed == [(second * 10 ** 9, pair) for second in range(1, 4) for pair in ('HLSBTC', 'HLSETH')]
+
+        # The third book has its best ask at 0.00015015, below our bid
+        [order] = await api.get_order_history()
+        assert order['id'] == order_id
+        assert order['time_create'] == 1
+        assert order['time_done'] == 3
+        assert order['price_done'] == 0.00016
+    run_with_paper_api(test)
@@ -0,0 +1,37 @@
+import asyncio
+
+from atom_alter_API.exceptions import APIOperationStatusError
+from atom_alter_API.pool import AtomarsAlterdiceAPIPool
+
+from fake_exchange import FakeExchange, DEFAULT_BALANCES
+
+ACCOUNTS = [('account{}@test.com'.format(i), 'password{}'.format(i)) for i in range(5)]
+
+
+def test_pool_fan_out():
+    async def test():
+        async with FakeExchange(accounts=dict(ACCOUNTS)) as exchange:
+            async with AtomarsAlterdiceAPIPool(ACCOUNTS + [('wrong@test.com', 'wrong')], exchange.base_url,
+                                               concurrency=2) as pool:
+                login_results = await pool.login_all()
+                assert all(login_results[username] is None for username, _ in ACCOUNTS)
+                assert isinstance(login_results['wrong@test.com'], APIOperationStatusError)
+                del pool.clients['wrong@test.com']
+
+                # Every client uses the same session
+                assert len({id(client.get_session()) for client in pool.clients.values()}) == 1
+
+                balances = await pool.get_balances_all(only_non_zero=True)
+                assert all(set(account_balances) == {'HLS', 'ETH'} for account_balances in balances.values())
+
+                totals = await pool.get_total_balances()
+                assert totals['HLS']['balance'] == DEFAULT_BALANCES['HLS']['balance'] * len(ACCOUNTS)
+
+                client = pool.clients[ACCOUNTS[0][0]]
+                await client.limit_buy(0.0001, 1, 'HLSETH')
+                active_orders = await pool.get_active_orders_all('HLSETH')
+                assert all(len(orders) == 1 for orders in active_orders.values())
+
+                await pool.delete_all_orders_all('HLSETH')
+                assert await client.get_active_orders() == []
+    asyncio.run(test())
@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+import pytest
+
+from atom_alter_API.api import AtomarsAlterdiceAPI
+from atom_alter_API.constants import PRIORITY_CANCEL, PRIORITY_CREATE, PRIORITY_READ
+from atom_alter_API.utils.rate_limit import PriorityRateLimiter, RequestScheduler, TokenBucket
+
+from fake_exchange import FakeExchange
+
+
+def test_cancels_go_before_creates_and_reads():
+    async def test():
+        limiter = PriorityRateLimiter(rate=100, capacity=1)
+        await limiter.acquire()
+        completed = []
+
+        async def request(name, priority):
+            await limiter.acquire(priority)
+            completed.append(name)
+
+        tasks = [asyncio.ensure_future(request('read', PRIORITY_READ)),
+                 asyncio.ensure_future(request('create', PRIORITY_CREATE)),
+                 asyncio.ensure_future(request('cancel', PRIORITY_CANCEL))]
+        await asyncio.sleep(0)
+        assert limiter.get_queue_depth_by_priority() == {PRIORITY_READ: 1, PRIORITY_CREATE: 1, PRIORITY_CANCEL: 1}
+
+        await asyncio.gather(*tasks)
+        assert completed == ['cancel', 'create', 'read']
+        assert limiter.get_stats()['max_queue_depth'] == 3
+    asyncio.run(test())
+
+
+def test_scheduler_limits_request_rate():
+    async def test():
+        scheduler = RequestScheduler(public_rate=50, public_burst=5)
+        async with FakeExchange() as exchange:
+            async with AtomarsAlterdiceAPI(exchange.username, exchange.password, exchange.base_url,
+                                           scheduler=scheduler) as api:
+                start = time.monotonic()
+                await asyncio.gather(*[api.get_ticker_list() for _ in range(15)])
+                # 5 go out straight away, the other 10 wait for tokens at 50 per second
+                assert time.monotonic() - start >= 0.18
+                assert scheduler.get_stats()['public']['total_delayed'] == 10
+    asyncio.run(test())
+
+
+def test_bucket_capacity_below_one_is_rejected():
+    with pytest.raises(ValueError):
+        TokenBucket(10, 0.5)
+    with pytest.raises(ValueError):
+        RequestScheduler(public_rate=10, public_burst=0)
@@ -0,0 +1,67 @@
+import ast
+import json
+import pprint
+import tempfile
+import time
+
+from pathlib import Path
+
+from atom_alter_API.recorder import MarketDataRecorder, MarketDataReader
+
+from fake_exchange import make_order_book
+
+#
+# Compares recording order book snapshots with MarketDataRecorder against writing them as pretty printed and
+# plain JSON, by file size, write time and the time to load every snapshot of a pair back.
+# Usage: python recorder_benchmark.py
+#
+
+def main(num_snapshots: int = 2000, num_levels: int = 50) -> None:
+    order_book = make_order_book(num_levels)
+    results = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+
+        start = time.perf_counter()
+        with (directory / 'snapshots.txt').open('w') as f:
+            for timestamp in range(num_snapshots):
+                f.write(pprint.pformat({'time': timestamp, 'pair': 'HLSETH', 'order_book': order_book}) + '\n\n')
+        write_time = time.perf_counter() - start
+        start = time.perf_counter()
+        with (directory / 'snapshots.txt').open('r') as f:
+            snapshots = [ast.literal_eval(text) for text in f.read().split('\n\n') if text]
+            assert len(snapshots) == num_snapshots
+        results.append(('pprint', (directory / 'snapshots.txt').stat().st_size, write_time, time.perf_counter() - start))
+
+        start = time.perf_counter()
+        with (directory / 'snapshots.jsonl').open('w') as f:
+            for timestamp in range(num_snapshots):
+                f.write(json.dumps({'time': timestamp, 'pair': 'HLSETH', 'order_book': order_book}) + '\n')
+        write_time = time.perf_counter() - start
+        start = time.perf_counter()
+        with (directory / 'snapshots.jsonl').open('r') as f:
+            snapshots = [json.loads(line) for line in f]
+            assert len(snapshots) == num_snapshots
+        results.append(('json lines', (directory / 'snapshots.jsonl').stat().st_size, write_time, time.perf_counter() - start))
+
+        start = time.perf_counter()
+        with MarketDataRecorder(directory / 'recorded') as recorder:
+            for timestamp in range(num_snapshots):
+                recorder.record_order_book('HLSETH', order_book, timestamp=timestamp)
+        write_time = time.perf_counter() - start
+        start = time.perf_counter()
+        with MarketDataReader(directory / 'recorded') as reader:
+            records = reader.scan('HLSETH')
+            assert len(records) == num_snapshots * num_levels * 2
+        size = sum(path.stat().st_size for path in (directory / 'recorded').iterdir())
+        results.append(('MarketDataRecorder', size, write_time, time.perf_counter() - start))
+
+    print('{} snapshots with {} levels per side'.format(num_snapshots, num_levels))
+    print('{:<22}{:>12}{:>12}{:>12}'.format('format', 'MB', 'write ms', 'load ms'))
+    for name, size, write_time, load_time in results:
+        print('{:<22}{:>12.2f}{:>12.1f}{:>12.1f}'.format(name, size / 1e6, write_time * 1000, load_time * 1000))
+
+
+if __name__ == "__main__":
+    main()
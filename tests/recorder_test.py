@@ -0,0 +1,73 @@
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from atom_alter_API.constants import BUY, SELL
+from atom_alter_API.order_book import OrderBook
+from atom_alter_API.recorder import MarketDataRecorder, MarketDataReader, RECORD_STRUCT
+from atom_alter_API.utils.json_decoding import make_satoshi_json_loads
+
+from fake_exchange import make_order_book, run_with_exchange
+
+TEST_ORDER_BOOK = {'buy': [{'count': 2, 'rate': 0.00017982, 'volume': 1.5}],
+                   'sell': [{'count': 1, 'rate': '0.00018018', 'volume': 12345.12345678},
+                            {'count': 1, 'rate': 0.0002, 'volume': 3}]}
+
+
+def test_record_and_read_back(tmp_path):
+    with MarketDataRecorder(tmp_path) as recorder:
+        recorder.record_ticker_list([{'pair': 'HLSETH'}, {'pair': 'HLSBTC'}], timestamp=1)
+        assert recorder.record_order_book('HLSETH', TEST_ORDER_BOOK, timestamp=10) == 3
+        recorder.record_order_book('HLSBTC', make_order_book(5), timestamp=10)
+        recorder.record_order_book('HLSETH', OrderBook.from_order_book(TEST_ORDER_BOOK), timestamp=20)
+        with pytest.raises(ValueError):
+            recorder.record_order_book('HLSETH', TEST_ORDER_BOOK, timestamp=15)
+
+    with MarketDataReader(tmp_path) as reader:
+        assert reader.pairs == ['HLSETH', 'HLSBTC']
+        assert list(reader.iter_ticker_lists()) == [(1, ['HLSETH', 'HLSBTC'])]
+
+        snapshots = list(reader.iter_snapshots('HLSETH'))
+        assert [timestamp for timestamp, _ in snapshots] == [10, 20]
+        records = snapshots[0][1]
+        assert records['price'].tolist() == [17982, 18018, 20000]
+        assert records['volume'].tolist() == [150000000, 1234512345678, 300000000]
+        assert records['side'].tolist() == [BUY, SELL, SELL]
+        assert records['count'].tolist() == [2, 1, 1]
+
+        order_book = MarketDataReader.to_order_book(records)
+        assert order_book['sell'][0] == {'count': 1, 'rate': Decimal('0.00018018'), 'volume': Decimal('12345.12345678')}
+
+        assert len(reader.scan('HLSETH', start_time=11)) == 3
+        assert len(reader.scan('HLSBTC', end_time=9)) == 0
+        assert len(reader.scan('HLSBTC')) == 10
+
+
+def test_segments_roll_over_and_recording_continues(tmp_path):
+    with MarketDataRecorder(tmp_path, max_segment_bytes=RECORD_STRUCT.size * 25) as recorder:
+        for timestamp in range(5):
+            recorder.record_order_book('HLSETH', make_order_book(5), timestamp=timestamp)
+    with MarketDataRecorder(tmp_path, max_segment_bytes=RECORD_STRUCT.size * 25) as recorder:
+        recorder.record_order_book('HLSETH', make_order_book(5), timestamp=5)
+
+    assert len(list(tmp_path.glob('segment_*.bin'))) == 3
+    with MarketDataReader(tmp_path) as reader:
+        index = reader.get_index('HLSETH')
+        assert index['segment'].tolist() == [0, 0, 1, 1, 2, 2]
+        assert index['start'].tolist() == [0, 10, 0, 10, 0, 10]
+        prices = reader.scan('HLSETH')['price']
+        assert len(prices) == 60
+        assert np.array_equal(prices[:10], prices[50:])
+
+
+def test_record_from_api_in_satoshis(tmp_path):
+    async def test(exchange, api):
+        with MarketDataRecorder(tmp_path, in_satoshis=True) as recorder:
+            assert await recorder.record_from_api(api, ['HLSETH', 'HLSBTC']) == 80
+    run_with_exchange(test, api_kwargs={'json_decoder': make_satoshi_json_loads()})
+
+    with MarketDataReader(tmp_path) as reader:
+        (_, records), = reader.iter_snapshots('HLSETH')
+        book = MarketDataReader.to_order_book(records)
+        assert max(level['rate'] for level in book['buy']) == Decimal('0.00017982')
@@ -0,0 +1,57 @@
+import time
+
+import pytest
+
+from atom_alter_API.exceptions import BadRequestError, HTTPRequestError
+from atom_alter_API.utils.retry import RetryPolicy
+
+from fake_exchange import run_with_exchange
+
+
+def test_transient_errors_are_retried():
+    async def test(exchange, api):
+        exchange.fail_next(2, 500)
+        assert len(await api.get_ticker_list()) == 3
+        assert exchange.request_counts['public/symbols'] == 3
+
+        exchange.fail_next(3, 503)
+        with pytest.raises(HTTPRequestError):
+            await api.get_ticker_list()
+    run_with_exchange(test, api_kwargs={'retry_policy': RetryPolicy(max_attempts=3, base_delay=0.001)})
+
+
+def test_bad_requests_are_not_retried():
+    async def test(exchange, api):
+        exchange.fail_next(1, 400)
+        with pytest.raises(BadRequestError):
+            await api.get_ticker_list()
+        assert exchange.request_counts['public/symbols'] == 1
+    run_with_exchange(test, api_kwargs={'retry_policy': RetryPolicy(max_attempts=3, base_delay=0.001)})
+
+
+def test_retried_orders_reuse_request_id():
+    async def test(exchange, api):
+        await api.login()
+        exchange.fail_next(1, 500)
+        order_id = await api.limit_buy(0.0001, 1)
+
+        assert exchange.request_counts['private/create-order'] == 2
+        assert exchange.request_ids[-1] == exchange.request_ids[-2]
+        assert [order['id'] for order in await api.get_active_orders()] == [order_id]
+    run_with_exchange(test, api_kwargs={'retry_policy': RetryPolicy(max_attempts=3, base_delay=0.001)})
+
+
+def test_slow_requests_are_hedged():
+    async def test(exchange, api):
+        exchange.slow_next(1, 1)
+        start = time.monotonic()
+        await api.get_order_book()
+        assert time.monotonic() - start < 0.5
+        assert exchange.request_counts['public/book'] == 2
+    run_with_exchange(test, api_kwargs={'retry_policy': RetryPolicy(hedge_delay=0.05)})
+
+
+def test_backoff_delay():
+    policy = RetryPolicy(base_delay=0.1, max_delay=0.5, jitter=False)
+    assert [policy.get_delay(attempt) for attempt in range(4)] == [0.1, 0.2, 0.4, 0.5]
+    assert 0 <= RetryPolicy(base_delay=0.1).get_delay(3) <= 0.8
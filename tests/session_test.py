@@ -0,0 +1,46 @@
+import asyncio
+
+from atom_alter_API.api import AtomarsAlterdiceAPI, create_client_session
+
+from fake_exchange import FakeExchange, run_with_exchange
+
+
+def test_requests_share_one_session():
+    async def test(exchange, api):
+        session = api.get_session()
+        await api.login()
+        await asyncio.gather(*[api.get_balances() for _ in range(5)])
+        assert api.get_session() is session
+    run_with_exchange(test)
+
+
+def test_close_only_closes_owned_sessions():
+    async def runner():
+        async with FakeExchange() as exchange:
+            api = AtomarsAlterdiceAPI(exchange.username, exchange.password, exchange.base_url)
+            owned_session = api.get_session()
+            await api.close()
+            assert owned_session.closed
+
+            shared_session = create_client_session()
+            async with AtomarsAlterdiceAPI(exchange.username, exchange.password, exchange.base_url,
+                                           session=shared_session) as api:
+                await api.login()
+                assert api.get_session() is shared_session
+            assert not shared_session.closed
+            await shared_session.close()
+    asyncio.run(runner())
+
+
+def test_connections_are_prewarmed_on_the_first_login_only():
+    async def test(exchange, api):
+        await api.login()
+        assert exchange.request_counts['public/symbols'] == 4
+        assert sum(len(connections) for connections in api.get_session().connector._conns.values()) == 4
+
+        # Logging in again automatically doesn't warm up the pool again
+        exchange.expire_token()
+        await api.get_balances()
+        assert exchange.request_counts['login'] == 2
+        assert exchange.request_counts['public/symbols'] == 4
+    run_with_exchange(test, api_kwargs={'prewarm_connections': 4})
@@ -0,0 +1,70 @@
+import hashlib
+import timeit
+
+from decimal import Decimal
+
+from atom_alter_API.exceptions import HeaderCreationError
+from atom_alter_API.signing import PayloadSigner
+
+try:
+    from eth_utils import to_bytes as _legacy_to_bytes
+except ImportError:
+    # eth_utils.to_bytes(text=...) is a utf-8 encode
+    def _legacy_to_bytes(text: str) -> bytes:
+        return text.encode('utf-8')
+
+#
+# Compares PayloadSigner with the recursive string concatenation signing that it replaced.
+# Usage: python signing_benchmark.py
+#
+
+def _legacy_get_sig_from_payload(payload):
+    if isinstance(payload, dict):
+        sorted_keys = sorted(payload.keys())
+        to_return = ''
+        for key in sorted_keys:
+            to_return += str(_legacy_get_sig_from_payload(payload[key]))
+        return to_return
+    elif isinstance(payload, Decimal):
+        return str(payload)
+    elif isinstance(payload, float):
+        decimal = Decimal(payload)
+        return str(decimal)
+    elif isinstance(payload, str) or isinstance(payload, int):
+        return str(payload)
+    else:
+        raise HeaderCreationError("I don't know how to create signature with this payload.")
+
+
+def legacy_sign(payload, secret: str) -> str:
+    raw_sig = _legacy_get_sig_from_payload(payload) + str(secret)
+    return hashlib.sha256(_legacy_to_bytes(text=raw_sig)).hexdigest()
+
+
+def main(number: int = 100000) -> None:
+    secret = '5f4dcc3b5aa765d61d8327deb882cf99'
+    payload = {
+        'type_trade': 0,
+        'type': 1,
+        'rate': '0.00018597',
+        'volume': '0.10000000',
+        'pair': 'HLSETH',
+        'request_id': 1234567890123,
+    }
+    signer = PayloadSigner(secret)
+    assert signer.sign(payload) == legacy_sign(payload, secret)
+
+    legacy_time = timeit.timeit(lambda: legacy_sign(payload, secret), number=number)
+    signer_time = timeit.timeit(lambda: signer.sign(payload), number=number)
+    batch = [payload] * 50
+    batch_time = timeit.timeit(lambda: signer.sign_batch(batch), number=number // 50)
+
+    print('{:<28}{:>12}'.format('implementation', 'us/sign'))
+    print('{:<28}{:>12.2f}'.format('legacy', legacy_time / number * 1e6))
+    print('{:<28}{:>12.2f}'.format('PayloadSigner.sign', signer_time / number * 1e6))
+    print('{:<28}{:>12.2f}'.format('PayloadSigner.sign_batch', batch_time / number * 1e6))
+    print('speedup: {:.2f}x'.format(legacy_time / signer_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+from decimal import Decimal
+
+import pytest
+
+from atom_alter_API.exceptions import HeaderCreationError
+from atom_alter_API.signing import PayloadSigner
+
+from fake_exchange import sign_payload
+from signing_benchmark import legacy_sign
+
+TEST_PAYLOADS = [
+    {'request_id': 1234567890123},
+    {'type_trade': 0, 'type': 1, 'rate': '0.00018597', 'volume': '0.10000000', 'pair': 'HLSETH', 'request_id': 1},
+    {'order_id': 514806416, 'request_id': 9999999999999},
+    {'price': 0.1, 'amount': Decimal('1.5'), 'flag': True, 'nested': {'b': 2, 'a': 'x'}},
+    {},
+]
+
+
+@pytest.mark.parametrize('payload', TEST_PAYLOADS)
+def test_signatures_match_previous_implementation(payload):
+    secret = 'a1b2c3d4e5f6'
+    signer = PayloadSigner(secret)
+    assert signer.sign(payload) == legacy_sign(payload, secret)
+    if 'flag' not in payload:
+        assert signer.sign(payload) == sign_payload(payload, secret)
+
+
+def test_sign_batch():
+    signer = PayloadSigner('secret')
+    assert signer.sign_batch(TEST_PAYLOADS) == [signer.sign(payload) for payload in TEST_PAYLOADS]
+
+
+def test_unknown_type_raises():
+    with pytest.raises(HeaderCreationError):
+        PayloadSigner('secret').sign({'bad': [1, 2]})
@@ -0,0 +1,43 @@
+import asyncio
+import concurrent.futures
+import time
+
+from atom_alter_API.api import AtomarsAlterdiceAPI
+from atom_alter_API.sync import SyncAtomarsAlterdiceAPI
+
+from fake_exchange import ExchangeThread
+
+#
+# Compares calling the client from synchronous threads with asyncio.run per call, which logs in and opens new
+# connections every time, against SyncAtomarsAlterdiceAPI, which keeps one loop, login and connection pool.
+# Usage: python sync_benchmark.py
+#
+
+def call_with_asyncio_run(base_url: str, username: str, password: str) -> None:
+    async def call():
+        async with AtomarsAlterdiceAPI(username, password, base_url) as api:
+            await api.login()
+            await api.get_balance('ETH')
+    asyncio.run(call())
+
+
+def main(num_calls: int = 400, num_threads: int = 20, latency: float = 0.005) -> None:
+    with ExchangeThread(latency=latency) as exchange:
+        print('{} calls of get_balance from {} threads, {}ms server latency'.format(num_calls, num_threads, latency * 1000))
+        print('{:<28}{:>14}'.format('caller', 'calls/sec'))
+
+        with concurrent.futures.ThreadPoolExecutor(num_threads) as executor:
+            start = time.perf_counter()
+            list(executor.map(lambda _: call_with_asyncio_run(exchange.base_url, exchange.username, exchange.password),
+                              range(num_calls)))
+            print('{:<28}{:>14.0f}'.format('asyncio.run per call', num_calls / (time.perf_counter() - start)))
+
+            with SyncAtomarsAlterdiceAPI(exchange.username, exchange.password, exchange.base_url) as api:
+                api.login()
+                start = time.perf_counter()
+                list(executor.map(lambda _: api.get_balance('ETH'), range(num_calls)))
+                print('{:<28}{:>14.0f}'.format('SyncAtomarsAlterdiceAPI', num_calls / (time.perf_counter() - start)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import concurrent.futures
+
+import pytest
+
+from atom_alter_API.paper_trading import MatchingEngine, PaperTradingAPI
+from atom_alter_API.sync import SyncAtomarsAlterdiceAPI
+
+from fake_exchange import ExchangeThread
+
+
+def test_blocking_calls():
+    with ExchangeThread() as exchange:
+        with SyncAtomarsAlterdiceAPI(exchange.username, exchange.password, exchange.base_url) as api:
+            api.login()
+            order_id = api.limit_buy(0.0001, 1)
+            assert [order['id'] for order in api.get_active_orders()] == [order_id]
+            api.delete_order(order_id, timeout=5)
+            assert api.get_active_orders() == []
+
+            assert api.default_pair == 'HLSETH'
+            assert api.get_cache_stats() == {}
+            assert api.limit_buy.__name__ == 'limit_buy'
+
+        with pytest.raises(RuntimeError):
+            api.get_balances()
+
+
+def test_calls_from_many_threads_share_one_session():
+    with ExchangeThread(latency=0.05) as exchange:
+        with SyncAtomarsAlterdiceAPI(exchange.username, exchange.password, exchange.base_url) as api:
+            api.login()
+            session = api.api.get_session()
+
+            with concurrent.futures.ThreadPoolExecutor(20) as executor:
+                order_books = list(executor.map(lambda _: api.get_order_book(), range(40)))
+
+            assert all(order_book == order_books[0] for order_book in order_books)
+            assert api.api.get_session() is session
+            assert exchange.request_counts['public/book'] == 40
+
+
+def test_timeout_cancels_the_call():
+    with ExchangeThread() as exchange:
+        with SyncAtomarsAlterdiceAPI(exchange.username, exchange.password, exchange.base_url, timeout=5) as api:
+            exchange.slow_next(1, delay=1)
+            with pytest.raises(concurrent.futures.TimeoutError):
+                api.get_ticker_list(timeout=0.1)
+            assert len(api.get_ticker_list()) == 3
+
+
+def test_wraps_an_existing_client():
+    api = PaperTradingAPI(MatchingEngine(balances={'ETH': 10 ** 8}))
+    with SyncAtomarsAlterdiceAPI(api=api) as sync_api:
+        sync_api.login()
+        sync_api.limit_buy(0.0001, 1)
+        assert sync_api.get_balance('ETH')['balance_available'] == 10 ** 8 - 10000